@@ -1,7 +1,7 @@
 """API v1版本包"""
 
 from fastapi import APIRouter
-from .endpoints import auth, users, health, ai_providers, ai_chat
+from .endpoints import auth, users, health, ai_providers, ai_chat, schedule, jobs
 
 # 创建API路由器
 api_router = APIRouter(prefix="/api/v1")
@@ -37,4 +37,16 @@ api_router.include_router(
     tags=["AI聊天"]
 )
 
+api_router.include_router(
+    schedule.router,
+    prefix="/schedule",
+    tags=["任务排期"]
+)
+
+api_router.include_router(
+    jobs.router,
+    prefix="/jobs",
+    tags=["后台作业"]
+)
+
 __all__ = ["api_router"]
\ No newline at end of file
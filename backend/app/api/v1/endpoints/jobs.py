@@ -0,0 +1,186 @@
+"""后台作业端点"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from ....schemas.base import DataResponse
+from ....schemas.job import JobCreate, JobResponse, JobResultResponse
+from ....services.job_service import get_job_queue, validate_job_payload, to_job_response
+from ....core.job_queue import Job, JobStatus
+from ....core.dependencies import get_current_active_user
+from ....models.user import User
+
+router = APIRouter()
+
+
+def _get_owned_job(job_id: str, user: User) -> Job:
+    """获取当前用户的作业，不存在或属于其他用户时抛出404"""
+    job = get_job_queue().get(job_id)
+    if job is None or job.user_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="作业不存在或已过期"
+        )
+    return job
+
+
+@router.post(
+    "/",
+    response_model=DataResponse[JobResponse],
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="提交后台作业",
+    description="提交排期、批量排期或AI聊天作业，立即返回作业ID，之后通过状态与结果接口查询"
+)
+async def create_job(
+    job_data: JobCreate,
+    current_user: User = Depends(get_current_active_user)
+) -> DataResponse[JobResponse]:
+    """提交后台作业
+
+    Args:
+        job_data (JobCreate): 作业类型与参数
+        current_user (User): 当前用户
+
+    Returns:
+        DataResponse[JobResponse]: 新作业的状态
+    """
+    try:
+        validate_job_payload(job_data.job_type, job_data.payload)
+        job = get_job_queue().enqueue(
+            job_data.job_type,
+            job_data.payload,
+            user_id=current_user.id,
+            max_retries=job_data.max_retries
+        )
+        return DataResponse(
+            success=True,
+            message="作业已提交",
+            data=to_job_response(job)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"提交作业失败: {str(e)}"
+        )
+
+
+@router.get(
+    "/{job_id}",
+    response_model=DataResponse[JobResponse],
+    summary="获取作业状态",
+    description="获取作业的状态、执行次数与错误信息"
+)
+async def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user)
+) -> DataResponse[JobResponse]:
+    """获取作业状态
+
+    Args:
+        job_id (str): 作业ID
+        current_user (User): 当前用户
+
+    Returns:
+        DataResponse[JobResponse]: 作业状态
+    """
+    try:
+        job = _get_owned_job(job_id, current_user)
+        return DataResponse(
+            success=True,
+            message="获取作业状态成功",
+            data=to_job_response(job)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"获取作业状态失败: {str(e)}"
+        )
+
+
+@router.get(
+    "/{job_id}/result",
+    response_model=DataResponse[JobResultResponse],
+    summary="获取作业结果",
+    description="获取已结束作业的结果或错误信息，作业未结束时返回409"
+)
+async def get_job_result(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user)
+) -> DataResponse[JobResultResponse]:
+    """获取作业结果
+
+    Args:
+        job_id (str): 作业ID
+        current_user (User): 当前用户
+
+    Returns:
+        DataResponse[JobResultResponse]: 作业结果
+    """
+    try:
+        job = _get_owned_job(job_id, current_user)
+        if not job.is_finished:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"作业尚未结束，当前状态: {job.status.value}"
+            )
+        return DataResponse(
+            success=True,
+            message="获取作业结果成功",
+            data=JobResultResponse(
+                job_id=job.job_id,
+                status=job.status.value,
+                result=job.result if job.status == JobStatus.SUCCEEDED else None,
+                error=job.error
+            )
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"获取作业结果失败: {str(e)}"
+        )
+
+
+@router.post(
+    "/{job_id}/cancel",
+    response_model=DataResponse[JobResponse],
+    summary="取消作业",
+    description="排队中的作业立即取消，运行中的作业在下一次检查时中止，已结束的作业保持不变"
+)
+async def cancel_job(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user)
+) -> DataResponse[JobResponse]:
+    """取消作业
+
+    Args:
+        job_id (str): 作业ID
+        current_user (User): 当前用户
+
+    Returns:
+        DataResponse[JobResponse]: 取消后的作业状态
+    """
+    try:
+        _get_owned_job(job_id, current_user)
+        job = get_job_queue().cancel(job_id)
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="作业不存在或已过期"
+            )
+        return DataResponse(
+            success=True,
+            message="作业已取消" if job.status == JobStatus.CANCELLED else "已请求取消作业",
+            data=to_job_response(job)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"取消作业失败: {str(e)}"
+        )
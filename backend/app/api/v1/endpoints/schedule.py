@@ -0,0 +1,81 @@
+"""任务排期端点"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from ....schemas.base import DataResponse
+from ....schemas.schedule import ScheduleRequest, ScheduleResponse, ScheduleCacheInvalidation
+from ....services.schedule_service import ScheduleService
+from ....core.dependencies import get_current_active_user
+from ....models.user import User
+
+router = APIRouter()
+
+
+@router.post(
+    "/",
+    response_model=DataResponse[ScheduleResponse],
+    summary="生成任务排期",
+    description="按紧迫度与多样性规则为给定的项目和任务生成排期，相同输入直接返回缓存结果"
+)
+async def create_schedule(
+    schedule_request: ScheduleRequest,
+    current_user: User = Depends(get_current_active_user)
+) -> DataResponse[ScheduleResponse]:
+    """生成任务排期
+
+    Args:
+        schedule_request (ScheduleRequest): 项目、任务、调度参数与开始时间
+        current_user (User): 当前用户
+
+    Returns:
+        DataResponse[ScheduleResponse]: 排期结果
+    """
+    schedule_service = ScheduleService()
+
+    try:
+        result = await schedule_service.schedule(schedule_request, current_user.id)
+        return DataResponse(
+            success=True,
+            message="排期生成成功",
+            data=ScheduleResponse(**result)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"生成排期失败: {str(e)}"
+        )
+
+
+@router.delete(
+    "/cache",
+    response_model=DataResponse[ScheduleCacheInvalidation],
+    summary="清除排期缓存",
+    description="使当前用户的全部排期缓存失效，任务或项目变化后调用"
+)
+async def invalidate_schedule_cache(
+    current_user: User = Depends(get_current_active_user)
+) -> DataResponse[ScheduleCacheInvalidation]:
+    """清除当前用户的排期缓存
+
+    Args:
+        current_user (User): 当前用户
+
+    Returns:
+        DataResponse[ScheduleCacheInvalidation]: 删除的缓存条目数
+    """
+    schedule_service = ScheduleService()
+
+    try:
+        removed = schedule_service.invalidate_user(current_user.id)
+        return DataResponse(
+            success=True,
+            message="排期缓存已清除",
+            data=ScheduleCacheInvalidation(removed=removed)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"清除排期缓存失败: {str(e)}"
+        )
@@ -33,6 +33,24 @@ class Settings(BaseSettings):
     # Redis配置
     redis_url: str = "redis://:root@localhost:6379/0"
 
+    # 任务排期配置
+    schedule_max_projects: int = 2000
+    schedule_max_tasks: int = 20000
+    schedule_max_days: int = 366
+    schedule_cache_ttl_seconds: int = 3600
+    schedule_cache_max_entries_per_user: int = 20
+    schedule_cache_max_bytes: int = 2 * 1024 * 1024
+
+    # 后台作业配置
+    job_backend: str = "redis"  # redis，或 memory（进程内替身，仅用于测试与单机开发）
+    job_workers_enabled: bool = True
+    job_worker_concurrency: int = 4
+    job_max_retries: int = 3
+    job_retry_backoff_seconds: float = 2.0
+    job_result_ttl_seconds: int = 86400
+    job_poll_interval_seconds: float = 0.5
+    job_lease_timeout_seconds: float = 60.0  # 超过该时间未续约的运行中作业视为丢失并重新排队
+
     # CORS配置
     allowed_origins: List[str] = ["http://localhost:3000"]
 
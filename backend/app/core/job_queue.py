@@ -0,0 +1,745 @@
+"""后台作业队列
+
+作业记录保存在 Redis 哈希中，待执行的作业ID在列表中排队，等待重试的作业
+按可执行时间放在有序集合里。取出的作业移入处理中列表并持有租约，执行期间
+定期续约；进程退出或失去响应导致租约过期的作业会被重新排队。
+JobWorkerPool 在事件循环中运行固定数量的工作协程，并发数即协程数；
+同步处理函数放到线程中执行，不阻塞事件循环。
+
+队列只依赖 redis.Redis（decode_responses=True）的一小部分命令，
+InMemoryRedis 在进程内实现了同样的命令，可用于测试和没有 Redis 的本地开发。
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    """作业状态枚举"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+# 不会再变化的状态，进入后开始计算结果保留时间
+FINISHED_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class NonRetryableJobError(Exception):
+    """处理函数抛出此异常时作业直接失败，不再重试（例如参数错误、认证失败）"""
+
+
+@dataclass
+class Job:
+    """作业记录"""
+    job_id: str
+    job_type: str
+    payload: Dict[str, Any]
+    user_id: Optional[int] = None
+    status: JobStatus = JobStatus.QUEUED
+    attempts: int = 0
+    max_retries: int = 0
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_hash(self) -> Dict[str, str]:
+        """转换为 Redis 哈希字段"""
+        return {
+            "job_id": self.job_id,
+            "job_type": self.job_type,
+            "payload": json.dumps(self.payload, ensure_ascii=False),
+            "user_id": "" if self.user_id is None else str(self.user_id),
+            "status": self.status.value,
+            "attempts": str(self.attempts),
+            "max_retries": str(self.max_retries),
+            "result": json.dumps(self.result, ensure_ascii=False),
+            "error": self.error or "",
+            "created_at": repr(self.created_at),
+            "started_at": "" if self.started_at is None else repr(self.started_at),
+            "finished_at": "" if self.finished_at is None else repr(self.finished_at)
+        }
+
+    @classmethod
+    def from_hash(cls, data: Dict[str, str]) -> "Job":
+        """由 Redis 哈希字段还原"""
+        return cls(
+            job_id=data["job_id"],
+            job_type=data["job_type"],
+            payload=json.loads(data["payload"]),
+            user_id=int(data["user_id"]) if data.get("user_id") else None,
+            status=JobStatus(data["status"]),
+            attempts=int(data.get("attempts", 0)),
+            max_retries=int(data.get("max_retries", 0)),
+            result=json.loads(data["result"]) if data.get("result") else None,
+            error=data.get("error") or None,
+            created_at=float(data["created_at"]),
+            started_at=float(data["started_at"]) if data.get("started_at") else None,
+            finished_at=float(data["finished_at"]) if data.get("finished_at") else None
+        )
+
+    @property
+    def is_finished(self) -> bool:
+        """作业是否已结束"""
+        return self.status in FINISHED_STATUSES
+
+
+class JobQueue:
+    """基于 Redis 的作业队列
+
+    入队时写入作业哈希并把ID推入队列；取出时用 LMOVE 把ID原子地移入处理中列表，
+    并在租约有序集合中记录租约到期时间，工作进程执行期间调用 heartbeat 续约。
+    作业结束或放回队列时释放租约。租约过期（进程退出、取出后被中断）的作业
+    由 reap_expired_claims 按一次失败处理：未超过重试次数时重新排队，
+    收到过取消请求的直接标记为已取消。因此作业至少执行一次，可能重复执行。
+    取消排队中的作业时从队列中删除其ID，删除成功才标记为已取消，
+    因此不会与取出作业的工作进程冲突；运行中的作业只记录取消请求，
+    由执行它的工作池中止。失败的作业按指数退避重新排队，
+    超过重试次数后标记为失败。结束的作业在 result_ttl 秒后过期。
+    """
+
+    def __init__(self, redis, namespace: str = "jobs", result_ttl: int = 86400,
+                 max_retries: int = 3, retry_backoff: float = 2.0,
+                 lease_timeout: float = 60.0):
+        """初始化作业队列
+
+        Args:
+            redis: redis.Redis 实例（decode_responses=True）或 InMemoryRedis
+            namespace (str): 键名前缀
+            result_ttl (int): 作业结束后记录与结果的保留秒数
+            max_retries (int): 默认的最大重试次数
+            retry_backoff (float): 第一次重试前的等待秒数，之后每次加倍
+            lease_timeout (float): 租约时长（秒），超过该时间未续约的作业视为丢失
+        """
+        self.redis = redis
+        self.namespace = namespace
+        self.result_ttl = result_ttl
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.lease_timeout = lease_timeout
+        self.queue_key = f"{namespace}:queue"
+        self.delayed_key = f"{namespace}:delayed"
+        self.processing_key = f"{namespace}:processing"
+        self.leases_key = f"{namespace}:leases"
+
+    def _get_job_key(self, job_id: str) -> str:
+        """生成作业在Redis中的键名"""
+        return f"{self.namespace}:job:{job_id}"
+
+    def _get_cancel_key(self, job_id: str) -> str:
+        """生成作业取消请求在Redis中的键名"""
+        return f"{self.namespace}:cancel:{job_id}"
+
+    def _save(self, job: Job, release: bool = False) -> None:
+        """保存作业记录，结束的作业设置过期时间；release 为 True 时同时释放租约"""
+        job_key = self._get_job_key(job.job_id)
+        pipeline = self.redis.pipeline()
+        if release:
+            pipeline.lrem(self.processing_key, 0, job.job_id)
+            pipeline.zrem(self.leases_key, job.job_id)
+        pipeline.hset(job_key, mapping=job.to_hash())
+        if job.is_finished:
+            pipeline.expire(job_key, self.result_ttl)
+            pipeline.delete(self._get_cancel_key(job.job_id))
+        pipeline.execute()
+
+    def enqueue(self, job_type: str, payload: Dict[str, Any], user_id: Optional[int] = None,
+                max_retries: Optional[int] = None) -> Job:
+        """提交作业
+
+        Args:
+            job_type (str): 作业类型，对应工作池中注册的处理函数
+            payload (Dict[str, Any]): 作业参数，必须可以序列化为JSON
+            user_id (Optional[int]): 提交作业的用户ID
+            max_retries (Optional[int]): 最大重试次数，默认使用队列的设置
+
+        Returns:
+            Job: 新的作业记录
+        """
+        job = Job(
+            job_id=uuid.uuid4().hex,
+            job_type=job_type,
+            payload=payload,
+            user_id=user_id,
+            max_retries=self.max_retries if max_retries is None else max_retries
+        )
+        self._save(job)
+        self.redis.lpush(self.queue_key, job.job_id)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """获取作业记录
+
+        Args:
+            job_id (str): 作业ID
+
+        Returns:
+            Optional[Job]: 作业记录，不存在或已过期时为None
+        """
+        data = self.redis.hgetall(self._get_job_key(job_id))
+        return Job.from_hash(data) if data else None
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """取消作业
+
+        排队或等待重试的作业立即取消；运行中的作业记录取消请求，
+        由执行它的工作池中止；已结束的作业保持不变。
+
+        Args:
+            job_id (str): 作业ID
+
+        Returns:
+            Optional[Job]: 取消后的作业记录，不存在时为None
+        """
+        job = self.get(job_id)
+        if job is None or job.is_finished:
+            return job
+
+        removed = self.redis.lrem(self.queue_key, 0, job_id)
+        removed += self.redis.zrem(self.delayed_key, job_id)
+        if removed:
+            job.status = JobStatus.CANCELLED
+            job.finished_at = time.time()
+            self._save(job)
+        else:
+            self.redis.set(self._get_cancel_key(job_id), "1", ex=self.result_ttl)
+        return job
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        """运行中的作业是否收到了取消请求"""
+        return bool(self.redis.exists(self._get_cancel_key(job_id)))
+
+    def heartbeat(self, job_id: str) -> None:
+        """为运行中的作业续约"""
+        self.redis.zadd(self.leases_key, {job_id: time.time() + self.lease_timeout})
+
+    def reap_expired_claims(self) -> int:
+        """
+        回收租约已过期的作业，返回回收的数量
+
+        处理中列表里还没有租约的作业（刚被取出、尚未写入租约）先补记一个租约，
+        避免与正在取出它的工作进程冲突。
+        """
+        now = time.time()
+        reaped = 0
+        for job_id in self.redis.lrange(self.processing_key, 0, -1):
+            deadline = self.redis.zscore(self.leases_key, job_id)
+            if deadline is None:
+                self.redis.zadd(self.leases_key, {job_id: now + self.lease_timeout}, nx=True)
+                continue
+            if deadline > now:
+                continue
+            # 多个工作进程同时回收时，只有从处理中列表删除成功的一方继续
+            if not self.redis.lrem(self.processing_key, 1, job_id):
+                continue
+            self.redis.zrem(self.leases_key, job_id)
+            job = self.get(job_id)
+            if job is None or job.is_finished:
+                continue
+            if self.is_cancel_requested(job_id):
+                self.mark_cancelled(job)
+            else:
+                logger.warning(f"作业 {job_id} 的租约已过期，按一次失败处理")
+                self.fail(job, "租约过期：执行作业的进程已退出或失去响应")
+            reaped += 1
+        return reaped
+
+    def promote_due_retries(self) -> int:
+        """把到达重试时间的作业放回队列，返回移动的数量"""
+        moved = 0
+        for job_id in self.redis.zrangebyscore(self.delayed_key, 0, time.time()):
+            # 多个工作进程同时移动时，只有删除成功的一方放回队列
+            if self.redis.zrem(self.delayed_key, job_id):
+                self.redis.lpush(self.queue_key, job_id)
+                moved += 1
+        return moved
+
+    def claim(self) -> Optional[Job]:
+        """取出下一个可执行的作业并标记为运行中
+
+        Returns:
+            Optional[Job]: 作业记录，队列为空时为None
+        """
+        self.reap_expired_claims()
+        self.promote_due_retries()
+        while True:
+            job_id = self.redis.lmove(self.queue_key, self.processing_key, "RIGHT", "LEFT")
+            if job_id is None:
+                return None
+            self.heartbeat(job_id)
+            job = self.get(job_id)
+            # 记录已过期或作业已结束时跳过
+            if job is None or job.is_finished:
+                pipeline = self.redis.pipeline()
+                pipeline.lrem(self.processing_key, 0, job_id)
+                pipeline.zrem(self.leases_key, job_id)
+                pipeline.execute()
+                continue
+            job.status = JobStatus.RUNNING
+            job.attempts += 1
+            job.started_at = time.time()
+            self._save(job)
+            return job
+
+    def complete(self, job: Job, result: Any) -> None:
+        """记录作业成功及其结果"""
+        job.status = JobStatus.SUCCEEDED
+        job.result = result
+        job.error = None
+        job.finished_at = time.time()
+        self._save(job, release=True)
+
+    def fail(self, job: Job, error: str, retry: bool = True) -> None:
+        """记录一次失败，未超过重试次数时按指数退避重新排队
+
+        Args:
+            job (Job): 作业记录
+            error (str): 错误信息
+            retry (bool): 是否允许重试
+        """
+        job.error = error
+        if retry and job.attempts <= job.max_retries:
+            job.status = JobStatus.QUEUED
+            self._save(job, release=True)
+            delay = self.retry_backoff * (2 ** (job.attempts - 1))
+            self.redis.zadd(self.delayed_key, {job.job_id: time.time() + delay})
+            return
+        job.status = JobStatus.FAILED
+        job.finished_at = time.time()
+        self._save(job, release=True)
+
+    def requeue(self, job: Job) -> None:
+        """把被中断（而非失败）的作业放回队列，不计入执行次数"""
+        job.status = JobStatus.QUEUED
+        job.attempts -= 1
+        job.started_at = None
+        self._save(job, release=True)
+        self.redis.rpush(self.queue_key, job.job_id)
+
+    def mark_cancelled(self, job: Job) -> None:
+        """记录运行中的作业已按请求中止"""
+        job.status = JobStatus.CANCELLED
+        job.finished_at = time.time()
+        self._save(job, release=True)
+
+
+# 处理函数：接收作业记录，返回可序列化为JSON的结果；可以是同步函数或协程函数
+JobHandler = Callable[[Job], Union[Any, Awaitable[Any]]]
+
+
+class JobWorkerPool:
+    """作业工作池
+
+    启动 concurrency 个工作协程，每个协程依次取出并执行作业，
+    因此同时运行的作业数不超过 concurrency。队列操作与同步处理函数
+    都在线程中执行。运行中的作业每隔 cancel_check_interval 秒续约并检查一次取消请求，
+    该间隔应明显小于队列的 lease_timeout；同步处理函数所在的线程无法被中断，
+    取消后其结果会被丢弃。
+    """
+
+    def __init__(self, queue: JobQueue, handlers: Optional[Dict[str, JobHandler]] = None,
+                 concurrency: int = 4, poll_interval: float = 0.5,
+                 cancel_check_interval: float = 1.0):
+        """初始化工作池
+
+        Args:
+            queue (JobQueue): 作业队列
+            handlers (Optional[Dict[str, JobHandler]]): 作业类型 -> 处理函数
+            concurrency (int): 工作协程数量
+            poll_interval (float): 队列为空时的轮询间隔（秒）
+            cancel_check_interval (float): 检查取消请求的间隔（秒）
+        """
+        self.queue = queue
+        self.handlers: Dict[str, JobHandler] = dict(handlers or {})
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.cancel_check_interval = cancel_check_interval
+        self._workers: List[asyncio.Task] = []
+        self._stopping = False
+
+    def register(self, job_type: str, handler: JobHandler) -> None:
+        """注册作业类型的处理函数"""
+        self.handlers[job_type] = handler
+
+    @property
+    def running(self) -> bool:
+        """工作池是否在运行"""
+        return bool(self._workers)
+
+    async def start(self) -> None:
+        """启动工作协程"""
+        if self._workers:
+            return
+        self._stopping = False
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        """停止工作协程，正在运行的作业被中止并重新排队"""
+        self._stopping = True
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def run_until_empty(self) -> None:
+        """以 concurrency 的并发执行当前可执行的全部作业后返回，用于测试与脚本"""
+        async def drain() -> None:
+            while True:
+                job = await self._claim()
+                if job is None:
+                    return
+                await self._execute(job)
+
+        await asyncio.gather(*(drain() for _ in range(self.concurrency)))
+
+    async def _claim(self) -> Optional[Job]:
+        """在线程中取出作业；等待期间被取消时，等取出完成后把取到的作业放回队列"""
+        claim = asyncio.ensure_future(asyncio.to_thread(self.queue.claim))
+        try:
+            return await asyncio.shield(claim)
+        except asyncio.CancelledError:
+            job = await claim
+            if job is not None:
+                await asyncio.to_thread(self.queue.requeue, job)
+            raise
+
+    async def _work(self) -> None:
+        """工作协程主循环"""
+        while not self._stopping:
+            try:
+                job = await self._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"取出作业失败: {e}")
+                job = None
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await self._execute(job)
+
+    async def _execute(self, job: Job) -> None:
+        """执行单个作业并记录结果"""
+        handler = self.handlers.get(job.job_type)
+        if handler is None:
+            await asyncio.to_thread(self.queue.fail, job, f"未知的作业类型: {job.job_type}", False)
+            return
+
+        if inspect.iscoroutinefunction(handler):
+            task = asyncio.create_task(handler(job))
+        else:
+            task = asyncio.create_task(asyncio.to_thread(handler, job))
+
+        cancel_requested = False
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=self.cancel_check_interval)
+                if done:
+                    break
+                await asyncio.to_thread(self.queue.heartbeat, job.job_id)
+                if await asyncio.to_thread(self.queue.is_cancel_requested, job.job_id):
+                    cancel_requested = True
+                    break
+        except asyncio.CancelledError:
+            # 工作池停止：中止作业并放回队列，不计入失败
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await asyncio.to_thread(self.queue.requeue, job)
+            raise
+
+        # 取消请求在放回队列的保护范围之外处理，工作池此时停止不会把已取消的作业重新排队
+        if cancel_requested:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await asyncio.to_thread(self.queue.mark_cancelled, job)
+            return
+
+        try:
+            result = task.result()
+        except asyncio.CancelledError:
+            await asyncio.to_thread(self.queue.mark_cancelled, job)
+            return
+        except NonRetryableJobError as e:
+            await asyncio.to_thread(self.queue.fail, job, str(e), False)
+            return
+        except Exception as e:
+            logger.warning(f"作业 {job.job_id} 第 {job.attempts} 次执行失败: {e}")
+            await asyncio.to_thread(self.queue.fail, job, f"{type(e).__name__}: {e}")
+            return
+
+        try:
+            json.dumps(result)
+        except (TypeError, ValueError) as e:
+            await asyncio.to_thread(self.queue.fail, job, f"结果无法序列化为JSON: {e}", False)
+            return
+        await asyncio.to_thread(self.queue.complete, job, result)
+
+
+class _InMemoryPipeline:
+    """InMemoryRedis 的管道：缓存命令，execute 时在锁内依次执行"""
+
+    def __init__(self, redis: "InMemoryRedis"):
+        self._redis = redis
+        self._commands: List[tuple] = []
+
+    def __getattr__(self, name: str):
+        def command(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+        return command
+
+    def execute(self) -> List[Any]:
+        with self._redis._lock:
+            results = [getattr(self._redis, name)(*args, **kwargs)
+                       for name, args, kwargs in self._commands]
+        self._commands = []
+        return results
+
+
+class InMemoryRedis:
+    """进程内的 Redis 替身
+
+    实现 JobQueue 与排期缓存用到的字符串、哈希、列表、有序集合命令以及过期时间，
+    行为与 decode_responses=True 的 redis.Redis 相同。线程安全，数据不持久化。
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def _live(self, name: str) -> bool:
+        """键是否存在，顺带清除已过期的键"""
+        expires = self._expires.get(name)
+        if expires is not None and expires <= time.time():
+            self._data.pop(name, None)
+            self._expires.pop(name, None)
+        return name in self._data
+
+    def _get(self, name: str, kind: type):
+        if not self._live(name):
+            return None
+        value = self._data[name]
+        if not isinstance(value, kind):
+            raise TypeError(f"WRONGTYPE {name}")
+        return value
+
+    def pipeline(self) -> _InMemoryPipeline:
+        return _InMemoryPipeline(self)
+
+    def ping(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
+
+    # ---- 键 ----
+
+    def exists(self, *names: str) -> int:
+        with self._lock:
+            return sum(1 for name in names if self._live(name))
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            removed = 0
+            for name in names:
+                if self._live(name):
+                    del self._data[name]
+                    removed += 1
+                self._expires.pop(name, None)
+            return removed
+
+    def expire(self, name: str, seconds: int) -> bool:
+        with self._lock:
+            if not self._live(name):
+                return False
+            self._expires[name] = time.time() + seconds
+            return True
+
+    def ttl(self, name: str) -> int:
+        with self._lock:
+            if not self._live(name):
+                return -2
+            expires = self._expires.get(name)
+            return -1 if expires is None else max(0, int(round(expires - time.time())))
+
+    # ---- 字符串 ----
+
+    def get(self, name: str) -> Optional[str]:
+        with self._lock:
+            return self._get(name, str)
+
+    def set(self, name: str, value, ex: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        with self._lock:
+            if nx and self._live(name):
+                return None
+            self._data[name] = str(value)
+            self._expires.pop(name, None)
+            if ex is not None:
+                self._expires[name] = time.time() + ex
+            return True
+
+    def setex(self, name: str, seconds: int, value) -> bool:
+        return self.set(name, value, ex=seconds)
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        with self._lock:
+            value = int(self._get(name, str) or 0) + amount
+            self._data[name] = str(value)
+            return value
+
+    # ---- 哈希 ----
+
+    def hset(self, name: str, key: Optional[str] = None, value=None,
+             mapping: Optional[Dict[str, Any]] = None) -> int:
+        with self._lock:
+            fields = self._get(name, dict)
+            if fields is None:
+                fields = self._data[name] = {}
+            items = dict(mapping or {})
+            if key is not None:
+                items[key] = value
+            added = sum(1 for field_name in items if field_name not in fields)
+            fields.update({field_name: str(field_value) for field_name, field_value in items.items()})
+            return added
+
+    def hget(self, name: str, key: str) -> Optional[str]:
+        with self._lock:
+            fields = self._get(name, dict)
+            return fields.get(key) if fields else None
+
+    def hgetall(self, name: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._get(name, dict) or {})
+
+    # ---- 列表 ----
+
+    def lpush(self, name: str, *values) -> int:
+        with self._lock:
+            items = self._get(name, list)
+            if items is None:
+                items = self._data[name] = []
+            for value in values:
+                items.insert(0, str(value))
+            return len(items)
+
+    def rpush(self, name: str, *values) -> int:
+        with self._lock:
+            items = self._get(name, list)
+            if items is None:
+                items = self._data[name] = []
+            items.extend(str(value) for value in values)
+            return len(items)
+
+    def rpop(self, name: str) -> Optional[str]:
+        with self._lock:
+            items = self._get(name, list)
+            if not items:
+                return None
+            value = items.pop()
+            if not items:
+                self.delete(name)
+            return value
+
+    def lmove(self, source: str, destination: str, src: str = "LEFT",
+              dest: str = "RIGHT") -> Optional[str]:
+        with self._lock:
+            items = self._get(source, list)
+            if not items:
+                return None
+            value = items.pop(0 if src == "LEFT" else -1)
+            if not items:
+                self.delete(source)
+            if dest == "LEFT":
+                self.lpush(destination, value)
+            else:
+                self.rpush(destination, value)
+            return value
+
+    def lrange(self, name: str, start: int, end: int) -> List[str]:
+        with self._lock:
+            items = self._get(name, list) or []
+            end = len(items) + end if end < 0 else end
+            return items[start:end + 1]
+
+    def llen(self, name: str) -> int:
+        with self._lock:
+            return len(self._get(name, list) or ())
+
+    def lrem(self, name: str, count: int, value) -> int:
+        with self._lock:
+            items = self._get(name, list)
+            if not items:
+                return 0
+            value = str(value)
+            # count 为 0 时删除全部，正数从头、负数从尾删除前 |count| 个，与 Redis 相同
+            order = range(len(items)) if count >= 0 else range(len(items) - 1, -1, -1)
+            drop = [i for i in order if items[i] == value]
+            if count:
+                drop = drop[:abs(count)]
+            dropped = set(drop)
+            items[:] = [item for i, item in enumerate(items) if i not in dropped]
+            if not items:
+                self.delete(name)
+            return len(drop)
+
+    # ---- 有序集合 ----
+
+    def zadd(self, name: str, mapping: Dict[str, float], nx: bool = False) -> int:
+        with self._lock:
+            members = self._get(name, dict)
+            if members is None:
+                members = self._data[name] = {}
+            added = sum(1 for member in mapping if str(member) not in members)
+            members.update({str(member): float(score) for member, score in mapping.items()
+                            if not (nx and str(member) in members)})
+            return added
+
+    def zscore(self, name: str, value) -> Optional[float]:
+        with self._lock:
+            members = self._get(name, dict)
+            return members.get(str(value)) if members else None
+
+    def zrem(self, name: str, *values) -> int:
+        with self._lock:
+            members = self._get(name, dict)
+            if not members:
+                return 0
+            removed = sum(1 for value in values if members.pop(str(value), None) is not None)
+            if not members:
+                self.delete(name)
+            return removed
+
+    def zcard(self, name: str) -> int:
+        with self._lock:
+            return len(self._get(name, dict) or ())
+
+    def _sorted_members(self, name: str) -> List[str]:
+        members = self._get(name, dict) or {}
+        return [member for member, _ in sorted(members.items(), key=lambda item: (item[1], item[0]))]
+
+    def zrange(self, name: str, start: int, end: int) -> List[str]:
+        with self._lock:
+            ordered = self._sorted_members(name)
+            end = len(ordered) + end if end < 0 else end
+            return ordered[start:end + 1]
+
+    def zrangebyscore(self, name: str, min, max) -> List[str]:
+        with self._lock:
+            members = self._get(name, dict) or {}
+            return [member for member in self._sorted_members(name)
+                    if float(min) <= members[member] <= float(max)]
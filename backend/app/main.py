@@ -19,6 +19,7 @@ from .api.v1 import api_router
 from .schemas.base import ErrorResponse
 from .utils.snowflake import init_snowflake_generator
 from .core.redis_client import RedisClient
+from .services.job_service import create_worker_pool
 
 # 获取配置
 settings = get_settings()
@@ -73,6 +74,12 @@ async def lifespan(app: FastAPI):
             logger.error("Redis连接失败")
             raise Exception("Redis连接失败")
         
+        # 启动后台作业工作池
+        if settings.job_workers_enabled:
+            logger.info("启动后台作业工作池...")
+            app.state.job_pool = create_worker_pool()
+            await app.state.job_pool.start()
+        
         logger.info("应用启动完成")
         
     except Exception as e:
@@ -83,6 +90,15 @@ async def lifespan(app: FastAPI):
     
     # 关闭时执行
     logger.info("应用关闭中...")
+    job_pool = getattr(app.state, "job_pool", None)
+    if job_pool is not None:
+        try:
+            # 停止工作池，运行中的作业放回队列
+            logger.info("停止后台作业工作池...")
+            await job_pool.stop()
+        except Exception as e:
+            logger.error(f"停止后台作业工作池失败: {e}")
+    
     try:
         # 关闭Redis连接
         logger.info("关闭Redis连接...")
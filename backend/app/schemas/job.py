@@ -0,0 +1,54 @@
+"""后台作业相关的Pydantic模式"""
+
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+from .schedule import ScheduleRequest
+
+
+class JobCreate(BaseModel):
+    """提交作业模式"""
+
+    job_type: str = Field(..., min_length=1, max_length=50, description="作业类型 (schedule/schedule_batch/ai_chat)")
+    payload: Dict[str, Any] = Field(default_factory=dict, description="作业参数，格式取决于作业类型")
+    max_retries: Optional[int] = Field(None, ge=0, le=10, description="最大重试次数，默认使用服务配置")
+
+
+class JobResponse(BaseModel):
+    """作业状态响应模式"""
+
+    job_id: str = Field(..., description="作业ID")
+    job_type: str = Field(..., description="作业类型")
+    status: str = Field(..., description="作业状态 (queued/running/succeeded/failed/cancelled)")
+    attempts: int = Field(..., description="已执行次数")
+    max_retries: int = Field(..., description="最大重试次数")
+    error: Optional[str] = Field(None, description="最近一次失败的错误信息")
+    created_at: datetime = Field(..., description="提交时间")
+    started_at: Optional[datetime] = Field(None, description="最近一次开始执行的时间")
+    finished_at: Optional[datetime] = Field(None, description="结束时间")
+
+
+class JobResultResponse(BaseModel):
+    """作业结果响应模式"""
+
+    job_id: str = Field(..., description="作业ID")
+    status: str = Field(..., description="作业状态")
+    result: Any = Field(None, description="作业结果，仅在成功时存在")
+    error: Optional[str] = Field(None, description="失败时的错误信息")
+
+
+class ScheduleBatchRequest(BaseModel):
+    """批量排期作业参数模式（多个相互独立的排期输入，例如多个租户）"""
+
+    requests: List[ScheduleRequest] = Field(..., min_length=1, max_length=100, description="排期请求列表")
+
+
+class AIChatJobRequest(BaseModel):
+    """AI聊天作业参数模式（例如任务拆解）"""
+
+    messages: List[Dict[str, str]] = Field(..., min_length=1, description="消息列表")
+    model: str = Field(default="gpt-3.5-turbo", description="模型名称")
+    provider_id: Optional[int] = Field(None, description="指定供应商ID（雪花ID）")
+    temperature: Optional[float] = Field(None, ge=0, le=2, description="温度参数")
+    max_tokens: Optional[int] = Field(None, gt=0, description="最大token数")
@@ -0,0 +1,96 @@
+"""任务排期相关的Pydantic模式"""
+
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from pydantic import BaseModel, Field, field_validator
+
+
+class ScheduleProject(BaseModel):
+    """排期项目模式"""
+
+    project_id: str = Field(..., min_length=1, max_length=100, description="项目ID")
+    name: str = Field(..., max_length=200, description="项目名称")
+    category: str = Field(..., max_length=100, description="项目类别")
+    priority: int = Field(default=2, ge=1, le=3, description="优先级 (1高/2中/3低)")
+    deadline: datetime = Field(..., description="项目截止时间")
+    status: str = Field(default="active", description="项目状态 (active/delayed/completed)")
+
+    @field_validator('status')
+    @classmethod
+    def validate_status(cls, v):
+        """验证项目状态"""
+        if v not in ("active", "delayed", "completed"):
+            raise ValueError('status必须是active、delayed或completed')
+        return v
+
+
+class ScheduleTask(BaseModel):
+    """排期任务模式"""
+
+    task_id: str = Field(..., min_length=1, max_length=100, description="任务ID")
+    project_id: str = Field(..., min_length=1, max_length=100, description="所属项目ID")
+    name: str = Field(..., max_length=200, description="任务名称")
+    estimated_hours: float = Field(..., ge=0, le=10000, description="预估工时")
+    remaining_hours: Optional[float] = Field(
+        None, ge=0, le=10000, description="剩余工时，默认等于预估工时")
+    status: str = Field(default="pending", description="任务状态 (pending/overdue/completed)")
+    due_date: Optional[datetime] = Field(None, description="任务截止时间")
+
+    @field_validator('status')
+    @classmethod
+    def validate_status(cls, v):
+        """验证任务状态"""
+        if v not in ("pending", "overdue", "completed"):
+            raise ValueError('status必须是pending、overdue或completed')
+        return v
+
+
+class ScheduleWeights(BaseModel):
+    """紧迫度权重模式"""
+
+    priority_weight: float = Field(default=2.0, ge=0, description="优先级权重")
+    deadline_weight: float = Field(default=3.0, ge=0, description="截止日期权重")
+    workload_weight: float = Field(default=1.5, ge=0, description="工作量权重")
+
+
+class ScheduleDiversityConfig(BaseModel):
+    """多样性配置模式"""
+
+    diversity_threshold: float = Field(default=0.1, ge=0, description="分数差距阈值")
+    look_ahead_count: int = Field(default=5, ge=0, le=1000, description="向前查看的任务数量")
+
+
+class ScheduleConfig(BaseModel):
+    """调度参数模式（与 test_data.json 中 scheduler_config 的格式相同）"""
+
+    daily_work_hours: float = Field(default=8.0, gt=0, le=24, description="每日可用工作时间")
+    weights: ScheduleWeights = Field(default_factory=ScheduleWeights, description="紧迫度权重")
+    diversity_config: ScheduleDiversityConfig = Field(
+        default_factory=ScheduleDiversityConfig, description="多样性配置")
+
+
+class ScheduleRequest(BaseModel):
+    """排期请求模式"""
+
+    projects: List[ScheduleProject] = Field(..., description="项目列表")
+    tasks: List[ScheduleTask] = Field(..., description="任务列表，顺序决定同分任务的先后")
+    config: ScheduleConfig = Field(default_factory=ScheduleConfig, description="调度参数")
+    start_date: datetime = Field(..., description="排期开始时间")
+    max_days: int = Field(default=30, ge=1, description="最大排期天数")
+
+
+class ScheduleResponse(BaseModel):
+    """排期结果模式"""
+
+    schedule: Dict[str, List[Dict[str, Any]]] = Field(..., description="日期 -> 排期条目列表")
+    summary: Dict[str, Any] = Field(..., description="排期摘要")
+    projects: Dict[str, Dict[str, Any]] = Field(..., description="排期后的项目状态")
+    tasks: Dict[str, Dict[str, Any]] = Field(..., description="排期后的任务状态")
+    cache_key: str = Field(..., description="请求内容的哈希")
+    cached: bool = Field(default=False, description="是否命中缓存")
+
+
+class ScheduleCacheInvalidation(BaseModel):
+    """排期缓存失效结果模式"""
+
+    removed: int = Field(..., description="删除的缓存条目数")
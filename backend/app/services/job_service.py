@@ -0,0 +1,187 @@
+"""后台作业服务"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+
+from ..core.job_queue import (
+    Job, JobQueue, JobWorkerPool, InMemoryRedis, NonRetryableJobError
+)
+from ..core.redis_client import RedisClient
+from ..config import get_settings
+from ..database import SessionLocal
+from ..schemas.job import JobResponse, ScheduleBatchRequest, AIChatJobRequest
+from ..schemas.schedule import ScheduleRequest
+from .schedule_service import ScheduleService, normalize_request, run_schedule
+from .ai_service import AIService
+
+settings = get_settings()
+
+# 作业类型 -> 参数模式，提交时据此校验参数
+JOB_PAYLOAD_SCHEMAS: Dict[str, Type[BaseModel]] = {
+    "schedule": ScheduleRequest,
+    "schedule_batch": ScheduleBatchRequest,
+    "ai_chat": AIChatJobRequest
+}
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """获取作业队列实例（单例）
+
+    Returns:
+        JobQueue: 使用 Redis 或进程内替身的作业队列
+    """
+    global _job_queue
+    if _job_queue is None:
+        redis = InMemoryRedis() if settings.job_backend == "memory" else RedisClient.get_instance()
+        _job_queue = JobQueue(
+            redis,
+            result_ttl=settings.job_result_ttl_seconds,
+            max_retries=settings.job_max_retries,
+            retry_backoff=settings.job_retry_backoff_seconds,
+            lease_timeout=settings.job_lease_timeout_seconds
+        )
+    return _job_queue
+
+
+def run_schedule_job(job: Job) -> Dict[str, Any]:
+    """排期作业：与 POST /api/v1/schedule 的计算相同
+
+    Args:
+        job (Job): 作业记录
+
+    Returns:
+        Dict[str, Any]: 排期结果
+    """
+    request = ScheduleRequest(**job.payload)
+    return run_schedule(normalize_request(request))
+
+
+def run_schedule_batch_job(job: Job) -> List[Dict[str, Any]]:
+    """批量排期作业：依次计算每个独立的排期输入
+
+    Args:
+        job (Job): 作业记录
+
+    Returns:
+        List[Dict[str, Any]]: 与输入顺序相同的排期结果
+    """
+    batch = ScheduleBatchRequest(**job.payload)
+    return [run_schedule(normalize_request(request)) for request in batch.requests]
+
+
+async def run_ai_chat_job(job: Job) -> Dict[str, Any]:
+    """AI聊天作业：以提交作业的用户身份调用聊天补全
+
+    Args:
+        job (Job): 作业记录
+
+    Returns:
+        Dict[str, Any]: 聊天补全结果
+    """
+    request = AIChatJobRequest(**job.payload)
+    kwargs = {}
+    if request.temperature is not None:
+        kwargs["temperature"] = request.temperature
+    if request.max_tokens is not None:
+        kwargs["max_tokens"] = request.max_tokens
+
+    db = SessionLocal()
+    try:
+        return await AIService(db).chat_completion(
+            user_id=job.user_id,
+            messages=request.messages,
+            model=request.model,
+            provider_id=request.provider_id,
+            stream=False,
+            **kwargs
+        )
+    except HTTPException as e:
+        # 限流与服务端错误可以重试，其余（供应商不存在、认证失败等）直接失败
+        if e.status_code == status.HTTP_429_TOO_MANY_REQUESTS or e.status_code >= 500:
+            raise
+        raise NonRetryableJobError(e.detail)
+    finally:
+        db.close()
+
+
+def create_worker_pool(queue: Optional[JobQueue] = None) -> JobWorkerPool:
+    """创建注册了全部作业类型的工作池
+
+    Args:
+        queue (Optional[JobQueue]): 作业队列，默认使用 get_job_queue()
+
+    Returns:
+        JobWorkerPool: 尚未启动的工作池
+    """
+    return JobWorkerPool(
+        queue or get_job_queue(),
+        handlers={
+            "schedule": run_schedule_job,
+            "schedule_batch": run_schedule_batch_job,
+            "ai_chat": run_ai_chat_job
+        },
+        concurrency=settings.job_worker_concurrency,
+        poll_interval=settings.job_poll_interval_seconds
+    )
+
+
+def validate_job_payload(job_type: str, payload: Dict[str, Any]) -> None:
+    """提交前校验作业类型、参数与规模
+
+    Args:
+        job_type (str): 作业类型
+        payload (Dict[str, Any]): 作业参数
+
+    Raises:
+        HTTPException: 类型未知（400）、参数不合法（422）或规模超出限制（413）时抛出
+    """
+    schema = JOB_PAYLOAD_SCHEMAS.get(job_type)
+    if schema is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"未知的作业类型: {job_type}，可选值: {list(JOB_PAYLOAD_SCHEMAS)}"
+        )
+    try:
+        request = schema(**payload)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.errors()
+        )
+
+    if isinstance(request, ScheduleRequest):
+        ScheduleService.check_limits(request)
+    elif isinstance(request, ScheduleBatchRequest):
+        for schedule_request in request.requests:
+            ScheduleService.check_limits(schedule_request)
+
+
+def _timestamp(value: Optional[float]) -> Optional[datetime]:
+    return datetime.utcfromtimestamp(value) if value is not None else None
+
+
+def to_job_response(job: Job) -> JobResponse:
+    """转换为作业状态响应
+
+    Args:
+        job (Job): 作业记录
+
+    Returns:
+        JobResponse: 作业状态（不含结果）
+    """
+    return JobResponse(
+        job_id=job.job_id,
+        job_type=job.job_type,
+        status=job.status.value,
+        attempts=job.attempts,
+        max_retries=job.max_retries,
+        error=job.error,
+        created_at=_timestamp(job.created_at),
+        started_at=_timestamp(job.started_at),
+        finished_at=_timestamp(job.finished_at)
+    )
@@ -0,0 +1,347 @@
+"""任务排期服务"""
+
+import hashlib
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from redis.exceptions import WatchError
+
+from ..core.redis_client import RedisClient
+from ..config import get_settings
+from ..schemas.schedule import ScheduleRequest
+
+# 调度算法位于仓库根目录
+_REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.append(str(_REPO_ROOT))
+
+from task_scheduler import (  # noqa: E402
+    TaskScheduler, Project, Task, Priority, ProjectStatus, TaskStatus
+)
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# 缓存内容版本，排期算法或结果格式变化时递增，旧的缓存条目随之失效
+SCHEDULE_CACHE_VERSION = 1
+
+
+def _normalize_datetime(value: Optional[datetime]) -> Optional[str]:
+    """带时区的时间换算为 UTC 后去掉时区，与调度器使用的无时区时间统一"""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+def normalize_request(request: ScheduleRequest) -> Dict[str, Any]:
+    """规范化排期请求
+
+    补齐缺省值、统一时间与数值格式。项目与任务保持请求中的顺序，
+    因为任务顺序决定同分任务的先后，属于排期输入的一部分。
+
+    Args:
+        request (ScheduleRequest): 排期请求
+
+    Returns:
+        Dict[str, Any]: 可以直接序列化的规范化输入
+    """
+    config = request.config
+    return {
+        "config": {
+            "daily_work_hours": float(config.daily_work_hours),
+            "weights": {
+                "priority_weight": float(config.weights.priority_weight),
+                "deadline_weight": float(config.weights.deadline_weight),
+                "workload_weight": float(config.weights.workload_weight)
+            },
+            "diversity_config": {
+                "diversity_threshold": float(config.diversity_config.diversity_threshold),
+                "look_ahead_count": config.diversity_config.look_ahead_count
+            }
+        },
+        "start_date": _normalize_datetime(request.start_date),
+        "max_days": request.max_days,
+        "projects": [
+            {
+                "project_id": project.project_id,
+                "name": project.name,
+                "category": project.category,
+                "priority": project.priority,
+                "deadline": _normalize_datetime(project.deadline),
+                "status": project.status
+            }
+            for project in request.projects
+        ],
+        "tasks": [
+            {
+                "task_id": task.task_id,
+                "project_id": task.project_id,
+                "name": task.name,
+                "estimated_hours": float(task.estimated_hours),
+                "remaining_hours": float(task.estimated_hours if task.remaining_hours is None
+                                         else task.remaining_hours),
+                "status": task.status,
+                "due_date": _normalize_datetime(task.due_date)
+            }
+            for task in request.tasks
+        ]
+    }
+
+
+def compute_cache_key(normalized: Dict[str, Any]) -> str:
+    """计算规范化输入的内容哈希
+
+    Args:
+        normalized (Dict[str, Any]): normalize_request 的结果
+
+    Returns:
+        str: SHA-256 十六进制摘要
+    """
+    content = json.dumps(
+        {"version": SCHEDULE_CACHE_VERSION, "input": normalized},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def run_schedule(normalized: Dict[str, Any]) -> Dict[str, Any]:
+    """在当前线程中运行调度器（CPU 密集，不要在事件循环中直接调用）
+
+    Args:
+        normalized (Dict[str, Any]): normalize_request 的结果
+
+    Returns:
+        Dict[str, Any]: TaskScheduler.export_schedule_to_dict 的结果
+    """
+    scheduler = TaskScheduler()
+    scheduler.configure(normalized["config"])
+
+    for data in normalized["projects"]:
+        scheduler.add_project(Project(
+            project_id=data["project_id"],
+            name=data["name"],
+            category=data["category"],
+            priority=Priority(data["priority"]),
+            deadline=datetime.fromisoformat(data["deadline"]),
+            status=ProjectStatus(data["status"])
+        ))
+    for data in normalized["tasks"]:
+        scheduler.add_task(Task(
+            task_id=data["task_id"],
+            project_id=data["project_id"],
+            name=data["name"],
+            estimated_hours=data["estimated_hours"],
+            remaining_hours=data["remaining_hours"],
+            status=TaskStatus(data["status"]),
+            due_date=datetime.fromisoformat(data["due_date"]) if data["due_date"] else None
+        ))
+
+    start_date = datetime.fromisoformat(normalized["start_date"])
+    scheduler.generate_schedule(start_date, normalized["max_days"])
+    return scheduler.export_schedule_to_dict()
+
+
+class ScheduleService:
+    """任务排期服务类
+
+    结果按 用户 + 代数 + 内容哈希 缓存在 Redis 中。每个用户有一个代数计数器，
+    失效时递增代数并删除已有条目。请求在计算前读取一次代数，读缓存与写缓存都使用
+    这一代数；写入在 WATCH 代数键的事务中进行，代数已变化时放弃写入，
+    因此失效前开始计算的请求不会留下占用条目上限的旧条目。
+    单个结果超过 schedule_cache_max_bytes 时不缓存；每个用户最多保留
+    schedule_cache_max_entries_per_user 个条目，超出时淘汰最久未使用的。
+    Redis 不可用时直接计算，不影响排期本身。
+    """
+
+    def __init__(self):
+        self.redis = RedisClient.get_instance()
+        self.entry_prefix = "schedule_cache:"
+        self.index_prefix = "schedule_cache_index:"
+        self.generation_prefix = "schedule_cache_gen:"
+
+    def _get_generation(self, user_id: int) -> str:
+        """获取用户当前的缓存代数
+
+        Args:
+            user_id (int): 用户ID
+
+        Returns:
+            str: 缓存代数
+        """
+        return self.redis.get(f"{self.generation_prefix}{user_id}") or "0"
+
+    def _get_entry_key(self, user_id: int, generation: str, cache_key: str) -> str:
+        """生成缓存条目在Redis中的键名
+
+        Args:
+            user_id (int): 用户ID
+            generation (str): 缓存代数
+            cache_key (str): 内容哈希
+
+        Returns:
+            str: Redis键名
+        """
+        return f"{self.entry_prefix}{user_id}:{generation}:{cache_key}"
+
+    @staticmethod
+    def check_limits(request: ScheduleRequest) -> None:
+        """检查请求规模
+
+        Args:
+            request (ScheduleRequest): 排期请求
+
+        Raises:
+            HTTPException: 项目数、任务数或排期天数超出限制时抛出413
+        """
+        limits = (
+            ("项目数", len(request.projects), settings.schedule_max_projects),
+            ("任务数", len(request.tasks), settings.schedule_max_tasks),
+            ("排期天数", request.max_days, settings.schedule_max_days)
+        )
+        for name, value, limit in limits:
+            if value > limit:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"{name} {value} 超出限制 {limit}"
+                )
+
+    def get_cached(self, user_id: int, generation: str,
+                   cache_key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存的排期结果
+
+        Args:
+            user_id (int): 用户ID
+            generation (str): 请求开始时读取的缓存代数
+            cache_key (str): 内容哈希
+
+        Returns:
+            Optional[Dict[str, Any]]: 排期结果或None
+        """
+        try:
+            entry_key = self._get_entry_key(user_id, generation, cache_key)
+            payload = self.redis.get(entry_key)
+            if payload is None:
+                return None
+            # 记录访问时间，用于淘汰最久未使用的条目
+            self.redis.zadd(f"{self.index_prefix}{user_id}", {entry_key: time.time()})
+            return json.loads(payload)
+        except Exception as e:
+            logger.warning(f"读取排期缓存失败: {e}")
+            return None
+
+    def store(self, user_id: int, generation: str, cache_key: str,
+              result: Dict[str, Any]) -> bool:
+        """缓存排期结果
+
+        Args:
+            user_id (int): 用户ID
+            generation (str): 请求开始时读取的缓存代数（不在计算完成后重新读取）
+            cache_key (str): 内容哈希
+            result (Dict[str, Any]): 排期结果
+
+        Returns:
+            bool: 是否写入了缓存（代数已变化时不写入）
+        """
+        payload = json.dumps(result, ensure_ascii=False, separators=(",", ":"))
+        if len(payload.encode("utf-8")) > settings.schedule_cache_max_bytes:
+            return False
+
+        try:
+            ttl = settings.schedule_cache_ttl_seconds
+            index_key = f"{self.index_prefix}{user_id}"
+            generation_key = f"{self.generation_prefix}{user_id}"
+            entry_key = self._get_entry_key(user_id, generation, cache_key)
+
+            with self.redis.pipeline() as pipeline:
+                # 计算期间用户缓存已失效时不再写入，避免旧条目挤占新代数的条目
+                pipeline.watch(generation_key)
+                if (pipeline.get(generation_key) or "0") != generation:
+                    return False
+                pipeline.multi()
+                pipeline.setex(entry_key, ttl, payload)
+                pipeline.zadd(index_key, {entry_key: time.time()})
+                pipeline.expire(index_key, ttl)
+                pipeline.zcard(index_key)
+                count = pipeline.execute()[-1]
+
+            # 超出条目上限时淘汰最久未使用的条目
+            excess = count - settings.schedule_cache_max_entries_per_user
+            if excess > 0:
+                evicted = self.redis.zrange(index_key, 0, excess - 1)
+                if evicted:
+                    pipeline = self.redis.pipeline()
+                    pipeline.delete(*evicted)
+                    pipeline.zrem(index_key, *evicted)
+                    pipeline.execute()
+            return True
+        except WatchError:
+            # 写入前代数被其他请求递增
+            return False
+        except Exception as e:
+            logger.warning(f"写入排期缓存失败: {e}")
+            return False
+
+    def invalidate_user(self, user_id: int) -> int:
+        """使用户的全部排期缓存失效
+
+        用户的任务或项目发生变化时调用。
+
+        Args:
+            user_id (int): 用户ID
+
+        Returns:
+            int: 删除的缓存条目数
+        """
+        index_key = f"{self.index_prefix}{user_id}"
+        self.redis.incr(f"{self.generation_prefix}{user_id}")
+        entries = self.redis.zrange(index_key, 0, -1)
+        pipeline = self.redis.pipeline()
+        if entries:
+            pipeline.delete(*entries)
+        pipeline.delete(index_key)
+        results = pipeline.execute()
+        return results[0] if entries else 0
+
+    async def schedule(self, request: ScheduleRequest, user_id: int) -> Dict[str, Any]:
+        """生成排期，相同输入直接返回缓存的结果
+
+        Args:
+            request (ScheduleRequest): 排期请求
+            user_id (int): 用户ID
+
+        Returns:
+            Dict[str, Any]: 排期结果，附带 cache_key 与 cached
+
+        Raises:
+            HTTPException: 请求规模超出限制时抛出异常
+        """
+        self.check_limits(request)
+        normalized = normalize_request(request)
+        cache_key = compute_cache_key(normalized)
+
+        # 代数只在计算前读取一次，计算期间发生的失效不会让旧结果写入新代数
+        try:
+            generation = await run_in_threadpool(self._get_generation, user_id)
+        except Exception as e:
+            logger.warning(f"读取排期缓存代数失败: {e}")
+            generation = None
+
+        if generation is not None:
+            result = await run_in_threadpool(self.get_cached, user_id, generation, cache_key)
+            if result is not None:
+                return {**result, "cache_key": cache_key, "cached": True}
+
+        # 排期计算在线程池中运行，不阻塞事件循环
+        result = await run_in_threadpool(run_schedule, normalized)
+        if generation is not None:
+            await run_in_threadpool(self.store, user_id, generation, cache_key, result)
+        return {**result, "cache_key": cache_key, "cached": False}
@@ -5,9 +5,9 @@
 提供交互式界面展示算法功能
 """
 
-import json
 from datetime import datetime, timedelta
 from task_scheduler import TaskScheduler, Project, Task, Priority, ProjectStatus, TaskStatus
+from scheduler_export import write_schedule_export
 
 
 class SchedulerDemo:
@@ -165,17 +165,15 @@ class SchedulerDemo:
     def export_schedule(self, filename: str) -> None:
         """导出排期结果"""
         try:
-            results = self.scheduler.export_schedule_to_dict()
-            
             # 添加导出元数据
-            results['export_metadata'] = {
+            metadata = {
                 'export_time': datetime.now().isoformat(),
                 'scheduler_version': '1.0',
                 'daily_work_hours': self.scheduler.daily_work_hours
             }
             
             with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(results, f, ensure_ascii=False, indent=2)
+                write_schedule_export(self.scheduler, f, extra={'export_metadata': metadata})
             
             print(f"✅ 排期结果已导出到 {filename}")
         except Exception as e:
@@ -206,10 +204,11 @@ class SchedulerDemo:
             # 随机完成一部分工作
             progress_ratio = random.uniform(0.2, 0.8)
             completed_hours = task.estimated_hours * progress_ratio
-            task.remaining_hours = max(0, task.estimated_hours - completed_hours)
+            self.scheduler.update_task_progress(
+                task.task_id, remaining_hours=max(0, task.estimated_hours - completed_hours))
             
             if task.remaining_hours == 0:
-                task.status = TaskStatus.COMPLETED
+                self.scheduler.update_task_progress(task.task_id, status=TaskStatus.COMPLETED)
                 status_text = "✅ 已完成"
             else:
                 status_text = f"⏳ 剩余 {task.remaining_hours:.1f}h"
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多租户批量排期
+将大量相互独立的 (项目, 任务, 配置) 输入分块交给进程池，并按输入顺序流式返回结果
+"""
+
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from task_scheduler import TaskScheduler, Project, Task, Priority, ProjectStatus, TaskStatus
+
+
+@dataclass
+class TenantInput:
+    """单个租户的排期输入"""
+    tenant_id: str
+    projects: List[Project]
+    tasks: List[Task]
+    start_date: datetime
+    config: Dict = field(default_factory=dict)  # scheduler_config 格式
+    max_days: int = 30
+
+
+@dataclass
+class TenantResult:
+    """单个租户的排期结果"""
+    tenant_id: str
+    schedule: Dict[str, List[Tuple[str, float]]]  # 日期 -> [(任务ID, 分配工时)]
+    summary: Dict
+    delayed_projects: List[str]
+    error: Optional[str] = None
+
+
+def _dumps(value) -> bytes:
+    """紧凑的 JSON 编码"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def encode_tenant(tenant: TenantInput) -> bytes:
+    """
+    将租户输入编码为紧凑的单行 JSON
+
+    项目和任务按固定字段顺序编码为数组，不依赖 pickle，
+    在进程间传递时只需复制字节串。
+    """
+    return _dumps([
+        tenant.tenant_id,
+        tenant.start_date.isoformat(),
+        tenant.max_days,
+        tenant.config,
+        [[p.project_id, p.name, p.category, p.priority.value,
+          p.deadline.isoformat(), p.status.value] for p in tenant.projects],
+        [[t.task_id, t.project_id, t.name, t.estimated_hours, t.remaining_hours,
+          t.status.value, t.due_date.isoformat() if t.due_date else None] for t in tenant.tasks],
+    ])
+
+
+def decode_tenant(payload: bytes) -> TenantInput:
+    """解码 encode_tenant 生成的租户输入"""
+    tenant_id, start_date, max_days, config, projects, tasks = json.loads(payload)
+    return TenantInput(
+        tenant_id=tenant_id,
+        projects=[
+            Project(pid, name, category, Priority(priority),
+                    datetime.fromisoformat(deadline), ProjectStatus(status))
+            for pid, name, category, priority, deadline, status in projects
+        ],
+        tasks=[
+            Task(tid, pid, name, estimated, remaining, TaskStatus(status),
+                 datetime.fromisoformat(due_date) if due_date else None)
+            for tid, pid, name, estimated, remaining, status, due_date in tasks
+        ],
+        start_date=datetime.fromisoformat(start_date),
+        config=config,
+        max_days=max_days
+    )
+
+
+def schedule_tenant(tenant: TenantInput) -> TenantResult:
+    """为单个租户生成排期"""
+    scheduler = TaskScheduler()
+    scheduler.configure(tenant.config)
+    for project in tenant.projects:
+        scheduler.add_project(project)
+    for task in tenant.tasks:
+        scheduler.add_task(task)
+
+    result = scheduler.simulate_schedule(tenant.start_date, tenant.max_days)
+    return TenantResult(
+        tenant_id=tenant.tenant_id,
+        schedule={
+            date: [(entry.task.task_id, entry.allocated_hours) for entry in entries]
+            for date, entries in result.schedule.items()
+        },
+        summary=result.get_summary(),
+        delayed_projects=[project.project_id for project in result.delayed_projects]
+    )
+
+
+def _encode_result(result: TenantResult) -> bytes:
+    """将租户结果编码为紧凑的单行 JSON"""
+    return _dumps([result.tenant_id, result.schedule, result.summary,
+                   result.delayed_projects, result.error])
+
+
+def _decode_result(payload: bytes) -> TenantResult:
+    """解码 _encode_result 生成的租户结果"""
+    tenant_id, schedule, summary, delayed_projects, error = json.loads(payload)
+    return TenantResult(
+        tenant_id=tenant_id,
+        schedule={date: [tuple(entry) for entry in entries] for date, entries in schedule.items()},
+        summary=summary,
+        delayed_projects=delayed_projects,
+        error=error
+    )
+
+
+def _schedule_chunk(blob: bytes) -> bytes:
+    """
+    工作进程入口：处理一个分块
+
+    输入和输出都是按行分隔的紧凑 JSON，单个租户出错不影响同一分块的其他租户。
+    """
+    results = []
+    for payload in blob.split(b'\n'):
+        try:
+            result = schedule_tenant(decode_tenant(payload))
+        except Exception as e:
+            # 载荷本身可能无法解析，提取租户 ID 失败时不能让异常逃出处理器
+            try:
+                tenant_id = json.loads(payload)[0]
+            except Exception:
+                tenant_id = ""
+            result = TenantResult(tenant_id, {}, {}, [], error=f"{type(e).__name__}: {e}")
+        results.append(_encode_result(result))
+    return b'\n'.join(results)
+
+
+def _iter_chunks(tenants: Iterable[TenantInput], chunk_size: int) -> Iterator[bytes]:
+    """将租户输入编码并按 chunk_size 个一组打包"""
+    iterator = iter(tenants)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield b'\n'.join(encode_tenant(tenant) for tenant in chunk)
+
+
+def schedule_tenants(tenants: Iterable[TenantInput],
+                     max_workers: Optional[int] = None,
+                     chunk_size: int = 64) -> Iterator[TenantResult]:
+    """
+    在进程池上批量排期，按输入顺序逐个产出结果
+
+    输入按需读取，同时在途的分块数限制为工作进程数的两倍，
+    因此可以处理任意长的租户流而不会一次性占满内存。
+
+    Args:
+        tenants: 租户输入（可以是生成器）
+        max_workers: 工作进程数，默认使用全部 CPU；为 1 时在当前进程内顺序执行
+        chunk_size: 每个分块包含的租户数
+
+    Yields:
+        与输入顺序一致的 TenantResult
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    chunks = _iter_chunks(tenants, chunk_size)
+
+    if max_workers == 1:
+        for blob in chunks:
+            for payload in _schedule_chunk(blob).split(b'\n'):
+                yield _decode_result(payload)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = deque()
+        for blob in islice(chunks, max_workers * 2):
+            in_flight.append(executor.submit(_schedule_chunk, blob))
+
+        while in_flight:
+            blob = in_flight.popleft().result()
+            for next_blob in islice(chunks, 1):
+                in_flight.append(executor.submit(_schedule_chunk, next_blob))
+            for payload in blob.split(b'\n'):
+                yield _decode_result(payload)
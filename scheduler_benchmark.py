@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+调度器性能基准
+用 scheduler_workload 的合成数据，在不同任务规模下计时主要操作，输出可在
+提交之间对比的 JSON 报告
+
+    python scheduler_benchmark.py --sizes 100 1000 10000 --output bench.json
+    python scheduler_benchmark.py --sizes 100 1000 10000 --compare bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+from task_scheduler import TaskScheduler, np
+from scheduler_workload import generate_workload, DEFAULT_START_DATE
+
+
+REPORT_VERSION = 1
+
+# 计时的操作，按执行顺序排列
+BENCHMARK_OPERATIONS = ("sort_tasks_by_urgency", "generate_schedule",
+                        "get_schedule_summary", "export_schedule_to_dict")
+
+# 默认的任务规模：10² 至 10⁶
+DEFAULT_SIZES = (100, 1000, 10000, 100000, 1000000)
+
+
+@dataclass(slots=True)
+class WorkloadSpec:
+    """合成数据与排期参数"""
+    seed: int = 0
+    num_categories: int = 6
+    deadline_days: int = 120
+    due_ratio: float = 0.7
+    overdue_ratio: float = 0.1
+    max_days: int = 30
+    daily_work_hours: float = 8.0
+    scoring_engine: str = "scalar"
+    selection_engine: str = "window"
+
+
+def _categories(count: int) -> List[str]:
+    return [f"类别{i}" for i in range(count)]
+
+
+def build_scheduler(num_tasks: int, spec: WorkloadSpec) -> TaskScheduler:
+    """按规格生成合成数据并载入新的调度器"""
+    projects, tasks = generate_workload(
+        num_tasks, spec.seed, start_date=DEFAULT_START_DATE,
+        categories=_categories(spec.num_categories), deadline_days=spec.deadline_days,
+        due_ratio=spec.due_ratio, overdue_ratio=spec.overdue_ratio)
+    scheduler = TaskScheduler(spec.daily_work_hours, scoring_engine=spec.scoring_engine,
+                              selection_engine=spec.selection_engine)
+    for project in projects:
+        scheduler.add_project(project)
+    for task in tasks:
+        scheduler.add_task(task)
+    return scheduler
+
+
+def _time(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def benchmark_size(num_tasks: int, spec: WorkloadSpec, repeat: int = 3) -> Dict:
+    """
+    在一个任务规模下计时各项操作
+
+    generate_schedule 会修改任务状态，因此每次重复都重新生成一份相同的数据；
+    sort_tasks_by_urgency 在排期前的状态上计时，摘要与导出在排期后计时。
+
+    Returns:
+        {"num_tasks", "scheduled_entries", "operations": {操作: {"best", "median", "runs"}}}
+    """
+    runs: Dict[str, List[float]] = {name: [] for name in BENCHMARK_OPERATIONS}
+    entries = 0
+    for _ in range(repeat):
+        scheduler = build_scheduler(num_tasks, spec)
+        pending = scheduler.get_pending_tasks()
+        runs["sort_tasks_by_urgency"].append(
+            _time(lambda: scheduler.sort_tasks_by_urgency(pending, DEFAULT_START_DATE)))
+        runs["generate_schedule"].append(
+            _time(lambda: scheduler.generate_schedule(DEFAULT_START_DATE, spec.max_days)))
+        runs["get_schedule_summary"].append(_time(scheduler.get_schedule_summary))
+        runs["export_schedule_to_dict"].append(_time(scheduler.export_schedule_to_dict))
+        entries = scheduler.schedule.entry_count
+        del scheduler, pending
+
+    return {
+        "num_tasks": num_tasks,
+        "scheduled_entries": entries,
+        "operations": {
+            name: {"best": min(times), "median": statistics.median(times), "runs": times}
+            for name, times in runs.items()
+        }
+    }
+
+
+def _git_commit() -> Optional[str]:
+    """当前代码所在的 git 提交，不在仓库中时为 None"""
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def _environment() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__ if np is not None else None
+    }
+
+
+def run_benchmark(sizes: Sequence[int] = DEFAULT_SIZES, spec: Optional[WorkloadSpec] = None,
+                  repeat: int = 3, progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    运行整套基准
+
+    Args:
+        sizes: 任务规模
+        spec: 合成数据与排期参数，默认 WorkloadSpec()
+        repeat: 每个规模的重复次数，报告同时给出最好成绩与中位数
+        progress: 每完成一个规模时以该规模的结果调用
+
+    Returns:
+        JSON 可序列化的报告
+    """
+    spec = spec or WorkloadSpec()
+    results = []
+    for num_tasks in sizes:
+        result = benchmark_size(num_tasks, spec, repeat)
+        results.append(result)
+        if progress:
+            progress(result)
+
+    return {
+        "version": REPORT_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "environment": _environment(),
+        "workload": asdict(spec),
+        "repeat": repeat,
+        "results": results
+    }
+
+
+def _data_parameters(report: Dict) -> Dict:
+    """报告中决定合成数据与排期内容的参数（不含引擎选择）"""
+    return {name: value for name, value in report.get("workload", {}).items()
+            if not name.endswith("_engine")}
+
+
+def compare_reports(baseline: Dict, current: Dict) -> List[Dict]:
+    """
+    对比两份报告中相同规模、相同操作的最好成绩
+
+    引擎选择可以不同，用于对比同一数据上不同引擎的耗时。
+
+    Returns:
+        [{"num_tasks", "operation", "baseline", "current", "speedup"}]，
+        speedup 大于 1 表示 current 更快
+    """
+    if _data_parameters(baseline) != _data_parameters(current):
+        raise ValueError("两份报告的合成数据参数不同，无法对比")
+
+    baseline_results = {result["num_tasks"]: result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        old = baseline_results.get(result["num_tasks"])
+        if old is None:
+            continue
+        for name, timing in result["operations"].items():
+            if name not in old["operations"]:
+                continue
+            before = old["operations"][name]["best"]
+            after = timing["best"]
+            rows.append({
+                "num_tasks": result["num_tasks"],
+                "operation": name,
+                "baseline": before,
+                "current": after,
+                "speedup": before / after if after > 0 else float("inf")
+            })
+    return rows
+
+
+def _print_result(result: Dict) -> None:
+    timings = ", ".join(f"{name} {timing['best'] * 1000:.1f}ms"
+                        for name, timing in result["operations"].items())
+    print(f"{result['num_tasks']:>9} 个任务: {timings}", flush=True)
+
+
+def main():
+    """主函数"""
+    defaults = WorkloadSpec()
+    parser = argparse.ArgumentParser(description="调度器性能基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="任务规模")
+    parser.add_argument("--repeat", type=int, default=3, help="每个规模的重复次数")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="随机种子")
+    parser.add_argument("--categories", type=int, default=defaults.num_categories, help="类别数量")
+    parser.add_argument("--deadline-days", type=int, default=defaults.deadline_days,
+                        help="截止日期分布的天数范围")
+    parser.add_argument("--due-ratio", type=float, default=defaults.due_ratio,
+                        help="带有自身截止日期的任务比例")
+    parser.add_argument("--overdue-ratio", type=float, default=defaults.overdue_ratio,
+                        help="开始时即逾期的任务比例")
+    parser.add_argument("--max-days", type=int, default=defaults.max_days, help="最大排期天数")
+    parser.add_argument("--scoring-engine", default=defaults.scoring_engine, help="评分引擎")
+    parser.add_argument("--selection-engine", default=defaults.selection_engine, help="多样性选择引擎")
+    parser.add_argument("--output", help="报告输出路径")
+    parser.add_argument("--compare", help="与之对比的基线报告路径")
+    args = parser.parse_args()
+
+    spec = WorkloadSpec(seed=args.seed, num_categories=args.categories,
+                        deadline_days=args.deadline_days, due_ratio=args.due_ratio,
+                        overdue_ratio=args.overdue_ratio, max_days=args.max_days,
+                        scoring_engine=args.scoring_engine,
+                        selection_engine=args.selection_engine)
+    report = run_benchmark(args.sizes, spec, args.repeat, progress=_print_result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"报告已写入 {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\n与 {baseline.get('git_commit') or args.compare} 对比（最好成绩）:")
+        for row in compare_reports(baseline, report):
+            print(f"{row['num_tasks']:>9} {row['operation']:<24} "
+                  f"{row['baseline'] * 1000:9.1f}ms -> {row['current'] * 1000:9.1f}ms  "
+                  f"x{row['speedup']:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
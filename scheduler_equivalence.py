@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+调度引擎差分校验
+在大量按种子生成的随机输入上，把各个调度引擎与冻结的参考实现
+（scheduler_reference.ReferenceScheduler）逐日对比分配结果、任务与项目状态以及摘要；
+发现差异时把输入缩减为仍能复现差异的最小用例，同时统计各引擎相对参考实现的加速比
+
+    python scheduler_equivalence.py --cases 2000
+    python scheduler_equivalence.py --cases 200 --max-tasks 500 --engines scalar numpy
+
+缩减后的用例按 test_data.json 的格式输出，可以直接用 scheduler_loader.bulk_load 载入复现。
+"""
+
+import argparse
+import json
+import random
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from task_scheduler import TaskScheduler, WorkCalendar, np
+from scheduler_loader import _build_project, _build_task
+from scheduler_reference import ReferenceScheduler
+from scheduler_team import TeamScheduler, Worker
+
+
+# 引擎工厂：以 scheduler_config 为参数，返回已完成配置、尚未载入数据的调度器
+EngineFactory = Callable[[Dict], object]
+
+DEFAULT_START_DATE = "2024-01-10T09:00:00"
+
+
+def configured(scheduler_class=TaskScheduler, **kwargs) -> EngineFactory:
+    """按 scheduler_config 配置 scheduler_class(**kwargs) 的引擎工厂"""
+    def factory(config: Dict):
+        scheduler = scheduler_class(**kwargs)
+        scheduler.configure(config)
+        return scheduler
+    return factory
+
+
+def _calendar_engine(config: Dict) -> TaskScheduler:
+    """每天工时都等于 daily_work_hours 的工作日历，结果应与不设日历相同"""
+    scheduler = configured()(config)
+    scheduler.calendar = WorkCalendar((scheduler.daily_work_hours,) * 7)
+    return scheduler
+
+
+def _team_engine(config: Dict) -> TeamScheduler:
+    """只有一名成员、所有任务都在共享池中的团队调度器"""
+    scheduler = configured(TeamScheduler)(config)
+    scheduler.add_worker(Worker("worker", "worker", scheduler.daily_work_hours))
+    return scheduler
+
+
+def default_engines() -> Dict[str, EngineFactory]:
+    """仓库中的全部引擎组合，未安装 numpy 时不含向量化评分"""
+    engines = {
+        "scalar": configured(),
+        "category": configured(selection_engine="category"),
+        "calendar": _calendar_engine,
+        "team": _team_engine,
+    }
+    if np is not None:
+        engines["numpy"] = configured(scoring_engine="numpy")
+        engines["numpy+category"] = configured(scoring_engine="numpy", selection_engine="category")
+    return engines
+
+
+@dataclass(slots=True)
+class EquivalenceCase:
+    """一组随机输入：scheduler_config 格式的配置、项目与任务字典，以及排期天数"""
+    seed: int
+    config: Dict
+    projects: List[Dict]
+    tasks: List[Dict]
+    max_days: int
+
+    @property
+    def start_date(self) -> datetime:
+        return datetime.fromisoformat(self.config.get("start_date", DEFAULT_START_DATE))
+
+    def to_dict(self) -> Dict:
+        """test_data.json 格式，另附 seed 与 max_days"""
+        return {
+            "seed": self.seed,
+            "max_days": self.max_days,
+            "scheduler_config": self.config,
+            "projects": self.projects,
+            "tasks": self.tasks
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "EquivalenceCase":
+        return cls(data.get("seed", 0), data["scheduler_config"], data["projects"],
+                   data["tasks"], data.get("max_days", 30))
+
+
+def _iso(value: datetime) -> str:
+    return value.isoformat()
+
+
+def generate_case(seed: int, max_tasks: int = 60) -> EquivalenceCase:
+    """
+    按种子生成一组随机输入
+
+    覆盖已过期与远期的截止日期、一天内不同时刻的截止时间、无截止日期的任务、
+    非活跃项目、不存在的项目、初始即完成或剩余为 0 的任务，以及 look_ahead_count
+    为 0 或负数、阈值为 0、权重全为 0（参考实现在多样性规则中除零）等边界配置。
+    工时均按 0.5 小时对齐：未对齐的工时在引擎中按约定向上取整，与参考实现的
+    逐次四舍五入本来就不同。
+    """
+    rnd = random.Random(seed)
+    start = datetime.fromisoformat(DEFAULT_START_DATE)
+    categories = [f"类别{i}" for i in range(rnd.randint(1, 4))]
+
+    def moment(low: int, high: int) -> str:
+        return _iso(start + timedelta(days=rnd.randint(low, high),
+                                      hours=rnd.choice([0, 0, 5.5, 14.99])))
+
+    config = {
+        "daily_work_hours": rnd.choice([8.0, 8.0, 6.0, 4.5, 0.5, 12.0]),
+        "start_date": DEFAULT_START_DATE,
+        "weights": rnd.choice([
+            {"priority_weight": 2.0, "deadline_weight": 3.0, "workload_weight": 1.5},
+            {"priority_weight": 1.0, "deadline_weight": 1.0, "workload_weight": 1.0},
+            {"priority_weight": 0.0, "deadline_weight": 5.0, "workload_weight": 0.5},
+            {"priority_weight": 0.0, "deadline_weight": 0.0, "workload_weight": 0.0},
+        ]),
+        "diversity_config": {
+            "diversity_threshold": rnd.choice([0.0, 0.1, 0.1, 0.3, 1.0]),
+            "look_ahead_count": rnd.choice([0, -2, 1, 3, 5, 5, 10, 100])
+        }
+    }
+
+    projects = []
+    for i in range(rnd.randint(1, 8)):
+        projects.append({
+            "project_id": f"proj_{i:03d}",
+            "name": f"项目{i}",
+            "category": rnd.choice(categories),
+            "priority": rnd.randint(1, 3),
+            "deadline": moment(-3, 30),
+            "status": rnd.choice(["active"] * 6 + ["completed", "delayed"])
+        })
+
+    tasks = []
+    for j in range(rnd.randint(1, max_tasks)):
+        if rnd.random() < 0.03:
+            project_id = "proj_missing"
+        else:
+            project_id = rnd.choice(projects)["project_id"]
+        estimated = rnd.randint(1, 24) / 2
+        remaining = estimated if rnd.random() < 0.8 else rnd.randint(0, int(estimated * 2)) / 2
+        tasks.append({
+            "task_id": f"task_{j:03d}",
+            "project_id": project_id,
+            "name": f"任务{j}",
+            "estimated_hours": estimated,
+            "remaining_hours": remaining,
+            "status": rnd.choice(["pending"] * 12 + ["completed", "overdue"]),
+            "due_date": moment(-2, 25) if rnd.random() < 0.7 else None
+        })
+
+    return EquivalenceCase(seed, config, projects, tasks, rnd.choice([1, 5, 20, 40]))
+
+
+def run_case(factory: EngineFactory, case: EquivalenceCase) -> Tuple[Dict, float]:
+    """
+    用一个引擎运行用例
+
+    Returns:
+        (结果摘录, generate_schedule 耗时秒数)；运行抛出异常时结果摘录为 {"error": 异常类名}
+    """
+    scheduler = factory(case.config)
+    dates: Dict[str, datetime] = {}
+    for data in case.projects:
+        scheduler.add_project(_build_project(data, dates))
+    for data in case.tasks:
+        scheduler.add_task(_build_task(data, dates))
+
+    start = time.perf_counter()
+    try:
+        scheduler.generate_schedule(case.start_date, case.max_days)
+    except Exception as exc:
+        return {"error": type(exc).__name__}, time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+
+    exported = scheduler.export_schedule_to_dict()
+    return {
+        "schedule": {date: [(entry["task_id"], entry["allocated_hours"]) for entry in entries]
+                     for date, entries in exported["schedule"].items()},
+        "tasks": {task_id: (task["status"], task["remaining_hours"])
+                  for task_id, task in exported["tasks"].items()},
+        "projects": {project_id: project["status"]
+                     for project_id, project in exported["projects"].items()},
+        "summary": exported["summary"]
+    }, elapsed
+
+
+def compare_results(expected: Dict, actual: Dict) -> Optional[str]:
+    """
+    比较两个结果摘录，依次检查异常、逐日分配、任务状态、项目状态与摘要
+
+    Returns:
+        第一处差异的描述，完全一致时为 None
+    """
+    if "error" in expected or "error" in actual:
+        if expected.get("error") != actual.get("error"):
+            return f"异常不同: 参考 {expected.get('error')}，引擎 {actual.get('error')}"
+        return None
+
+    for date in sorted(set(expected["schedule"]) | set(actual["schedule"])):
+        before = expected["schedule"].get(date, [])
+        after = actual["schedule"].get(date, [])
+        if before != after:
+            return f"{date} 的排期不同: 参考 {before}，引擎 {after}"
+
+    for name in ("tasks", "projects"):
+        for key in sorted(set(expected[name]) | set(actual[name])):
+            before, after = expected[name].get(key), actual[name].get(key)
+            if before != after:
+                return f"{key} 的状态不同: 参考 {before}，引擎 {after}"
+
+    for key in sorted(set(expected["summary"]) | set(actual["summary"])):
+        before, after = expected["summary"].get(key), actual["summary"].get(key)
+        if before != after:
+            return f"摘要 {key} 不同: 参考 {before}，引擎 {after}"
+    return None
+
+
+def find_difference(factory: EngineFactory, case: EquivalenceCase,
+                    reference: EngineFactory = configured(ReferenceScheduler)) -> Optional[str]:
+    """引擎与参考实现在用例上的第一处差异，一致时为 None"""
+    expected, _ = run_case(reference, case)
+    actual, _ = run_case(factory, case)
+    return compare_results(expected, actual)
+
+
+def _without_chunks(items: List, chunks: int) -> List[List]:
+    """把 items 分成 chunks 段，依次给出去掉其中一段后的列表"""
+    size = -(-len(items) // chunks)
+    return [items[:start] + items[start + size:] for start in range(0, len(items), size)]
+
+
+def _simplified_tasks(tasks: List[Dict]) -> List[List[Dict]]:
+    """逐个任务的简化候选：去掉截止日期、工时减半、状态改为 pending"""
+    candidates = []
+    for index, task in enumerate(tasks):
+        simpler = []
+        if task.get("due_date"):
+            simpler.append(dict(task, due_date=None))
+        if task["estimated_hours"] > 0.5:
+            hours = max(0.5, round(task["estimated_hours"]) / 2)
+            remaining = min(task["remaining_hours"], hours)
+            simpler.append(dict(task, estimated_hours=hours, remaining_hours=remaining))
+        if task.get("status", "pending") != "pending":
+            simpler.append(dict(task, status="pending"))
+        for candidate in simpler:
+            candidates.append(tasks[:index] + [candidate] + tasks[index + 1:])
+    return candidates
+
+
+def shrink_case(case: EquivalenceCase,
+                still_fails: Callable[[EquivalenceCase], bool]) -> EquivalenceCase:
+    """
+    把用例缩减为仍然 still_fails 的最小输入
+
+    反复尝试缩短排期天数、成段删除任务（段数从 2 起逐步加倍，即 delta debugging）、
+    删除项目，以及逐个简化任务字段，直到任何一步都无法再缩减为止。
+    """
+    changed = True
+    while changed:
+        changed = False
+
+        for days in sorted({1, case.max_days // 2, case.max_days - 1}):
+            if 0 < days < case.max_days and still_fails(replace(case, max_days=days)):
+                case = replace(case, max_days=days)
+                changed = True
+                break
+
+        chunks = 2
+        while len(case.tasks) > 1 and chunks <= len(case.tasks):
+            for tasks in _without_chunks(case.tasks, chunks):
+                if still_fails(replace(case, tasks=tasks)):
+                    case = replace(case, tasks=tasks)
+                    chunks = max(chunks - 1, 2)
+                    changed = True
+                    break
+            else:
+                if chunks == len(case.tasks):
+                    break
+                chunks = min(chunks * 2, len(case.tasks))
+
+        for index in range(len(case.projects)):
+            projects = case.projects[:index] + case.projects[index + 1:]
+            if still_fails(replace(case, projects=projects)):
+                case = replace(case, projects=projects)
+                changed = True
+                break
+
+        for tasks in _simplified_tasks(case.tasks):
+            if still_fails(replace(case, tasks=tasks)):
+                case = replace(case, tasks=tasks)
+                changed = True
+                break
+    return case
+
+
+@dataclass(slots=True)
+class EngineReport:
+    """单个引擎的校验结果"""
+    name: str
+    cases: int = 0
+    mismatches: int = 0
+    seconds: float = 0.0
+    reference_seconds: float = 0.0
+    failures: List[Dict] = field(default_factory=list)  # [{"seed", "difference", "case"}]
+
+    @property
+    def speedup(self) -> Optional[float]:
+        """参考实现总耗时与引擎总耗时之比，大于 1 表示引擎更快"""
+        return self.reference_seconds / self.seconds if self.seconds > 0 else None
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "cases": self.cases,
+            "mismatches": self.mismatches,
+            "seconds": self.seconds,
+            "reference_seconds": self.reference_seconds,
+            "speedup": self.speedup,
+            "failures": self.failures
+        }
+
+
+def check_engines(seeds: Sequence[int], engines: Optional[Dict[str, EngineFactory]] = None,
+                  max_tasks: int = 60, shrink: bool = True, max_failures: int = 5,
+                  reference: EngineFactory = configured(ReferenceScheduler),
+                  progress: Optional[Callable[[int, Dict[str, EngineReport]], None]] = None
+                  ) -> Dict[str, EngineReport]:
+    """
+    在每个种子生成的用例上对比各引擎与参考实现
+
+    Args:
+        seeds: 随机种子
+        engines: 引擎名称 -> 工厂，默认 default_engines()
+        max_tasks: 每个用例的最大任务数
+        shrink: 是否缩减出现差异的用例
+        max_failures: 每个引擎最多记录（并缩减）的差异用例数，超出的只计数
+        reference: 参考实现的工厂
+        progress: 每完成一个种子时以 (种子, 当前报告) 调用
+
+    Returns:
+        引擎名称 -> EngineReport
+    """
+    engines = engines if engines is not None else default_engines()
+    reports = {name: EngineReport(name) for name in engines}
+
+    for seed in seeds:
+        case = generate_case(seed, max_tasks)
+        expected, reference_seconds = run_case(reference, case)
+        for name, factory in engines.items():
+            report = reports[name]
+            actual, seconds = run_case(factory, case)
+            report.cases += 1
+            report.seconds += seconds
+            report.reference_seconds += reference_seconds
+
+            difference = compare_results(expected, actual)
+            if difference is None:
+                continue
+            report.mismatches += 1
+            if len(report.failures) >= max_failures:
+                continue
+            if shrink:
+                case_of = shrink_case(
+                    case, lambda candidate: find_difference(factory, candidate, reference) is not None)
+                difference = find_difference(factory, case_of, reference)
+            else:
+                case_of = case
+            report.failures.append({"seed": seed, "difference": difference,
+                                    "case": case_of.to_dict()})
+        if progress:
+            progress(seed, reports)
+    return reports
+
+
+def main():
+    """主函数"""
+    available = default_engines()
+    parser = argparse.ArgumentParser(description="调度引擎差分校验")
+    parser.add_argument("--cases", type=int, default=1000, help="用例数量")
+    parser.add_argument("--seed", type=int, default=0, help="第一个用例的随机种子")
+    parser.add_argument("--max-tasks", type=int, default=60, help="每个用例的最大任务数")
+    parser.add_argument("--engines", nargs="+", choices=list(available), default=list(available),
+                        help="参与对比的引擎")
+    parser.add_argument("--no-shrink", action="store_true", help="不缩减出现差异的用例")
+    parser.add_argument("--output", help="报告输出路径")
+    args = parser.parse_args()
+
+    engines = {name: available[name] for name in args.engines}
+
+    def show(seed: int, reports: Dict[str, EngineReport]) -> None:
+        done = seed - args.seed + 1
+        if done % 100 == 0 or done == args.cases:
+            mismatches = sum(report.mismatches for report in reports.values())
+            print(f"{done}/{args.cases} 个用例，差异 {mismatches} 处", flush=True)
+
+    reports = check_engines(range(args.seed, args.seed + args.cases), engines, args.max_tasks,
+                            shrink=not args.no_shrink, progress=show)
+
+    print()
+    for report in reports.values():
+        speedup = f"x{report.speedup:.2f}" if report.speedup is not None else "-"
+        print(f"{report.name:<16} 差异 {report.mismatches:>4}/{report.cases}  "
+              f"{report.reference_seconds * 1000:9.1f}ms -> {report.seconds * 1000:9.1f}ms  {speedup}")
+        for failure in report.failures:
+            case = failure["case"]
+            print(f"  种子 {failure['seed']}（缩减为 {len(case['tasks'])} 个任务、"
+                  f"{case['max_days']} 天）: {failure['difference']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({name: report.to_dict() for name, report in reports.items()},
+                      f, ensure_ascii=False, indent=2)
+        print(f"报告已写入 {args.output}")
+    return 1 if any(report.mismatches for report in reports.values()) else 0
+
+
+if __name__ == "__main__":
+    exit(main())
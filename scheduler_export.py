@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+排期结果的流式导出
+逐天、逐个项目和任务地写出 JSON 或 NDJSON，不在内存中构建完整的导出字典
+"""
+
+import json
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from task_scheduler import TaskScheduler, ScheduleResult
+
+
+# 支持的导出格式
+EXPORT_FORMATS = ("json", "ndjson")
+
+
+class _LazyObject:
+    """按需产出 (键, 值) 的 JSON 对象，值可以是普通对象或嵌套的 _LazyObject"""
+
+    def __init__(self, items: Iterable[Tuple[str, object]]):
+        self.items = items
+
+
+def _sections(source: Union[TaskScheduler, ScheduleResult]) -> Iterator[Tuple[str, object]]:
+    """导出结构的各部分，与 export_schedule_to_dict / export_to_dict 的键顺序相同"""
+    if isinstance(source, ScheduleResult):
+        yield "schedule", _LazyObject(source.schedule.iter_dicts())
+        yield "summary", source.get_summary()
+        yield "projects", _LazyObject(source.iter_project_dicts())
+        yield "tasks", _LazyObject(source.iter_task_dicts())
+    else:
+        yield "schedule", _LazyObject(source.schedule.iter_dicts())
+        yield "summary", source.get_schedule_summary()
+        yield "projects", _LazyObject(
+            (pid, project.to_dict()) for pid, project in source.projects.items())
+        yield "tasks", _LazyObject(
+            (tid, task.to_dict()) for tid, task in source.tasks.items())
+
+
+def _iter_json(value, indent: Optional[int], ensure_ascii: bool, level: int = 0) -> Iterator[str]:
+    """
+    将值编码为与 json.dumps(..., indent=indent) 逐字节相同的文本片段
+
+    普通值整体交给 json.dumps 编码，再按所在层级补齐换行后的缩进；
+    _LazyObject 逐项编码，因此任意时刻只持有一项的数据。
+    """
+    if not isinstance(value, _LazyObject):
+        text = json.dumps(value, ensure_ascii=ensure_ascii, indent=indent)
+        if indent is not None and level:
+            text = text.replace("\n", "\n" + " " * (indent * level))
+        yield text
+        return
+
+    if indent is None:
+        item_separator, opening, closing = ", ", "", ""
+    else:
+        item_separator = ","
+        opening = "\n" + " " * (indent * (level + 1))
+        closing = "\n" + " " * (indent * level)
+
+    empty = True
+    for key, item in value.items:
+        yield ("{" if empty else item_separator) + opening
+        yield json.dumps(key, ensure_ascii=ensure_ascii) + ": "
+        yield from _iter_json(item, indent, ensure_ascii, level + 1)
+        empty = False
+    yield "{}" if empty else closing + "}"
+
+
+def _iter_ndjson(source: Union[TaskScheduler, ScheduleResult],
+                 ensure_ascii: bool) -> Iterator[str]:
+    """每行一个 JSON 对象：逐天的排期、摘要、逐个项目与任务"""
+    for name, section in _sections(source):
+        if name == "summary":
+            records = [{"type": "summary", "summary": section}]
+        elif name == "schedule":
+            records = ({"type": "day", "date": date, "entries": entries}
+                       for date, entries in section.items)
+        else:
+            kind = name[:-1]  # projects -> project, tasks -> task
+            records = ({"type": kind, kind: item} for _, item in section.items)
+        for record in records:
+            yield json.dumps(record, ensure_ascii=ensure_ascii) + "\n"
+
+
+def _chain_items(items: Iterable[Tuple[str, object]], extra: Dict) -> Iterator[Tuple[str, object]]:
+    """在导出结构末尾追加额外的顶层字段"""
+    yield from items
+    yield from extra.items()
+
+
+def iter_schedule_export(source: Union[TaskScheduler, ScheduleResult],
+                         format: str = "json", indent: Optional[int] = 2,
+                         ensure_ascii: bool = False,
+                         extra: Optional[Dict] = None) -> Iterator[str]:
+    """
+    逐段产出排期导出文本
+
+    Args:
+        source: 调度器（导出当前排期）或 ScheduleResult（导出模拟结果）
+        format: "json" 时与 json.dump(export_schedule_to_dict(), indent=indent,
+            ensure_ascii=ensure_ascii) 的输出逐字节相同；"ndjson" 时每行一条记录
+        indent: JSON 缩进，None 表示单行输出
+        ensure_ascii: 是否转义非 ASCII 字符
+        extra: 追加在导出结构末尾的顶层字段，例如导出元数据
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"未知的导出格式: {format}，可选值: {', '.join(EXPORT_FORMATS)}")
+
+    if format == "json":
+        items = _sections(source)
+        if extra:
+            items = _chain_items(items, extra)
+        yield from _iter_json(_LazyObject(items), indent, ensure_ascii)
+        return
+
+    yield from _iter_ndjson(source, ensure_ascii)
+    for key, value in (extra or {}).items():
+        yield json.dumps({"type": key, key: value}, ensure_ascii=ensure_ascii) + "\n"
+
+
+def write_schedule_export(source: Union[TaskScheduler, ScheduleResult], fp,
+                          format: str = "json", indent: Optional[int] = 2,
+                          ensure_ascii: bool = False, extra: Optional[Dict] = None) -> None:
+    """将排期导出流式写入文本文件对象"""
+    for chunk in iter_schedule_export(source, format, indent, ensure_ascii, extra):
+        fp.write(chunk)
+
+
+async def write_schedule_export_async(source: Union[TaskScheduler, ScheduleResult], writer,
+                                      format: str = "json", indent: Optional[int] = 2,
+                                      ensure_ascii: bool = False, extra: Optional[Dict] = None,
+                                      encoding: str = "utf-8", buffer_size: int = 65536) -> None:
+    """
+    将排期导出流式写入异步写入端（如 asyncio.StreamWriter）
+
+    文本按 encoding 编码后攒满 buffer_size 字节写出一次，并等待 drain()
+    以遵循对端的背压。
+    """
+    buffer = []
+    buffered = 0
+    for chunk in iter_schedule_export(source, format, indent, ensure_ascii, extra):
+        data = chunk.encode(encoding)
+        buffer.append(data)
+        buffered += len(data)
+        if buffered >= buffer_size:
+            writer.write(b"".join(buffer))
+            await writer.drain()
+            buffer, buffered = [], 0
+
+    if buffer:
+        writer.write(b"".join(buffer))
+        await writer.drain()
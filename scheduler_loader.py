@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_data.json 格式输入的批量加载
+分块读取文件、逐个解码项目和任务，出错的条目记录位置后跳过，不中断整个加载
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+from task_scheduler import TaskScheduler, Project, Task, Priority, ProjectStatus, TaskStatus
+
+
+_PRIORITIES = {priority.value: priority for priority in Priority}
+_PROJECT_STATUSES = {status.value: status for status in ProjectStatus}
+_TASK_STATUSES = {status.value: status for status in TaskStatus}
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_SEPARATOR = re.compile(r"[ \t\n\r]*([,\]])[ \t\n\r]*")
+_NUMBER_TYPES = (int, float)
+
+
+@dataclass(slots=True)
+class LoadError:
+    """加载过程中的一条错误"""
+    section: str   # "projects"、"tasks" 或 "document"
+    index: int     # 条目在数组中的序号，文档级错误为 -1
+    line: int      # 条目起始位置的行号（从 1 开始）
+    column: int    # 条目起始位置的列号（从 1 开始）
+    message: str
+
+    def __str__(self) -> str:
+        where = f"{self.section}[{self.index}]" if self.index >= 0 else self.section
+        return f"{self.line}:{self.column} {where}: {self.message}"
+
+
+@dataclass
+class LoadReport:
+    """批量加载结果"""
+    scheduler: TaskScheduler
+    config: Dict = field(default_factory=dict)  # 文件中的 scheduler_config
+    projects_loaded: int = 0
+    tasks_loaded: int = 0
+    errors: List[LoadError] = field(default_factory=list)
+
+
+class _ValidationError(Exception):
+    """条目内容不合法"""
+
+
+class _Reader:
+    """
+    分块读取的文本缓冲区
+
+    只保留尚未解析的部分，并记录已丢弃内容的行数，以便给出错误位置。
+    """
+
+    def __init__(self, stream: TextIO, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.value_start = 0       # 最近一次 decode 的值在缓冲区中的起点
+        self.eof = False
+        self.lines_before = 0      # 已丢弃内容中的换行数
+        self.column_before = 0     # 已丢弃内容最后一行的长度
+
+    def fill(self) -> bool:
+        """读入下一块，文件已结束时返回 False"""
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos > self.chunk_size:
+            self._discard()
+        self.buffer += chunk
+        return True
+
+    def _discard(self) -> None:
+        consumed = self.buffer[:self.pos]
+        newlines = consumed.count("\n")
+        if newlines:
+            self.lines_before += newlines
+            self.column_before = len(consumed) - consumed.rfind("\n") - 1
+        else:
+            self.column_before += len(consumed)
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+
+    def location(self, pos: int) -> Tuple[int, int]:
+        """缓冲区内位置对应的 (行, 列)"""
+        newlines = self.buffer.count("\n", 0, pos)
+        if newlines:
+            return self.lines_before + newlines + 1, pos - self.buffer.rfind("\n", 0, pos)
+        return self.lines_before + 1, self.column_before + pos + 1
+
+    def peek(self) -> str:
+        """跳过空白并返回下一个字符，文件结束时返回空串"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            found = self.peek() or "文件结尾"
+            raise json.JSONDecodeError(f"应为 '{char}'，实际为 '{found}'", self.buffer, self.pos)
+        self.pos += 1
+
+    def value_end(self, start: int) -> Optional[int]:
+        """
+        从 start 开始扫描一个完整 JSON 值的结束位置
+
+        只跟踪括号深度和字符串边界，不校验语法；缓冲区内找不到结尾时返回 None。
+        """
+        buffer = self.buffer
+        depth = 0
+        in_string = False
+        i = start
+        while i < len(buffer):
+            char = buffer[i]
+            if in_string:
+                if char == "\\":
+                    i += 1
+                elif char == '"':
+                    in_string = False
+                    if depth == 0:
+                        return i + 1
+            elif char == '"':
+                in_string = True
+            elif char in "{[":
+                depth += 1
+            elif char in "}]":
+                if depth == 0:
+                    return i
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+            elif depth == 0 and char in ",\n":
+                return i
+            i += 1
+        return None
+
+    def decode(self, decoder: json.JSONDecoder) -> object:
+        """
+        解码下一个完整的值
+
+        值跨越块边界时读入更多内容后重试；确认值已完整而仍无法解码时，
+        跳过该值并抛出 JSONDecodeError。值的起点保存在 value_start 中。
+        """
+        self.peek()
+        while True:
+            start = self.value_start = self.pos
+            try:
+                value, end = decoder.raw_decode(self.buffer, start)
+            except json.JSONDecodeError as e:
+                end = self.value_end(start)
+                if end is None and self.fill():
+                    continue
+                self.pos = end if end is not None else len(self.buffer)
+                raise json.JSONDecodeError(e.msg, self.buffer, start) from None
+            if end == len(self.buffer) and not self.eof and self.fill():
+                # 数字等值可能在块边界处被截断
+                continue
+            self.pos = end
+            return value
+
+    def items(self, decoder: json.JSONDecoder) -> Iterator[Tuple[object, Optional[json.JSONDecodeError]]]:
+        """
+        逐个解码数组元素，调用前应已消费 '['，结束时消费 ']'
+
+        产出 (值, None) 或 (None, 语法错误)。完整落在缓冲区内的元素直接交给
+        C 扫描器，只有跨越块边界或出错的元素才走 decode 的慢路径。
+        """
+        scan_once = decoder.scan_once
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            value = error = None
+            start = self.value_start = self.pos
+            try:
+                value, end = scan_once(self.buffer, start)
+            except (StopIteration, json.JSONDecodeError):
+                end = None
+            if end is not None and end < len(self.buffer):
+                self.pos = end
+            else:
+                try:
+                    value = self.decode(decoder)
+                except json.JSONDecodeError as e:
+                    error = e
+            yield value, error
+
+            separator = _SEPARATOR.match(self.buffer, self.pos)
+            if separator is None:
+                # 分隔符不在缓冲区内，或其后不是合法的分隔符
+                if self.peek() == ",":
+                    self.pos += 1
+                    continue
+                self.expect("]")
+                return
+            self.pos = separator.end()
+            if separator.group(1) == "]":
+                return
+
+
+def _parse_datetime(value, cache: Dict[str, datetime], name: str,
+                    pool: Optional[Dict[datetime, datetime]] = None) -> datetime:
+    if not isinstance(value, str):
+        raise _ValidationError(f"{name} 应为 ISO 格式的日期字符串")
+    parsed = cache.get(value)
+    if parsed is None:
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            raise _ValidationError(f"{name} 不是合法的日期: {value!r}") from None
+        # 写法不同但取值相同的日期也与调度器中已有的对象共享
+        if pool is not None:
+            parsed = pool.setdefault(parsed, parsed)
+        cache[value] = parsed
+    return parsed
+
+
+def _field(data: Dict, name: str, kind=str):
+    if name not in data:
+        raise _ValidationError(f"缺少字段 {name}")
+    value = data[name]
+    if kind is None:
+        return value
+    if kind is float:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise _ValidationError(f"{name} 应为数字")
+    elif not isinstance(value, kind):
+        raise _ValidationError(f"{name} 应为字符串")
+    return value
+
+
+def _enum(mapping: Dict, value, name: str):
+    member = mapping.get(value)
+    if member is None:
+        raise _ValidationError(f"{name} 取值不合法: {value!r}")
+    return member
+
+
+def _build_project(data, dates: Dict[str, datetime],
+                   pool: Optional[Dict[datetime, datetime]] = None) -> Project:
+    try:
+        project_id, name, category = data["project_id"], data["name"], data["category"]
+        priority = _PRIORITIES[data["priority"]]
+        status = _PROJECT_STATUSES[data.get("status", "active")]
+        deadline = dates.get(data["deadline"])
+    except (KeyError, TypeError, AttributeError):
+        _validate_project(data)
+        raise _ValidationError("项目内容不合法") from None
+    if deadline is None:
+        deadline = _parse_datetime(data["deadline"], dates, "deadline", pool)
+    # 布尔值是 int 的子类，True 会命中优先级 1，需要单独拒绝
+    if not (type(project_id) is str and type(name) is str and type(category) is str
+            and type(data["priority"]) is not bool):
+        _validate_project(data)
+    return Project(project_id, name, category, priority, deadline, status)
+
+
+def _validate_project(data) -> None:
+    """逐个字段校验项目，给出第一个错误"""
+    if not isinstance(data, dict):
+        raise _ValidationError("项目应为 JSON 对象")
+    for name in ("project_id", "name", "category"):
+        _field(data, name)
+    _enum(_PRIORITIES, _field(data, "priority", float), "priority")
+    _parse_datetime(_field(data, "deadline", None), {}, "deadline")
+    _enum(_PROJECT_STATUSES, data.get("status", ProjectStatus.ACTIVE.value), "status")
+
+
+def _build_task(data, dates: Dict[str, datetime],
+                pool: Optional[Dict[datetime, datetime]] = None) -> Task:
+    try:
+        task_id, project_id, name = data["task_id"], data["project_id"], data["name"]
+        estimated_hours = data["estimated_hours"]
+        remaining_hours = data.get("remaining_hours")
+        status = _TASK_STATUSES[data.get("status", "pending")]
+        due_date = data.get("due_date")
+        if due_date:
+            due_date = dates.get(due_date) or _parse_datetime(due_date, dates, "due_date", pool)
+        else:
+            due_date = None
+    except (KeyError, TypeError, AttributeError):
+        _validate_task(data)
+        raise _ValidationError("任务内容不合法") from None
+    if not (type(task_id) is str and type(project_id) is str and type(name) is str
+            and type(estimated_hours) in _NUMBER_TYPES
+            and (remaining_hours is None or type(remaining_hours) in _NUMBER_TYPES)):
+        _validate_task(data)
+    return Task(task_id, project_id, name, estimated_hours, remaining_hours, status, due_date)
+
+
+def _validate_task(data) -> None:
+    """逐个字段校验任务，给出第一个错误"""
+    if not isinstance(data, dict):
+        raise _ValidationError("任务应为 JSON 对象")
+    for name in ("task_id", "project_id", "name"):
+        _field(data, name)
+    _field(data, "estimated_hours", float)
+    if data.get("remaining_hours") is not None:
+        _field(data, "remaining_hours", float)
+    _enum(_TASK_STATUSES, data.get("status", TaskStatus.PENDING.value), "status")
+    if data.get("due_date"):
+        _parse_datetime(data["due_date"], {}, "due_date")
+
+
+def bulk_load(source: Union[str, os.PathLike, TextIO],
+              scheduler: Optional[TaskScheduler] = None,
+              configure: bool = True,
+              chunk_size: int = 1 << 20) -> LoadReport:
+    """
+    批量加载 test_data.json 格式的项目和任务
+
+    文件按 chunk_size 个字符分块读取，projects / tasks 数组中的条目逐个解码并
+    立即转换为 Project / Task，相同的日期字符串只解析一次。全部条目读完后
+    一次性重建调度器的项目索引。语法或校验错误只跳过出错的条目，
+    并连同其行列位置记录在 LoadReport.errors 中；ID 与文件中先出现的条目或
+    调度器中已有的条目重复时同样按错误跳过，不覆盖已有的条目。
+
+    Args:
+        source: 文件路径或已打开的文本文件对象
+        scheduler: 加载到的调度器，默认新建
+        configure: 文件中有 scheduler_config 时是否据此设置调度参数
+        chunk_size: 每次读取的字符数
+
+    Returns:
+        LoadReport
+    """
+    if scheduler is None:
+        scheduler = TaskScheduler()
+    report = LoadReport(scheduler)
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "r", encoding="utf-8") as stream:
+            _load_stream(stream, report, configure, chunk_size)
+    else:
+        _load_stream(source, report, configure, chunk_size)
+
+    # 项目索引与聚合值在全部任务就绪后一次构建
+    scheduler.rebuild_project_index()
+    return report
+
+
+def _load_stream(stream: TextIO, report: LoadReport, configure: bool, chunk_size: int) -> None:
+    reader = _Reader(stream, chunk_size)
+    decoder = json.JSONDecoder()
+    # 日期按调度器的驻留表共享，与 add_task 加入的任务使用同一批对象
+    pool = report.scheduler._datetime_pool
+    dates: Dict[str, datetime] = {value.isoformat(): value for value in pool}
+    scheduler = report.scheduler
+    builders = {
+        "projects": (_build_project, scheduler.projects, "project_id", "projects_loaded"),
+        "tasks": (_build_task, scheduler.tasks, "task_id", "tasks_loaded"),
+    }
+
+    def error(section: str, index: int, pos: int, message: str) -> None:
+        line, column = reader.location(pos)
+        report.errors.append(LoadError(section, index, line, column, message))
+
+    try:
+        reader.expect("{")
+        if reader.peek() == "}":
+            reader.pos += 1
+            return
+        while True:
+            key = reader.decode(decoder)
+            reader.expect(":")
+
+            if key in builders and reader.peek() == "[":
+                build, target, id_field, counter = builders[key]
+                reader.pos += 1
+                loaded = 0
+                for index, (data, syntax_error) in enumerate(reader.items(decoder)):
+                    if syntax_error is not None:
+                        error(key, index, reader.value_start, f"JSON 语法错误: {syntax_error.msg}")
+                        continue
+                    try:
+                        item = build(data, dates, pool)
+                    except _ValidationError as e:
+                        error(key, index, reader.value_start, str(e))
+                    else:
+                        item_id = getattr(item, id_field)
+                        if item_id in target:
+                            # 文件内重复或调度器中已存在：保留已有的条目，不覆盖也不计数
+                            error(key, index, reader.value_start, f"{id_field} 重复: {item_id!r}")
+                            continue
+                        target[item_id] = item
+                        loaded += 1
+                setattr(report, counter, getattr(report, counter) + loaded)
+            else:
+                value = reader.decode(decoder)
+                if key in builders:
+                    error(key, -1, reader.value_start, f"{key} 应为数组")
+                elif key == "scheduler_config" and isinstance(value, dict):
+                    report.config = value
+                    if configure:
+                        scheduler.configure(value)
+
+            if reader.peek() == ",":
+                reader.pos += 1
+                continue
+            reader.expect("}")
+            break
+    except json.JSONDecodeError as e:
+        # 文档结构本身出错时无法定位后续条目，记录后停止
+        error("document", -1, min(e.pos, len(reader.buffer)), f"JSON 语法错误: {e.msg}")
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+调度器状态的二进制快照
+以定长 struct 记录保存项目、任务、调度参数和（可选的）排期结果，
+读取时通过 mmap 映射文件，按需解码单个项目或任务
+
+文件布局（小端）：
+    头部          _HEADER
+    字符串偏移    (字符串数 + 1) 个 uint64，相对字符串区起点
+    字符串区      UTF-8 编码，每个字符串以 NUL 结尾
+    项目记录      _PROJECT_RECORD × 项目数
+    项目排序索引  uint32 × 项目数，按项目ID排序的记录号
+    任务记录      _TASK_RECORD × 任务数
+    任务排序索引  uint32 × 任务数，按任务ID排序的记录号
+    排期任务快照  _TASK_RECORD × 排期任务数，随后是 uint32 类别字符串号 × 排期任务数
+    排期记录      _ENTRY_RECORD × 条目数：(天序号, 排期任务行号, 0.5 小时单位)
+    逾期队列      uint32 × 逾期任务数，任务记录号
+    延期项目      uint32 × 延期项目数，项目记录号（本次排期判定为延期的项目）
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional
+
+from task_scheduler import (TaskScheduler, Project, Task, Priority, ProjectStatus, TaskStatus,
+                            ScheduleTable, _EPOCH, _datetime_to_us)
+
+
+MAGIC = b"TSKSNAP\x00"
+VERSION = 2
+
+# magic, 版本, 标志, 字符串数, 字符串区字节数, 项目数, 任务数, 排期任务数, 条目数, 逾期任务数,
+# 延期项目数, 选择引擎（字符串号）, 工作日历 JSON（字符串号，无日历为 _NO_STRING）,
+# daily_work_hours, w1, w2, w3, diversity_threshold, look_ahead_count, 排期开始时间
+_HEADER = struct.Struct("<8sHHIQIIIIIIIIdddddqq")
+# 项目ID, 名称, 类别（字符串号）, 优先级, 状态, 截止时间（微秒）
+_PROJECT_RECORD = struct.Struct("<IIIBBxxq")
+# 任务ID, 项目ID, 名称（字符串号）, 状态, 预估工时, 剩余工时, 截止时间（微秒，无截止日期为 _NO_DATE）
+_TASK_RECORD = struct.Struct("<IIIBxxxddq")
+_ENTRY_RECORD = struct.Struct("<iii")
+
+_FLAG_SCHEDULE = 1
+_NO_DATE = -(2 ** 63)
+_NO_STRING = 0xFFFFFFFF
+
+# 数组区段按小端保存，大端平台读写时需要交换字节序
+_BYTESWAP = sys.byteorder == "big"
+
+_PRIORITIES = list(Priority)
+_PROJECT_STATUSES = list(ProjectStatus)
+_TASK_STATUSES = list(TaskStatus)
+
+
+def _datetime_from_us(us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=us)
+
+
+def save_snapshot(scheduler: TaskScheduler, path: str, include_schedule: bool = True) -> None:
+    """
+    将调度器状态保存为二进制快照
+
+    Args:
+        scheduler: 调度器
+        path: 快照文件路径
+        include_schedule: 是否同时保存当前排期结果、逾期队列和延期项目
+
+    Raises:
+        ValueError: 日期带有时区，或字符串中包含 NUL 字符
+    """
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def string_id(value: Optional[str]) -> int:
+        if value is None:
+            return _NO_STRING
+        index = string_ids.get(value)
+        if index is None:
+            if "\0" in value:
+                raise ValueError(f"快照不支持包含 NUL 字符的字符串: {value!r}")
+            index = string_ids[value] = len(strings)
+            strings.append(value)
+        return index
+
+    def timestamp(value: Optional[datetime]) -> int:
+        if value is None:
+            return _NO_DATE
+        if value.tzinfo is not None:
+            raise ValueError(f"快照仅支持不带时区的日期时间: {value.isoformat()}")
+        return _datetime_to_us(value)
+
+    def task_record(task: Task) -> bytes:
+        return _TASK_RECORD.pack(
+            string_id(task.task_id), string_id(task.project_id), string_id(task.name),
+            _TASK_STATUSES.index(task.status), task.estimated_hours, task.remaining_hours,
+            timestamp(task.due_date))
+
+    projects = list(scheduler.projects.values())
+    tasks = list(scheduler.tasks.values())
+    project_records = b"".join(
+        _PROJECT_RECORD.pack(
+            string_id(p.project_id), string_id(p.name), string_id(p.category),
+            _PRIORITIES.index(p.priority), _PROJECT_STATUSES.index(p.status),
+            timestamp(p.deadline))
+        for p in projects)
+    task_records = b"".join(task_record(task) for task in tasks)
+    project_order = array('I', sorted(range(len(projects)), key=lambda i: projects[i].project_id))
+    task_order = array('I', sorted(range(len(tasks)), key=lambda i: tasks[i].task_id))
+
+    flags = 0
+    schedule = scheduler.schedule
+    schedule_start = _NO_DATE
+    schedule_tasks = b""
+    schedule_categories = array('I')
+    entries = b""
+    overdue = array('I')
+    delayed = array('I')
+    if include_schedule:
+        flags |= _FLAG_SCHEDULE
+        schedule_start = timestamp(schedule.start_date)
+        schedule_tasks = b"".join(task_record(task) for task in schedule.tasks)
+        schedule_categories = array('I', (string_id(c) for c in schedule.task_category))
+        entries = b"".join(_ENTRY_RECORD.pack(day, row, units)
+                           for day, row, units in zip(schedule.days, schedule.rows, schedule.units))
+        task_rows = {task.task_id: index for index, task in enumerate(tasks)}
+        overdue = array('I', (task_rows[task.task_id] for task in scheduler.overdue_queue))
+        project_rows = {project.project_id: index for index, project in enumerate(projects)}
+        delayed = array('I', (project_rows[project.project_id]
+                              for project in scheduler.delayed_projects))
+
+    selection_engine = string_id(scheduler.selection_engine)
+    calendar = _NO_STRING
+    if scheduler.calendar is not None:
+        calendar = string_id(json.dumps(scheduler.calendar.to_dict(), sort_keys=True))
+
+    blob = b"".join(s.encode("utf-8") + b"\0" for s in strings)
+    offsets = array('Q', [0])
+    for s in strings:
+        offsets.append(offsets[-1] + len(s.encode("utf-8")) + 1)
+
+    sections = [offsets, blob, project_records, project_order, task_records, task_order,
+                schedule_tasks, schedule_categories, entries, overdue, delayed]
+    header = _HEADER.pack(
+        MAGIC, VERSION, flags, len(strings), len(blob), len(projects), len(tasks),
+        len(schedule.tasks) if include_schedule else 0,
+        len(schedule.rows) if include_schedule else 0, len(overdue),
+        len(delayed), selection_engine, calendar,
+        scheduler.daily_work_hours, scheduler.w1, scheduler.w2, scheduler.w3,
+        scheduler.diversity_threshold, scheduler.look_ahead_count, schedule_start)
+
+    with open(path, "wb") as f:
+        f.write(header)
+        for section in sections:
+            if isinstance(section, array):
+                if _BYTESWAP:
+                    section = array(section.typecode, section)
+                    section.byteswap()
+                section = section.tobytes()
+            f.write(section)
+
+
+class _RecordMapping(Mapping):
+    """按ID访问快照记录的只读映射，每次访问都解码出新的对象"""
+
+    def __init__(self, snapshot: "SchedulerSnapshot", count: int,
+                 id_of: Callable[[int], str], order_offset: int,
+                 decode: Callable[[int], object]):
+        self._snapshot = snapshot
+        self._count = count
+        self._id_of = id_of
+        self._order_offset = order_offset
+        self._decode = decode
+
+    def _find(self, key: str) -> Optional[int]:
+        """在排序索引上二分查找记录号"""
+        order = self._snapshot._uint32
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._id_of(order(self._order_offset, mid)) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count:
+            index = order(self._order_offset, lo)
+            if self._id_of(index) == key:
+                return index
+        return None
+
+    def __getitem__(self, key: str):
+        index = self._find(key)
+        if index is None:
+            raise KeyError(key)
+        return self._decode(index)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._id_of(index) for index in range(self._count))
+
+
+class SchedulerSnapshot:
+    """
+    通过 mmap 打开的只读快照
+
+    打开时只读取头部；projects / tasks 为按ID二分查找的只读映射，
+    访问时才解码对应记录。需要完整的调度器时调用 to_scheduler()。
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        (magic, version, flags, self.string_count, strings_bytes, self.project_count,
+         self.task_count, self.schedule_task_count, self.entry_count, self.overdue_count,
+         self.delayed_count, selection_engine, calendar, daily_work_hours, w1, w2, w3, diversity_threshold, look_ahead_count,
+         schedule_start) = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"不是受支持的调度器快照文件: {path}")
+
+        self.has_schedule = bool(flags & _FLAG_SCHEDULE)
+        self.schedule_start = None if schedule_start == _NO_DATE else _datetime_from_us(schedule_start)
+        self.config = {
+            "daily_work_hours": daily_work_hours,
+            "weights": {"priority_weight": w1, "deadline_weight": w2, "workload_weight": w3},
+            "diversity_config": {"diversity_threshold": diversity_threshold,
+                                 "look_ahead_count": look_ahead_count}
+        }
+
+        # 各区段的起始位置
+        offset = _HEADER.size
+        self._offsets_at = offset
+        offset += 8 * (self.string_count + 1)
+        self._strings_at = offset
+        offset += strings_bytes
+        self._projects_at = offset
+        offset += _PROJECT_RECORD.size * self.project_count
+        self._project_order_at = offset
+        offset += 4 * self.project_count
+        self._tasks_at = offset
+        offset += _TASK_RECORD.size * self.task_count
+        self._task_order_at = offset
+        offset += 4 * self.task_count
+        self._schedule_tasks_at = offset
+        offset += _TASK_RECORD.size * self.schedule_task_count
+        self._schedule_categories_at = offset
+        offset += 4 * self.schedule_task_count
+        self._entries_at = offset
+        offset += _ENTRY_RECORD.size * self.entry_count
+        self._overdue_at = offset
+        offset += 4 * self.overdue_count
+        self._delayed_at = offset
+
+        self.selection_engine = self._string(selection_engine)
+        if calendar != _NO_STRING:
+            self.config["calendar"] = json.loads(self._string(calendar))
+
+        self.projects = _RecordMapping(
+            self, self.project_count,
+            lambda i: self._string(_PROJECT_RECORD.unpack_from(
+                self._mm, self._projects_at + i * _PROJECT_RECORD.size)[0]),
+            self._project_order_at, self.project)
+        self.tasks = _RecordMapping(
+            self, self.task_count,
+            lambda i: self._string(_TASK_RECORD.unpack_from(
+                self._mm, self._tasks_at + i * _TASK_RECORD.size)[0]),
+            self._task_order_at, self.task)
+
+    def close(self) -> None:
+        """关闭映射和文件"""
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "SchedulerSnapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _uint32(self, section_at: int, index: int) -> int:
+        return struct.unpack_from("<I", self._mm, section_at + 4 * index)[0]
+
+    def _string(self, index: int) -> Optional[str]:
+        if index == _NO_STRING:
+            return None
+        start, end = struct.unpack_from("<QQ", self._mm, self._offsets_at + 8 * index)
+        at = self._strings_at
+        return self._mm[at + start:at + end - 1].decode("utf-8")
+
+    def _all_strings(self) -> List[str]:
+        """一次性解码全部字符串"""
+        if not self.string_count:
+            return []
+        blob = self._mm[self._strings_at:self._projects_at]
+        return blob[:-1].decode("utf-8").split("\0")
+
+    def project(self, index: int) -> Project:
+        """解码第 index 个项目记录"""
+        pid, name, category, priority, status, deadline = _PROJECT_RECORD.unpack_from(
+            self._mm, self._projects_at + index * _PROJECT_RECORD.size)
+        return Project(self._string(pid), self._string(name), self._string(category),
+                       _PRIORITIES[priority], _datetime_from_us(deadline),
+                       _PROJECT_STATUSES[status])
+
+    def task(self, index: int) -> Task:
+        """解码第 index 个任务记录"""
+        return self._task_at(self._tasks_at + index * _TASK_RECORD.size)
+
+    def _task_at(self, position: int) -> Task:
+        tid, pid, name, status, estimated, remaining, due = _TASK_RECORD.unpack_from(
+            self._mm, position)
+        return Task(self._string(tid), self._string(pid), self._string(name), estimated,
+                    remaining, _TASK_STATUSES[status],
+                    None if due == _NO_DATE else _datetime_from_us(due))
+
+    def to_scheduler(self, scoring_engine: str = "scalar") -> TaskScheduler:
+        """
+        解码全部记录并构建调度器
+
+        字符串区整体解码一次，相同的截止时间只生成一个 datetime 对象。
+        排期结果以 ScheduleTable 恢复，其中的任务为保存时的快照；
+        last_result 不在快照中，恢复后的调度器需完整排期一次才能使用 replan。
+        """
+        strings = self._all_strings()
+        dates: Dict[int, datetime] = {}
+
+        def date_of(us: int) -> Optional[datetime]:
+            if us == _NO_DATE:
+                return None
+            value = dates.get(us)
+            if value is None:
+                value = dates[us] = _datetime_from_us(us)
+            return value
+
+        def decode_tasks(start: int, count: int) -> List[Task]:
+            records = self._mm[start:start + count * _TASK_RECORD.size]
+            return [
+                Task(strings[tid], strings[pid], strings[name], estimated, remaining,
+                     _TASK_STATUSES[status], date_of(due))
+                for tid, pid, name, status, estimated, remaining, due
+                in _TASK_RECORD.iter_unpack(records)
+            ]
+
+        scheduler = TaskScheduler(scoring_engine=scoring_engine,
+                                  selection_engine=self.selection_engine)
+        scheduler.configure(self.config)
+
+        records = self._mm[self._projects_at:self._project_order_at]
+        for pid, name, category, priority, status, deadline in _PROJECT_RECORD.iter_unpack(records):
+            scheduler.projects[strings[pid]] = Project(
+                strings[pid], strings[name], strings[category], _PRIORITIES[priority],
+                date_of(deadline), _PROJECT_STATUSES[status])
+
+        tasks = decode_tasks(self._tasks_at, self.task_count)
+        scheduler.tasks = {task.task_id: task for task in tasks}
+        scheduler.rebuild_project_index()
+
+        if self.has_schedule:
+            categories = array('I', self._mm[self._schedule_categories_at:self._entries_at])
+            entries = array('i', self._mm[self._entries_at:self._overdue_at])
+            overdue = array('I', self._mm[self._overdue_at:self._delayed_at])
+            delayed = array('I', self._mm[self._delayed_at:
+                                          self._delayed_at + 4 * self.delayed_count])
+            if _BYTESWAP:
+                for column in (categories, entries, overdue, delayed):
+                    column.byteswap()
+            scheduler.schedule = ScheduleTable(
+                self.schedule_start,
+                decode_tasks(self._schedule_tasks_at, self.schedule_task_count),
+                [None if c == _NO_STRING else strings[c] for c in categories],
+                entries[0::3], entries[1::3], entries[2::3])
+            scheduler.overdue_queue = [tasks[index] for index in overdue]
+            projects = list(scheduler.projects.values())
+            scheduler.delayed_projects = [projects[index] for index in delayed]
+
+        return scheduler
+
+
+def open_snapshot(path: str) -> SchedulerSnapshot:
+    """通过 mmap 打开快照，只读取头部"""
+    return SchedulerSnapshot(path)
+
+
+def load_snapshot(path: str, scoring_engine: str = "scalar") -> TaskScheduler:
+    """从快照构建完整的调度器"""
+    with open_snapshot(path) as snapshot:
+        return snapshot.to_scheduler(scoring_engine)
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基于 SQLite 的任务持久化存储
+项目、任务与每次排期的分配结果保存在 sqlite3 数据库中。排期时只把活跃项目下
+待处理与逾期的任务载入内存，运行结束后在一个事务内分批写回变化的任务、
+项目状态和分配记录
+
+    store = SQLiteTaskStore("tasks.db")
+    store.save_scheduler(scheduler)
+    scheduler, run_id = store.schedule(datetime(2024, 1, 15), max_days=30)
+
+表结构：
+    projects        项目，seq 为首次写入的顺序
+    tasks           任务，seq 为首次写入的顺序
+    settings        调度参数（scheduler_config）
+    schedule_runs   每次写回的排期运行
+    allocations     排期运行中逐日的分配记录
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from task_scheduler import TaskScheduler, Project, Task, Priority, ProjectStatus, TaskStatus
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    project_id  TEXT PRIMARY KEY,
+    seq         INTEGER NOT NULL,
+    name        TEXT NOT NULL,
+    category    TEXT NOT NULL,
+    priority    INTEGER NOT NULL,
+    deadline    TEXT NOT NULL,
+    status      TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id          TEXT PRIMARY KEY,
+    seq              INTEGER NOT NULL,
+    project_id       TEXT NOT NULL,
+    name             TEXT NOT NULL,
+    estimated_hours  REAL NOT NULL,
+    remaining_hours  REAL NOT NULL,
+    status           TEXT NOT NULL,
+    due_date         TEXT
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key    TEXT PRIMARY KEY,
+    value  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS schedule_runs (
+    run_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at  TEXT NOT NULL,
+    start_date  TEXT,
+    max_days    INTEGER
+);
+CREATE TABLE IF NOT EXISTS allocations (
+    run_id    INTEGER NOT NULL REFERENCES schedule_runs(run_id),
+    date      TEXT NOT NULL,
+    position  INTEGER NOT NULL,
+    task_id   TEXT NOT NULL,
+    hours     REAL NOT NULL,
+    PRIMARY KEY (run_id, date, position)
+);
+CREATE INDEX IF NOT EXISTS idx_projects_status_deadline ON projects(status, deadline);
+CREATE INDEX IF NOT EXISTS idx_tasks_project_status ON tasks(project_id, status);
+CREATE INDEX IF NOT EXISTS idx_tasks_status_due ON tasks(status, due_date);
+CREATE INDEX IF NOT EXISTS idx_allocations_task ON allocations(task_id);
+"""
+
+_UPSERT_PROJECT = """
+INSERT INTO projects (project_id, seq, name, category, priority, deadline, status)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(project_id) DO UPDATE SET
+    name = excluded.name, category = excluded.category, priority = excluded.priority,
+    deadline = excluded.deadline, status = excluded.status
+"""
+
+_UPSERT_TASK = """
+INSERT INTO tasks (task_id, seq, project_id, name, estimated_hours, remaining_hours, status, due_date)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(task_id) DO UPDATE SET
+    project_id = excluded.project_id, name = excluded.name,
+    estimated_hours = excluded.estimated_hours, remaining_hours = excluded.remaining_hours,
+    status = excluded.status, due_date = excluded.due_date
+"""
+
+_PROJECT_COLUMNS = "p.project_id, p.name, p.category, p.priority, p.deadline, p.status"
+_TASK_COLUMNS = ("t.task_id, t.project_id, t.name, t.estimated_hours, t.remaining_hours, "
+                 "t.status, t.due_date")
+
+# 参与排期的任务状态：逾期任务一并载入，保持与内存中调度器相同的可见状态
+_ACTIVE_TASK_STATUSES = (TaskStatus.PENDING.value, TaskStatus.OVERDUE.value)
+
+_PRIORITIES = {priority.value: priority for priority in Priority}
+_PROJECT_STATUSES = {status.value: status for status in ProjectStatus}
+_TASK_STATUSES = {status.value: status for status in TaskStatus}
+
+
+def _parse_datetime(value: Optional[str], cache: Dict[str, datetime]) -> Optional[datetime]:
+    """解析 ISO 格式的日期时间，相同的字符串只解析一次"""
+    if value is None:
+        return None
+    parsed = cache.get(value)
+    if parsed is None:
+        parsed = cache[value] = datetime.fromisoformat(value)
+    return parsed
+
+
+def _project_from_row(row: tuple, dates: Dict[str, datetime]) -> Project:
+    project_id, name, category, priority, deadline, status = row
+    return Project(project_id, name, category, _PRIORITIES[priority],
+                   _parse_datetime(deadline, dates), _PROJECT_STATUSES[status])
+
+
+def _task_from_row(row: tuple, dates: Dict[str, datetime]) -> Task:
+    task_id, project_id, name, estimated_hours, remaining_hours, status, due_date = row
+    return Task(task_id, project_id, name, estimated_hours, remaining_hours,
+                _TASK_STATUSES[status], _parse_datetime(due_date, dates))
+
+
+class SQLiteTaskStore:
+    """
+    项目与任务的 SQLite 存储
+
+    数据库中的记录顺序（seq）即载入调度器的顺序，紧迫度相同的任务按此先后选择，
+    因此从存储载入后排期的结果与按同样顺序在内存中添加时相同。
+    """
+
+    def __init__(self, path: str = ":memory:", batch_size: int = 1000):
+        """
+        Args:
+            path: 数据库文件路径，默认使用内存数据库
+            batch_size: 批量写入时每批的行数
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+        # 最近一次 load_active 载入时的状态，write_back 据此只写回变化的行
+        self._loaded_tasks: Dict[str, Tuple[str, float]] = {}
+        self._loaded_projects: Dict[str, str] = {}
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        self.connection.close()
+
+    def __enter__(self) -> "SQLiteTaskStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _execute_batches(self, sql: str, rows: Iterable[tuple]) -> int:
+        """按 batch_size 分批执行 executemany，返回处理的行数；调用方负责事务"""
+        rows = iter(rows)
+        count = 0
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return count
+            self.connection.executemany(sql, batch)
+            count += len(batch)
+
+    def _next_seq(self, table: str) -> int:
+        (seq,) = self.connection.execute(
+            f"SELECT COALESCE(MAX(seq), -1) + 1 FROM {table}").fetchone()
+        return seq
+
+    # ---- 写入 ----
+
+    def _upsert_projects(self, projects: Iterable[Project]) -> int:
+        seq = self._next_seq("projects")
+        rows = ((p.project_id, seq + i, p.name, p.category, p.priority.value,
+                 p.deadline.isoformat(), p.status.value)
+                for i, p in enumerate(projects))
+        return self._execute_batches(_UPSERT_PROJECT, rows)
+
+    def _upsert_tasks(self, tasks: Iterable[Task]) -> int:
+        seq = self._next_seq("tasks")
+        rows = ((t.task_id, seq + i, t.project_id, t.name, t.estimated_hours,
+                 t.remaining_hours, t.status.value,
+                 t.due_date.isoformat() if t.due_date else None)
+                for i, t in enumerate(tasks))
+        return self._execute_batches(_UPSERT_TASK, rows)
+
+    def save_projects(self, projects: Iterable[Project]) -> int:
+        """写入或更新项目，返回写入的数量；已有项目保持原来的顺序"""
+        with self.connection:
+            return self._upsert_projects(projects)
+
+    def save_tasks(self, tasks: Iterable[Task]) -> int:
+        """写入或更新任务，返回写入的数量；已有任务保持原来的顺序"""
+        with self.connection:
+            return self._upsert_tasks(tasks)
+
+    def save_scheduler(self, scheduler: TaskScheduler) -> None:
+        """写入调度器中的全部项目和任务"""
+        self.save_projects(scheduler.projects.values())
+        self.save_tasks(scheduler.tasks.values())
+
+    def save_config(self, config: Dict) -> None:
+        """保存 test_data.json 中 scheduler_config 格式的调度参数"""
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES ('scheduler_config', ?)",
+                (json.dumps(config, ensure_ascii=False),))
+
+    def load_config(self) -> Optional[Dict]:
+        """已保存的调度参数，没有时为 None"""
+        row = self.connection.execute(
+            "SELECT value FROM settings WHERE key = 'scheduler_config'").fetchone()
+        return json.loads(row[0]) if row else None
+
+    # ---- 读取 ----
+
+    def load_active(self, scheduler: Optional[TaskScheduler] = None) -> TaskScheduler:
+        """
+        把参与排期的项目和任务载入调度器
+
+        只载入活跃项目及其下待处理、逾期的任务。已完成的任务和非活跃项目下的
+        任务不影响排期（不是候选，也不计入项目剩余工时），留在数据库中。
+
+        Args:
+            scheduler: 载入到的调度器，默认新建，并按已保存的调度参数配置
+
+        Returns:
+            载入后的调度器
+        """
+        if scheduler is None:
+            scheduler = TaskScheduler()
+            config = self.load_config()
+            if config:
+                scheduler.configure(config)
+
+        dates: Dict[str, datetime] = {}
+        active = ProjectStatus.ACTIVE.value
+        for row in self.connection.execute(
+                f"SELECT {_PROJECT_COLUMNS} FROM projects p WHERE p.status = ? ORDER BY p.seq",
+                (active,)):
+            project = _project_from_row(row, dates)
+            scheduler.projects[project.project_id] = project
+
+        placeholders = ", ".join("?" * len(_ACTIVE_TASK_STATUSES))
+        for row in self.connection.execute(
+                f"SELECT {_TASK_COLUMNS} FROM projects p "
+                f"JOIN tasks t ON t.project_id = p.project_id AND t.status IN ({placeholders}) "
+                f"WHERE p.status = ? ORDER BY t.seq",
+                (*_ACTIVE_TASK_STATUSES, active)):
+            task = _task_from_row(row, dates)
+            scheduler.tasks[task.task_id] = task
+        scheduler.rebuild_project_index()
+
+        self._loaded_projects = {project_id: project.status.value
+                                 for project_id, project in scheduler.projects.items()}
+        self._loaded_tasks = {task_id: (task.status.value, task.remaining_hours)
+                              for task_id, task in scheduler.tasks.items()}
+        return scheduler
+
+    def get_project(self, project_id: str) -> Optional[Project]:
+        """按ID读取项目"""
+        row = self.connection.execute(
+            f"SELECT {_PROJECT_COLUMNS} FROM projects p WHERE p.project_id = ?",
+            (project_id,)).fetchone()
+        return _project_from_row(row, {}) if row else None
+
+    def get_task(self, task_id: str) -> Optional[Task]:
+        """按ID读取任务"""
+        row = self.connection.execute(
+            f"SELECT {_TASK_COLUMNS} FROM tasks t WHERE t.task_id = ?", (task_id,)).fetchone()
+        return _task_from_row(row, {}) if row else None
+
+    def count_tasks(self, status: Optional[TaskStatus] = None) -> int:
+        """任务数量，给出 status 时只统计该状态"""
+        if status is None:
+            (count,) = self.connection.execute("SELECT COUNT(*) FROM tasks").fetchone()
+        else:
+            (count,) = self.connection.execute(
+                "SELECT COUNT(*) FROM tasks WHERE status = ?", (status.value,)).fetchone()
+        return count
+
+    def tasks_due_before(self, moment: datetime,
+                         statuses: Sequence[TaskStatus] = (TaskStatus.PENDING,)) -> List[Task]:
+        """
+        截止时间早于 moment 的任务，没有自身截止日期的任务按项目截止日期计算
+
+        两部分分别走 (status, due_date) 与 (status, deadline) 索引，结果按写入顺序排列。
+        """
+        values = [status.value for status in statuses]
+        placeholders = ", ".join("?" * len(values))
+        cutoff = moment.isoformat()
+        rows = self.connection.execute(
+            f"SELECT {_TASK_COLUMNS}, t.seq FROM tasks t "
+            f"WHERE t.status IN ({placeholders}) AND t.due_date < ? "
+            f"UNION ALL "
+            f"SELECT {_TASK_COLUMNS}, t.seq FROM projects p "
+            f"JOIN tasks t ON t.project_id = p.project_id AND t.status IN ({placeholders}) "
+            f"AND t.due_date IS NULL "
+            f"WHERE p.deadline < ? ORDER BY 8",
+            (*values, cutoff, *values, cutoff))
+        dates: Dict[str, datetime] = {}
+        return [_task_from_row(row[:7], dates) for row in rows]
+
+    def get_allocations(self, run_id: Optional[int] = None) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        排期运行的分配记录
+
+        Args:
+            run_id: 排期运行ID，默认最近一次
+
+        Returns:
+            日期 -> [(任务ID, 工时)]，按日期与当天的分配顺序排列
+        """
+        if run_id is None:
+            row = self.connection.execute("SELECT MAX(run_id) FROM schedule_runs").fetchone()
+            run_id = row[0]
+            if run_id is None:
+                return {}
+        allocations: Dict[str, List[Tuple[str, float]]] = {}
+        for date, task_id, hours in self.connection.execute(
+                "SELECT date, task_id, hours FROM allocations WHERE run_id = ? "
+                "ORDER BY date, position", (run_id,)):
+            allocations.setdefault(date, []).append((task_id, hours))
+        return allocations
+
+    def iter_task_history(self, task_id: str) -> Iterator[Tuple[int, str, float]]:
+        """逐条产出任务在各次排期运行中的分配：(运行ID, 日期, 工时)"""
+        yield from self.connection.execute(
+            "SELECT run_id, date, hours FROM allocations WHERE task_id = ? "
+            "ORDER BY run_id, date", (task_id,))
+
+    # ---- 写回 ----
+
+    def write_back(self, scheduler: TaskScheduler, record_schedule: bool = True) -> Optional[int]:
+        """
+        把调度器中的变化在一个事务内写回
+
+        与最近一次 load_active 时相比剩余工时或状态变化的任务、状态变化的项目
+        分批更新；之后在调度器中新增的项目和任务整行写入。
+
+        Args:
+            scheduler: 由 load_active 载入并已排期的调度器
+            record_schedule: 是否把 scheduler.schedule 记录为一次排期运行
+
+        Returns:
+            记录的排期运行ID，不记录时为 None
+        """
+        loaded_tasks = self._loaded_tasks
+        loaded_projects = self._loaded_projects
+
+        changed_tasks = []
+        new_tasks = []
+        for task_id, task in scheduler.tasks.items():
+            state = loaded_tasks.get(task_id)
+            if state is None:
+                new_tasks.append(task)
+            elif state != (task.status.value, task.remaining_hours):
+                changed_tasks.append((task.remaining_hours, task.status.value, task_id))
+
+        changed_projects = []
+        new_projects = []
+        for project_id, project in scheduler.projects.items():
+            status = loaded_projects.get(project_id)
+            if status is None:
+                new_projects.append(project)
+            elif status != project.status.value:
+                changed_projects.append((project.status.value, project_id))
+
+        run_id = None
+        with self.connection:
+            self._execute_batches(
+                "UPDATE tasks SET remaining_hours = ?, status = ? WHERE task_id = ?", changed_tasks)
+            self._execute_batches(
+                "UPDATE projects SET status = ? WHERE project_id = ?", changed_projects)
+            self._upsert_projects(new_projects)
+            self._upsert_tasks(new_tasks)
+            if record_schedule:
+                run_id = self._record_schedule(scheduler)
+
+        self._loaded_projects = {project_id: project.status.value
+                                 for project_id, project in scheduler.projects.items()}
+        self._loaded_tasks = {task_id: (task.status.value, task.remaining_hours)
+                              for task_id, task in scheduler.tasks.items()}
+        return run_id
+
+    def _record_schedule(self, scheduler: TaskScheduler) -> int:
+        """在当前事务中记录一次排期运行及其分配"""
+        schedule = scheduler.schedule
+        result = scheduler.last_result
+        cursor = self.connection.execute(
+            "INSERT INTO schedule_runs (created_at, start_date, max_days) VALUES (?, ?, ?)",
+            (datetime.now().isoformat(timespec="seconds"),
+             schedule.start_date.isoformat() if schedule.start_date else None,
+             result.max_days if result is not None else None))
+        run_id = cursor.lastrowid
+        rows = ((run_id, date, position, entry["task_id"], entry["allocated_hours"])
+                for date, entries in schedule.iter_dicts()
+                for position, entry in enumerate(entries))
+        self._execute_batches(
+            "INSERT INTO allocations (run_id, date, position, task_id, hours) VALUES (?, ?, ?, ?, ?)",
+            rows)
+        return run_id
+
+    def schedule(self, start_date: datetime, max_days: int = 30,
+                 scheduler: Optional[TaskScheduler] = None) -> Tuple[TaskScheduler, int]:
+        """
+        载入参与排期的任务、生成排期并写回
+
+        Returns:
+            (排期后的调度器, 排期运行ID)
+        """
+        scheduler = self.load_active(scheduler)
+        scheduler.generate_schedule(start_date, max_days)
+        return scheduler, self.write_back(scheduler)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+调度参数扫描
+在多个工作进程上并行评估紧迫度权重与多样性参数的不同组合
+"""
+
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from task_scheduler import TaskScheduler, Project, Task, ProjectStatus, TaskStatus, ScheduleResult
+from scheduler_batch import TenantInput, encode_tenant, decode_tenant
+
+
+# 可扫描的调度器参数
+SWEEP_PARAMETERS = ("w1", "w2", "w3", "diversity_threshold", "look_ahead_count")
+
+
+@dataclass(slots=True)
+class SweepMetrics:
+    """单次排期的评估指标"""
+    late_tasks: int            # 完成晚于截止日期或到期未完成的任务数
+    total_lateness_days: int   # 上述任务的延迟天数之和
+    max_lateness_days: int
+    delayed_projects: int
+    category_spread: float     # 平均每个排期日涉及的类别数
+    hours_scheduled: float
+
+
+@dataclass(slots=True)
+class SweepResult:
+    """一个参数组合及其评估指标"""
+    config: Dict
+    metrics: SweepMetrics
+
+
+def grid_configs(**axes: Sequence) -> Iterator[Dict]:
+    """
+    按网格生成参数组合
+
+    Example:
+        grid_configs(w1=[1.0, 2.0], look_ahead_count=[3, 5]) 生成 4 个组合
+    """
+    _check_parameters(axes)
+    names = list(axes)
+    for values in itertools.product(*(axes[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def random_configs(count: int, seed: int = 0, **ranges: Tuple) -> Iterator[Dict]:
+    """
+    在给定范围内随机采样参数组合
+
+    Args:
+        count: 组合数量
+        seed: 随机种子
+        ranges: 参数名 -> (下限, 上限)；整数上下限按整数均匀采样，否则按浮点数采样
+    """
+    _check_parameters(ranges)
+    rng = random.Random(seed)
+    for _ in range(count):
+        config = {}
+        for name, (low, high) in ranges.items():
+            if isinstance(low, int) and isinstance(high, int):
+                config[name] = rng.randint(low, high)
+            else:
+                config[name] = rng.uniform(low, high)
+        yield config
+
+
+def _check_parameters(names: Iterable[str]) -> None:
+    unknown = set(names) - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"不支持扫描的参数: {sorted(unknown)}")
+
+
+def evaluate_schedule(result: ScheduleResult) -> SweepMetrics:
+    """计算一次排期模拟的评估指标"""
+    completion_dates = {}  # 任务ID -> 最后一次分配的日期
+    category_days = 0
+    hours_scheduled = 0.0
+    for date, entries in result.schedule.items():
+        day = datetime.fromisoformat(date).date()
+        categories = set()
+        for entry in entries:
+            completion_dates[entry.task.task_id] = day
+            hours_scheduled += entry.allocated_hours
+            project = result.scheduler.projects.get(entry.task.project_id)
+            if project:
+                categories.add(project.category)
+        category_days += len(categories)
+
+    # 与调度器的候选集合一致：只统计活跃项目的任务（本次排期判定延期的项目在输入中也是活跃的）
+    delayed_ids = {project.project_id for project in result.delayed_projects}
+    end_date = (result.start_date + timedelta(days=result.end_day)).date()
+    lateness = []
+    for task in result.scheduler.tasks.values():
+        project = result.scheduler.projects.get(task.project_id)
+        if project is None:
+            continue
+        if (result.project_status(project.project_id) != ProjectStatus.ACTIVE and
+                project.project_id not in delayed_ids):
+            continue
+        # 没有截止日期的任务按项目截止日期计算，与调度器相同
+        deadline = task.due_date or project.deadline
+        if result.task_status(task.task_id) == TaskStatus.COMPLETED:
+            finished = completion_dates.get(task.task_id)
+            if finished is None:
+                continue
+        else:
+            finished = end_date
+        days_late = (finished - deadline.date()).days
+        if days_late > 0:
+            lateness.append(days_late)
+
+    scheduled_days = len(result.schedule)
+    return SweepMetrics(
+        late_tasks=len(lateness),
+        total_lateness_days=sum(lateness),
+        max_lateness_days=max(lateness, default=0),
+        delayed_projects=len(result.delayed_projects),
+        category_spread=category_days / scheduled_days if scheduled_days else 0.0,
+        hours_scheduled=hours_scheduled
+    )
+
+
+# 工作进程内的只读快照：(调度器, 开始日期, 最大天数, 基础配置)
+_snapshot = None
+
+
+def _init_worker(snapshot: bytes) -> None:
+    """工作进程初始化：解码共享快照并建立调度器"""
+    global _snapshot
+    tenant = decode_tenant(snapshot)
+    scheduler = TaskScheduler()
+    scheduler.configure(tenant.config)
+    for project in tenant.projects:
+        scheduler.add_project(project)
+    for task in tenant.tasks:
+        scheduler.add_task(task)
+    _snapshot = (scheduler, tenant.start_date, tenant.max_days, tenant.config)
+
+
+def _evaluate_config(config: Dict) -> SweepMetrics:
+    """在工作进程的快照上评估一个参数组合"""
+    scheduler, start_date, max_days, base_config = _snapshot
+    scheduler.configure(base_config)
+    for name, value in config.items():
+        setattr(scheduler, name, value)
+    return evaluate_schedule(scheduler.simulate_schedule(start_date, max_days))
+
+
+def sweep_parameters(projects: List[Project], tasks: List[Task], start_date: datetime,
+                     configs: Iterable[Dict], max_days: int = 30,
+                     base_config: Optional[Dict] = None,
+                     max_workers: Optional[int] = None) -> List[SweepResult]:
+    """
+    并行评估多个参数组合
+
+    输入只编码一次，每个工作进程启动时解码为自己的调度器，之后所有组合
+    都通过 simulate_schedule 在同一份输入表上运行，互不修改。
+
+    Args:
+        projects: 项目列表
+        tasks: 任务列表
+        start_date: 排期开始日期
+        configs: 参数组合，键为 SWEEP_PARAMETERS 中的参数名
+        max_days: 最大排期天数
+        base_config: scheduler_config 格式的基础配置，组合中未给出的参数取其值
+        max_workers: 工作进程数，默认使用全部 CPU；为 1 时在当前进程内顺序执行
+
+    Returns:
+        与 configs 顺序一致的 SweepResult 列表
+    """
+    configs = list(configs)
+    for config in configs:
+        _check_parameters(config)
+
+    snapshot = encode_tenant(TenantInput("sweep", projects, tasks, start_date,
+                                         base_config or {}, max_days))
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    if max_workers == 1:
+        global _snapshot
+        _init_worker(snapshot)
+        try:
+            metrics = [_evaluate_config(config) for config in configs]
+        finally:
+            _snapshot = None
+    else:
+        chunksize = max(1, len(configs) // (max_workers * 4))
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(snapshot,)) as executor:
+            metrics = list(executor.map(_evaluate_config, configs, chunksize=chunksize))
+
+    return [SweepResult(config, result) for config, result in zip(configs, metrics)]
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+团队排期
+多名成员各自拥有每日工时，任务可以指定给一组成员，未指定的任务进入共享池，
+任何成员都可以领取
+"""
+
+import heapq
+import math
+import time
+from datetime import datetime
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from task_scheduler import (TaskScheduler, TaskStatus, ScheduleResult, ScheduleTable, DayStats,
+                            _ScheduleBase, _ScheduleRun, _DayCheckpoint, _units_to_hours)
+
+
+@dataclass(slots=True)
+class Worker:
+    """团队成员"""
+    worker_id: str
+    name: str
+    daily_hours: float = 8.0
+
+    def to_dict(self) -> dict:
+        """转换为字典格式"""
+        return {
+            "worker_id": self.worker_id,
+            "name": self.name,
+            "daily_hours": self.daily_hours
+        }
+
+
+@dataclass(slots=True)
+class _TeamDayCheckpoint(_DayCheckpoint):
+    """团队排期的单日检查点，额外记录每条分配所属的成员"""
+    workers: List[int] = field(default_factory=list)  # 与 allocations 一一对应的成员下标
+
+
+class _WorkerLane:
+    """
+    一组候选：某个成员专属的任务、可由同一组成员领取的任务，或共享池
+
+    heap 为未查看的 (-紧迫度分数, 任务下标, 任务下标)，front 为按序取出、
+    可能已被领取的元素；overdue 为按下标递增的当天逾期任务。
+    """
+    __slots__ = ("heap", "front", "size", "overdue", "overdue_head")
+
+    def __init__(self):
+        self.heap: list = []
+        self.front: list = []
+        self.size = 0  # 尚未被领取的候选数
+        self.overdue: List[int] = []
+        self.overdue_head = 0
+
+
+class _WorkerCandidates:
+    """
+    单个成员当天的候选视图：该成员可查看的各组候选按分数合并
+
+    提供与 _CandidateQueue 相同的 peek / remove 接口，可直接交给
+    TaskScheduler._select_from_queue 应用多样性规则。被任意成员领取的任务
+    记入共享的 taken 集合，所在的组在下次查看时惰性剔除。
+    """
+
+    def __init__(self, lanes: List[_WorkerLane], taken: set, lane_of):
+        self._lanes = lanes
+        self._taken = taken
+        self._lane_of = lane_of
+
+    def __len__(self) -> int:
+        return sum(lane.size for lane in self._lanes)
+
+    def _fill(self, lane: _WorkerLane, count: int) -> None:
+        """剔除已领取的元素，并从堆中补足 count 个"""
+        taken = self._taken
+        if any(item[2] in taken for item in lane.front):
+            lane.front = [item for item in lane.front if item[2] not in taken]
+        while len(lane.front) < count and lane.heap:
+            item = heapq.heappop(lane.heap)
+            if item[2] not in taken:
+                lane.front.append(item)
+
+    def peek(self, count: int) -> List[Tuple[float, int, int]]:
+        """按分数降序返回前 count 个候选（负数语义与列表切片一致）"""
+        if count < 0:
+            count = max(0, len(self) + count)
+        for lane in self._lanes:
+            self._fill(lane, count)
+        return list(islice(heapq.merge(*(lane.front for lane in self._lanes)), count))
+
+    def remove(self, item: Tuple[float, int, int]) -> None:
+        """领取候选任务，该任务当天不再出现在任何成员的候选中"""
+        self._taken.add(item[2])
+        self._lane_of(item[2]).size -= 1
+
+
+class _TeamRun(_ScheduleRun):
+    """
+    团队排期运行的可变状态
+
+    每天先按 update_overdue 转换逾期任务，再按成员顺序依次填满每人的工时：
+    先处理其可领取的逾期任务，再在其可查看的各组候选的合并视图上应用多样性规则
+    （类别集合按成员分别统计）。任务按可领取的成员集合分组：每名成员一个专属组、
+    一个共享池，以及每个不同的多成员集合一个组，每个任务只属于一个组；
+    成员可查看的是专属组、共享池和包含自己的多成员组。
+    全部待处理任务每天只评分一次，逾期任务占满全部工时的日子不评分。
+    一个任务当天只由一名成员处理，被领取后从所在的组中惰性剔除。
+    每天的代价为 O(N) 的评分与建堆，加上 O((G + k) log N) 的选择
+    （G 为各成员可查看的组数之和，k 为当天的分配条数），与指定的成员数无关，
+    不需要为每名成员重新排序。
+    只有一名成员且任务都在共享池中时，结果与单人排期完全一致。
+    设置了工作日历时，日历给出的当天工时是每名成员当天工时的上限。
+    """
+
+    _checkpoint_class = _TeamDayCheckpoint
+
+    def __init__(self, scheduler: "TeamScheduler", base: _ScheduleBase,
+                 keep_checkpoints: bool = True, max_days: Optional[int] = None):
+        super().__init__(scheduler, base, keep_checkpoints, max_days)
+        self.workers: List[Worker] = list(scheduler.workers.values())
+        self.worker_units = [math.floor(worker.daily_hours * 2 + 1e-9) for worker in self.workers]
+
+        # 组的下标：0..W-1 为各成员专属组，W 为共享池，之后为各多成员集合的组
+        worker_count = len(self.workers)
+        worker_rows = {worker.worker_id: row for row, worker in enumerate(self.workers)}
+        group_rows: Dict[Tuple[int, ...], int] = {(row,): row for row in range(worker_count)}
+        self.lane_count = worker_count + 1
+        # 任务下标 -> 所在组的下标，-1 表示没有可领取的成员
+        self.lane_of: List[int] = [worker_count] * len(base.tasks)
+        for task_id, worker_ids in scheduler.task_workers.items():
+            index = base.task_rows.get(task_id)
+            if index is None:
+                continue
+            rows = tuple(sorted({worker_rows[w] for w in worker_ids if w in worker_rows}))
+            if not rows:
+                self.lane_of[index] = -1
+                continue
+            group = group_rows.get(rows)
+            if group is None:
+                group = group_rows[rows] = self.lane_count
+                self.lane_count += 1
+            self.lane_of[index] = group
+        # 成员下标 -> 可查看的组（专属组、共享池、包含该成员的多成员组）
+        self.worker_lanes: List[List[int]] = [[row, worker_count] for row in range(worker_count)]
+        for rows, group in group_rows.items():
+            if len(rows) > 1:
+                for row in rows:
+                    self.worker_lanes[row].append(group)
+
+    def _iter_overdue(self, lane: _WorkerLane, taken: set):
+        """按顺序遍历一组中尚未被领取的逾期任务"""
+        items = lane.overdue
+        while lane.overdue_head < len(items) and items[lane.overdue_head] in taken:
+            lane.overdue_head += 1
+        for i in range(lane.overdue_head, len(items)):
+            if items[i] not in taken:
+                yield items[i]
+
+    def _fill_lanes(self, day: int, lanes: List[_WorkerLane], stats: Optional[DayStats]) -> None:
+        """为全部待处理任务评分，并分入各自所在组的堆"""
+        lane_of = self.lane_of
+        candidate_indexes = list(self.pending)
+        if stats is not None:
+            start = time.perf_counter()
+            stats.candidates = len(candidate_indexes)
+        scores = self.score(day, candidate_indexes)
+        if stats is not None:
+            start = stats.lap("scoring", start)
+        for index, score in zip(candidate_indexes, scores):
+            group = lane_of[index]
+            if group >= 0:
+                lanes[group].heap.append((-score, index, index))
+        for lane in lanes:
+            heapq.heapify(lane.heap)
+            lane.size = len(lane.heap)
+        if stats is not None:
+            stats.lap("selection", start, 0)
+
+    def _run_day(self, day: int, stats: Optional[DayStats]) -> Optional[List[Tuple[int, int]]]:
+        """
+        模拟第 day 天的团队排期
+
+        Returns:
+            当天的 (任务下标, 分配的 0.5 小时单位) 列表，按成员顺序排列；
+            已没有任何待处理或逾期任务时返回 None
+        """
+        if self.day_units is not None and self.day_units[day] == 0:
+            return self._run_gap_day(day, stats)
+
+        if stats is not None:
+            start = time.perf_counter()
+        self.update_overdue(day)
+        if stats is not None:
+            stats.lap("update_overdue_tasks", start)
+            stats.overdue = len(self.overdue_queue)
+        if not self.overdue_queue and not self.pending:
+            return None
+
+        checkpoint = _TeamDayCheckpoint(list(self.overdue_queue), [], set(), None, False)
+        allocations = checkpoint.allocations
+        allocation_workers = checkpoint.workers
+
+        lanes = [_WorkerLane() for _ in range(self.lane_count)]
+        lane_of = self.lane_of
+
+        def lane_of_task(index: int) -> _WorkerLane:
+            return lanes[lane_of[index]]
+
+        for index in self.overdue_queue:
+            if lane_of[index] >= 0:
+                lanes[lane_of[index]].overdue.append(index)
+
+        taken = set()
+        scored = False
+        category_of = self.task_category.__getitem__
+        for row, worker_lanes in enumerate(self.worker_lanes):
+            visible = [lanes[group] for group in worker_lanes]
+            categories_scheduled_today = set()
+            remaining_units = self.worker_units[row]
+            if self.day_units is not None:
+                remaining_units = min(remaining_units, self.day_units[day])
+
+            # 首先处理可领取的逾期任务
+            if stats is not None:
+                start = time.perf_counter()
+                allocated_before = len(allocations)
+            for index in heapq.merge(*(self._iter_overdue(lane, taken) for lane in visible)):
+                if remaining_units <= 0:
+                    break
+
+                taken.add(index)
+                units = min(remaining_units, self.remaining[index])
+                if units > 0:
+                    allocations.append((index, units))
+                    allocation_workers.append(row)
+                    self._allocate(index, units)
+                    if self.status[index] == TaskStatus.COMPLETED:
+                        del self.overdue_queue[index]
+
+                    remaining_units -= units
+                    categories_scheduled_today.add(self.task_category[index])
+
+            if stats is not None:
+                stats.lap("allocation", start, len(allocations) - allocated_before)
+
+            # 处理常规任务；逾期分配不影响分数，评分推迟到第一次需要时
+            if remaining_units > 0 and not scored:
+                self._fill_lanes(day, lanes, stats)
+                scored = True
+            candidates = _WorkerCandidates(visible, taken, lane_of_task)
+            if stats is not None:
+                start = time.perf_counter()
+            while remaining_units > 0 and candidates:
+                selected = self.scheduler._select_from_queue(
+                    candidates, categories_scheduled_today, category_of)
+                index = selected[2]
+                if stats is not None:
+                    start = stats.lap("selection", start)
+
+                units = min(remaining_units, self.remaining[index])
+                if units > 0:
+                    allocations.append((index, units))
+                    allocation_workers.append(row)
+                    self._allocate(index, units)
+                    remaining_units -= units
+                    categories_scheduled_today.add(self.task_category[index])
+
+                candidates.remove(selected)
+                if stats is not None:
+                    start = stats.lap("allocation", start)
+
+        if self.keep_checkpoints:
+            self.checkpoints.append(checkpoint)
+        return allocations
+
+    def first_affected_day(self, base: _ScheduleBase, changed: set) -> int:
+        """团队排期不做增量判断，重排总是从第一天开始"""
+        return 0
+
+
+class TeamScheduleResult(ScheduleResult):
+    """团队排期的结果，schedule 为全部成员合并后的排期"""
+
+    @property
+    def workers(self) -> List[Worker]:
+        """参与本次排期的成员"""
+        return self._run.workers
+
+    def worker_schedule(self, worker_id: str) -> ScheduleTable:
+        """单个成员的排期"""
+        row = next((row for row, worker in enumerate(self.workers)
+                    if worker.worker_id == worker_id), None)
+        if row is None:
+            raise KeyError(worker_id)
+        return self._build_table(
+            (day, [allocation for allocation, worker in
+                   zip(checkpoint.allocations, checkpoint.workers) if worker == row])
+            for day, checkpoint in enumerate(self._run.checkpoints)
+        )
+
+    def hours_by_worker(self) -> Dict[str, float]:
+        """成员ID -> 分配的总工时"""
+        totals = [0] * len(self.workers)
+        for checkpoint in self._run.checkpoints:
+            for (_, units), row in zip(checkpoint.allocations, checkpoint.workers):
+                totals[row] += units
+        return {worker.worker_id: _units_to_hours(units)
+                for worker, units in zip(self.workers, totals)}
+
+
+class TeamScheduler(TaskScheduler):
+    """
+    团队调度器
+
+    在 TaskScheduler 的基础上增加成员及其每日工时，以及任务到成员的指定关系。
+    项目、任务、评分参数与工作日历的用法不变；daily_work_hours 不再使用，
+    每日工时由成员决定。
+    simulate_schedule / generate_schedule / replan 返回或基于 TeamScheduleResult。
+    """
+
+    _run_class = _TeamRun
+    _result_class = TeamScheduleResult
+
+    def __init__(self, workers: Iterable[Worker] = (), **kwargs):
+        super().__init__(**kwargs)
+        self.workers: Dict[str, Worker] = {}
+        self.task_workers: Dict[str, Tuple[str, ...]] = {}  # 任务ID -> 可领取的成员ID
+        for worker in workers:
+            self.add_worker(worker)
+
+    def add_worker(self, worker: Worker) -> None:
+        """添加成员"""
+        self.workers[worker.worker_id] = worker
+
+    def assign_task(self, task_id: str, worker_ids: Optional[Iterable[str]]) -> None:
+        """
+        指定可以处理任务的成员
+
+        Args:
+            task_id: 任务ID
+            worker_ids: 成员ID；为 None 或空时任务回到共享池，任何成员都可领取
+        """
+        worker_ids = tuple(worker_ids or ())
+        unknown = [worker_id for worker_id in worker_ids if worker_id not in self.workers]
+        if unknown:
+            raise ValueError(f"未知的成员: {unknown}")
+        if worker_ids:
+            self.task_workers[task_id] = worker_ids
+        else:
+            self.task_workers.pop(task_id, None)
+
+    def _capacity_units(self, start_date: datetime, days: int) -> List[int]:
+        """全部成员每天可用的 0.5 小时单位之和，日历给出的当天工时是每名成员的上限"""
+        worker_units = [math.floor(worker.daily_hours * 2 + 1e-9) for worker in self.workers.values()]
+        if self.calendar is None:
+            return [sum(worker_units)] * days
+        return [sum(min(units, day_units) for units in worker_units)
+                for day_units in self.calendar.capacity_units(start_date, days)]
+
+    def get_worker_schedule(self, worker_id: str) -> ScheduleTable:
+        """最近一次 generate_schedule 中单个成员的排期"""
+        if self.last_result is None:
+            if worker_id not in self.workers:
+                raise KeyError(worker_id)
+            return ScheduleTable()
+        return self.last_result.worker_schedule(worker_id)
@@ -5,11 +5,23 @@
 基于紧迫度驱动、动态调整、兼顾多样性的设计理念
 """
 
-from datetime import datetime, timedelta
-from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Dict, Tuple, Optional, Iterator, Mapping, Callable
+from dataclasses import dataclass, field, replace
 from enum import Enum
+from array import array
+import bisect
+import copy
+import heapq
+import itertools
 import json
+import math
+import time
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，仅向量化评分引擎需要
+    np = None
 
 
 class ProjectStatus(Enum):
@@ -33,7 +45,24 @@ class Priority(Enum):
     LOW = 3
 
 
-@dataclass
+# 优先级因子：高=1.5, 中=1.0, 低=0.5
+PRIORITY_FACTORS = {
+    Priority.HIGH: 1.5,
+    Priority.MEDIUM: 1.0,
+    Priority.LOW: 0.5
+}
+
+# 可选的紧迫度评分引擎
+SCORING_ENGINES = ("scalar", "numpy")
+
+# 可选的多样性选择引擎
+SELECTION_ENGINES = ("window", "category")
+
+# 性能统计的阶段，按每天的执行顺序排列
+PROFILE_PHASES = ("update_overdue_tasks", "get_pending_tasks", "scoring", "selection", "allocation")
+
+
+@dataclass(slots=True)
 class Project:
     """项目数据结构"""
     project_id: str
@@ -55,7 +84,7 @@ class Project:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """任务数据结构"""
     task_id: str
@@ -84,7 +113,7 @@ class Task:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ScheduleEntry:
     """排期条目"""
     task: Task
@@ -103,23 +132,1294 @@ class ScheduleEntry:
         }
 
 
+@dataclass(slots=True)
+class WorkCalendar:
+    """
+    工作日历
+
+    每天的可用工时依次取：指定日期的覆盖值、节假日（0 小时）、按星期几的工时。
+    日期可以用 date、datetime 或 ISO 格式字符串给出，统一按日期比较。
+    """
+    weekday_hours: Tuple[float, ...] = (8.0, 8.0, 8.0, 8.0, 8.0, 0.0, 0.0)  # 周一至周日
+    holidays: set = field(default_factory=set)
+    overrides: Dict[date, float] = field(default_factory=dict)  # 日期 -> 当天工时
+
+    def __post_init__(self):
+        """初始化后处理：统一日期类型"""
+        if len(self.weekday_hours) != 7:
+            raise ValueError("weekday_hours 需要给出周一至周日 7 天的工时")
+        self.weekday_hours = tuple(self.weekday_hours)
+        self.holidays = {_as_date(day) for day in self.holidays}
+        self.overrides = {_as_date(day): hours for day, hours in self.overrides.items()}
+
+    def hours_on(self, day) -> float:
+        """某一天的可用工时"""
+        day = _as_date(day)
+        if day in self.overrides:
+            return self.overrides[day]
+        if day in self.holidays:
+            return 0.0
+        return self.weekday_hours[day.weekday()]
+
+    def capacity_units(self, start_date: datetime, days: int) -> array:
+        """从 start_date 起连续 days 天的可用工时，以 0.5 小时为单位向下取整"""
+        start = start_date.date()
+        return array('i', (math.floor(self.hours_on(start + timedelta(days=offset)) * 2 + 1e-9)
+                           for offset in range(days)))
+
+    def key(self) -> tuple:
+        """可比较的日历内容，用于判断两次运行的日历是否相同"""
+        return (self.weekday_hours, frozenset(self.holidays),
+                frozenset(self.overrides.items()))
+
+    def to_dict(self) -> dict:
+        """转换为字典格式"""
+        return {
+            "weekday_hours": list(self.weekday_hours),
+            "holidays": sorted(day.isoformat() for day in self.holidays),
+            "overrides": {day.isoformat(): hours for day, hours in sorted(self.overrides.items())}
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "WorkCalendar":
+        """由 to_dict 格式的字典创建日历，缺省的项取默认值"""
+        return cls(**{name: data[name] for name in ("weekday_hours", "holidays", "overrides")
+                      if name in data})
+
+
+def _as_date(value) -> date:
+    """将 date / datetime / ISO 字符串统一为 date"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+class _CandidateQueue:
+    """
+    当天候选任务的优先队列
+
+    以 (-紧迫度分数, 原始序号) 为键建堆，弹出顺序与 sort_tasks_by_urgency
+    的稳定降序排序完全一致。已弹出但未被选中的队首元素暂存在 _front 中，
+    删除任务时若其仍在堆内则只做标记（惰性删除），弹出时再跳过。
+
+    popped 记录当天被取出查看过的全部元素，starved 表示是否曾因堆耗尽而
+    没能取满，二者供增量重排判断某天的决策是否受影响。
+    """
+
+    def __init__(self, task_scores: List[Tuple[Task, float]]):
+        self._heap = [(-score, seq, task)
+                      for seq, (task, score) in enumerate(task_scores)]
+        heapq.heapify(self._heap)
+        self._front: List[Tuple[float, int, Task]] = []
+        self._removed: set = set()
+        self._size = len(self._heap)
+        self.popped: List[Tuple[float, int, Task]] = []
+        self.starved = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _fill(self, count: int) -> None:
+        """从堆中按序取出元素，直到队首缓存达到 count 个"""
+        while len(self._front) < count and self._heap:
+            item = heapq.heappop(self._heap)
+            if item[1] in self._removed:
+                self._removed.discard(item[1])
+                continue
+            self._front.append(item)
+            self.popped.append(item)
+        if len(self._front) < count:
+            self.starved = True
+
+    def peek(self, count: int) -> List[Tuple[float, int, Task]]:
+        """按分数降序返回前 count 个候选（负数语义与列表切片一致）"""
+        if count < 0:
+            count = max(0, self._size + count)
+        self._fill(count)
+        return self._front[:count]
+
+    def remove(self, item: Tuple[float, int, Task]) -> None:
+        """移除候选任务"""
+        for i, front_item in enumerate(self._front):
+            if front_item[1] == item[1]:
+                del self._front[i]
+                break
+        else:
+            self._removed.add(item[1])
+        self._size -= 1
+
+
+class _CategoryLane:
+    """单个类别的候选：未弹出的堆，以及按序弹出、尚未移除的元素 front[head:]"""
+    __slots__ = ("heap", "front", "head")
+
+    def __init__(self, heap: list):
+        heapq.heapify(heap)
+        self.heap = heap
+        self.front: list = []
+        self.head = 0
+
+
+class _CategoryQueues:
+    """
+    按类别分组的当天候选队列，供 "category" 选择引擎使用
+
+    每个类别一个以 (-紧迫度分数, 原始序号) 为键的堆，合并后的顺序与
+    _CandidateQueue 相同。多样性规则选中的是前 look_ahead_count 个候选中
+    第一个未安排类别的任务，它必然是各未安排类别队首中键最小的 h*；
+    只需再统计排在 h* 之前的候选数是否小于 look_ahead_count。
+    统计时各类别只弹出键小于 h* 的元素，并在已弹出的有序 front 上二分，
+    因此每次选择的代价为 O(C log N)，与 look_ahead_count 无关。
+
+    popped / starved 的含义与 _CandidateQueue 相同：popped 为影响过选择的元素，
+    starved 表示键更大的新候选也可能改变选择。
+    """
+
+    def __init__(self, task_scores: List[Tuple[Task, float]], category_of):
+        groups: Dict[Optional[str], list] = {}
+        for seq, (task, score) in enumerate(task_scores):
+            groups.setdefault(category_of(task), []).append((-score, seq, task))
+        self._lanes = {category: _CategoryLane(heap) for category, heap in groups.items()}
+        self._category_of = category_of
+        self._size = len(task_scores)
+        self.popped: List[Tuple[float, int, Task]] = []
+        self.starved = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _pop(self, lane: _CategoryLane) -> None:
+        item = heapq.heappop(lane.heap)
+        lane.front.append(item)
+        self.popped.append(item)
+
+    def _head(self, lane: _CategoryLane, take: bool = False) -> Optional[tuple]:
+        """类别的队首；take 为真时将其标记为已查看"""
+        if lane.head < len(lane.front):
+            return lane.front[lane.head]
+        if not lane.heap:
+            return None
+        if not take:
+            return lane.heap[0]
+        self._pop(lane)
+        return lane.front[-1]
+
+    def _iter_lane(self, lane: _CategoryLane):
+        """按序遍历类别中的候选，必要时从堆中弹出"""
+        i = lane.head
+        while True:
+            if i < len(lane.front):
+                yield lane.front[i]
+                i += 1
+            elif lane.heap:
+                self._pop(lane)
+            else:
+                return
+
+    def _rank(self, key: tuple, limit: int) -> int:
+        """排在 key 之前的候选数，达到 limit 后不再精确统计"""
+        rank = 0
+        for lane in self._lanes.values():
+            while (lane.heap and lane.heap[0][:2] < key
+                   and len(lane.front) - lane.head < limit - rank):
+                self._pop(lane)
+            if lane.heap and lane.heap[0][:2] < key:
+                return limit
+            rank += bisect.bisect_left(lane.front, key, lane.head) - lane.head
+            if rank >= limit:
+                return limit
+        return rank
+
+    def top(self) -> tuple:
+        """分数最高的候选"""
+        best = None
+        for lane in self._lanes.values():
+            head = self._head(lane)
+            if head is not None and (best is None or head[:2] < best[0][:2]):
+                best = (head, lane)
+        return self._head(best[1], take=True)
+
+    def select(self, categories_scheduled_today: set, look_ahead_count: int,
+               diversity_threshold: float) -> tuple:
+        """应用多样性规则选择候选，结果与 apply_diversity_rule 一致"""
+        top = self.top()
+        if not categories_scheduled_today:
+            return top
+
+        if look_ahead_count < 0:
+            look_ahead_count = max(0, self._size + look_ahead_count)
+        highest_score = -top[0]
+
+        # 按全局顺序遍历未安排类别的候选；最高分为正时阈值条件随分数单调，
+        # 只需检查第一个（即 h*）
+        unscheduled = [self._iter_lane(lane) for category, lane in self._lanes.items()
+                       if category is not None and category not in categories_scheduled_today]
+        for item in heapq.merge(*unscheduled):
+            if self._rank(item[:2], look_ahead_count) >= look_ahead_count:
+                return top
+            score = -item[0]
+            if (highest_score - score) / highest_score <= diversity_threshold:
+                return item
+            if highest_score > 0:
+                return top
+
+        self.starved = True
+        return top
+
+    def remove(self, item: Tuple[float, int, Task]) -> None:
+        """移除候选任务"""
+        lane = self._lanes[self._category_of(item[2])]
+        i = bisect.bisect_left(lane.front, item[:2], lane.head)
+        if i == lane.head:
+            lane.head += 1
+        else:
+            del lane.front[i]
+        self._size -= 1
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _datetime_to_us(value: datetime) -> int:
+    """将 datetime 换算为自纪元起的整微秒数"""
+    epoch = _EPOCH if value.tzinfo is None else _EPOCH.replace(tzinfo=timezone.utc)
+    return (value - epoch) // timedelta(microseconds=1)
+
+
+def _pop_overdue(heap: list, bound, check: Callable[[tuple], Optional[bool]]) -> list:
+    """
+    从截止时间最小堆中弹出截止键早于 bound 的条目
+
+    条目为 (截止键, 插入序号, ...)。check 返回 True 表示转为逾期，False 表示丢弃
+    （已不是待处理状态），None 表示暂不处理、放回堆中。返回的条目按插入序号排列，
+    与按待处理顺序逐个扫描的结果一致；排期运行与 TaskScheduler 共用这一实现。
+    """
+    due = []
+    held = []
+    while heap and heap[0][0] < bound:
+        item = heapq.heappop(heap)
+        keep = check(item)
+        if keep:
+            due.append(item)
+        elif keep is None:
+            held.append(item)
+    for item in held:
+        heapq.heappush(heap, item)
+    due.sort(key=lambda item: item[1])
+    return due
+
+
+def _hours_to_units(hours: float) -> int:
+    """小时换算为 0.5 小时单位的整数，未对齐的工时向上取整"""
+    return math.ceil(hours * 2 - 1e-9)
+
+
+def _units_to_hours(units: int) -> float:
+    """0.5 小时单位的整数换算回小时"""
+    return units / 2
+
+
+class _ScheduleBase:
+    """
+    排期运行的只读输入表
+
+    导入时将截止日期换算为相对开始日期的整数天序号，将工时换算为 0.5 小时
+    单位的整数，之后的逐日模拟只做整数运算。对任意 datetime 有
+    (deadline - (start + d 天)).days == (deadline - start).days - d，且
+    deadline < start + d 天 等价于 (deadline - start).days < d，
+    因此与按 datetime 计算的结果完全一致。
+
+    未对齐到 0.5 小时的输入按以下规则取整：任务工时向上取整，每日可用工时向下取整。
+    同一开始日期的多次运行共享同一个输入表，可变状态保存在各自的 _ScheduleRun 中。
+    """
+
+    # 每个任务一行的列
+    _TASK_COLUMNS = ("tasks", "input_hours", "remaining", "status",
+                     "project_of", "deadline_day", "task_category")
+
+    def __init__(self, scheduler: "TaskScheduler", start_date: datetime):
+        self.start_date = start_date
+
+        # 项目表
+        self.projects: List[Project] = []
+        self.project_rows: Dict[str, int] = {}
+        self.project_status: List[ProjectStatus] = []
+        self.project_deadline_day: List[int] = []
+        self.project_category: List[str] = []
+        self.project_priority_factor: List[float] = []
+        self.project_active: List[bool] = []
+        self.project_pending_units: List[int] = []
+        self.project_pending_count: List[int] = []
+        for project in scheduler.projects.values():
+            self._append_project(project)
+
+        # 任务表（下标即 self.tasks 的插入顺序）
+        self.tasks: List[Task] = list(scheduler.tasks.values())
+        task_count = len(self.tasks)
+        self.task_rows: Dict[str, int] = {}
+        self.input_hours: List[float] = [0.0] * task_count
+        self.remaining: List[int] = [0] * task_count
+        self.status: List[TaskStatus] = [TaskStatus.PENDING] * task_count
+        self.project_of: List[int] = [-1] * task_count
+        self.deadline_day: List[int] = [0] * task_count
+        self.task_category: List[Optional[str]] = [None] * task_count
+        self.pending: List[int] = []  # 属于活跃项目的待处理任务下标
+
+        for index, task in enumerate(self.tasks):
+            self.task_rows[task.task_id] = index
+            if self._load_row(index, task):
+                self.pending.append(index)
+
+        self._numpy_arrays = None
+
+    def _append_project(self, project: Project) -> None:
+        """追加一行项目数据"""
+        self.project_rows[project.project_id] = len(self.projects)
+        self.projects.append(project)
+        self.project_status.append(project.status)
+        self.project_deadline_day.append((project.deadline - self.start_date).days)
+        self.project_category.append(project.category)
+        self.project_priority_factor.append(PRIORITY_FACTORS[project.priority])
+        self.project_active.append(project.status == ProjectStatus.ACTIVE)
+        self.project_pending_units.append(0)
+        self.project_pending_count.append(0)
+
+    def _load_row(self, index: int, task: Task) -> bool:
+        """载入一行任务数据并计入项目聚合值，返回其是否为活跃项目的待处理任务"""
+        units = _hours_to_units(task.remaining_hours)
+        self.input_hours[index] = task.remaining_hours
+        self.remaining[index] = units
+        self.status[index] = task.status
+
+        row = self.project_rows.get(task.project_id, -1)
+        self.project_of[index] = row
+        if row < 0:
+            self.deadline_day[index] = 0
+            self.task_category[index] = None
+            return False
+
+        if task.due_date:
+            self.deadline_day[index] = (task.due_date - self.start_date).days
+        else:
+            self.deadline_day[index] = self.project_deadline_day[row]
+        self.task_category[index] = self.project_category[row]
+
+        if task.status != TaskStatus.PENDING:
+            return False
+        self.project_pending_units[row] += units
+        self.project_pending_count[row] += 1
+        return self.project_active[row]
+
+    def _unload_row(self, index: int) -> None:
+        """从项目聚合值中扣除一行任务数据"""
+        row = self.project_of[index]
+        if row >= 0 and self.status[index] == TaskStatus.PENDING:
+            self.project_pending_units[row] -= self.remaining[index]
+            self.project_pending_count[row] -= 1
+
+    def is_pending(self, index: int) -> bool:
+        """任务在输入中是否为活跃项目的待处理任务"""
+        row = self.project_of[index]
+        return (row >= 0 and self.project_active[row] and
+                self.status[index] == TaskStatus.PENDING)
+
+    def patched(self, scheduler: "TaskScheduler",
+                task_ids: List[str]) -> Tuple["_ScheduleBase", set]:
+        """
+        复制输入表，并按调度器中这些任务的最新数据更新对应的行
+
+        此后新增的项目和任务（按调度器中的插入顺序追加）也会一并载入。
+
+        Returns:
+            (新的输入表, 发生变化的任务下标集合)
+        """
+        base = copy.copy(self)
+        for name in self._TASK_COLUMNS + ("pending",):
+            setattr(base, name, list(getattr(self, name)))
+        for name in ("projects", "project_status", "project_deadline_day",
+                     "project_category", "project_priority_factor", "project_active",
+                     "project_pending_units", "project_pending_count"):
+            setattr(base, name, list(getattr(self, name)))
+        base.project_rows = dict(self.project_rows)
+        base.task_rows = dict(self.task_rows)
+        base._numpy_arrays = None
+
+        changed_ids = list(task_ids)
+        for project in itertools.islice(scheduler.projects.values(), len(self.projects), None):
+            base._append_project(project)
+            # 之前引用了不存在项目的任务需要重新载入
+            changed_ids.extend(
+                task.task_id for task in scheduler.get_tasks_by_project(project.project_id))
+        changed_ids.extend(itertools.islice(scheduler.tasks, len(self.tasks), None))
+
+        changed = set()
+        for task_id in changed_ids:
+            task = scheduler.tasks[task_id]
+            index = base.task_rows.get(task_id)
+            if index is None:
+                index = len(base.tasks)
+                base.task_rows[task_id] = index
+                for name in self._TASK_COLUMNS:
+                    getattr(base, name).append(None)
+            else:
+                base._unload_row(index)
+                position = bisect.bisect_left(base.pending, index)
+                if position < len(base.pending) and base.pending[position] == index:
+                    del base.pending[position]
+
+            base.tasks[index] = task
+            if base._load_row(index, task):
+                bisect.insort(base.pending, index)
+            changed.add(index)
+
+        return base, changed
+
+    def numpy_arrays(self) -> tuple:
+        """向量化评分所需的列（按需构建）"""
+        if self._numpy_arrays is None:
+            self._numpy_arrays = (
+                np.array([self.project_priority_factor[row] if row >= 0 else 0.0
+                          for row in self.project_of], dtype=np.float64),
+                np.array(self.deadline_day, dtype=np.int64),
+                np.array([max(row, 0) for row in self.project_of], dtype=np.int64),
+                np.array([row >= 0 for row in self.project_of], dtype=bool),
+                np.array(self.project_deadline_day, dtype=np.int64),
+            )
+        return self._numpy_arrays
+
+    def numpy_scores(self, weights: tuple, rows: List[int], day: int,
+                     project_hours: List[float]) -> List[float]:
+        """
+        向量化计算一批任务在第 day 天的紧迫度分数
+
+        与 calculate_urgency_score 相同的运算顺序，保证结果逐位一致；
+        排期运行与 TaskScheduler.score_tasks 共用这一实现。
+
+        Args:
+            weights: (w1, w2, w3)
+            rows: 任务下标
+            day: 相对开始日期的天序号
+            project_hours: 按项目下标排列的待处理工时
+        """
+        if not self.projects:
+            return [0.0] * len(rows)
+        w1, w2, w3 = weights
+        priority_factor, deadline_day, project_of, has_project, project_deadline_day = \
+            self.numpy_arrays()
+        rows = np.array(rows, dtype=np.int64)
+        project_hours = np.array(project_hours, dtype=np.float64)
+        project_days = np.maximum(1, project_deadline_day - day)
+        project_index = project_of[rows]
+        scores = (
+            w1 * priority_factor[rows] +
+            w2 * (1.0 / np.maximum(1, deadline_day[rows] - day)) +
+            w3 * (project_hours[project_index] / project_days[project_index])
+        )
+        # 项目不存在的任务与标量实现一样记 0 分
+        return np.where(has_project[rows], scores, 0.0).tolist()
+
+
+@dataclass(slots=True)
+class _DayCheckpoint:
+    """
+    单日检查点
+
+    记录当天相对前一天的状态变化（逾期转换与工时分配），以及判断某项变更
+    是否会影响当天决策所需的信息。
+    """
+    flipped: List[int]  # 当天转为逾期的任务下标
+    allocations: List[Tuple[int, int]]  # (任务下标, 分配的 0.5 小时单位)
+    examined: set  # 当天从候选队列中取出查看过的任务下标
+    cutoff: Optional[Tuple[float, int]]  # 最后取出的候选键 (-分数, 任务下标)
+    starved: bool  # 仍有工时时候选是否已耗尽
+
+
+@dataclass(slots=True)
+class DayStats:
+    """单日各阶段的耗时（秒）与调用次数，以及当天的候选规模"""
+    day: int  # 相对开始日期的天序号
+    date: str
+    seconds: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(PROFILE_PHASES, 0.0))
+    calls: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(PROFILE_PHASES, 0))
+    overdue: int = 0  # 当天转为逾期的任务数
+    candidates: int = 0  # 参与评分的待处理任务数
+    examined: int = 0  # 从候选队列中取出查看过的任务数
+    allocations: int = 0  # 当天的分配条数
+
+    def lap(self, phase: str, start: float, calls: int = 1) -> float:
+        """把从 start 到现在的耗时计入阶段 phase，返回当前时刻"""
+        now = time.perf_counter()
+        self.seconds[phase] += now - start
+        self.calls[phase] += calls
+        return now
+
+    @property
+    def total_seconds(self) -> float:
+        """当天各阶段的总耗时"""
+        return sum(self.seconds.values())
+
+    def to_dict(self) -> dict:
+        """转换为字典格式"""
+        return {
+            "day": self.day,
+            "date": self.date,
+            "seconds": dict(self.seconds),
+            "calls": dict(self.calls),
+            "overdue": self.overdue,
+            "candidates": self.candidates,
+            "examined": self.examined,
+            "allocations": self.allocations
+        }
+
+
+class ScheduleStats:
+    """
+    一次排期运行的分阶段统计
+
+    通过 TaskScheduler.enable_profiling 开启后，每次运行逐日记录 DayStats；
+    给出回调时每记录完一天即调用一次，可用于在运行过程中上报。
+    """
+
+    def __init__(self, callback: Optional[Callable[[DayStats], None]] = None):
+        self.days: List[DayStats] = []
+        self.callback = callback
+
+    def record(self, day_stats: DayStats) -> None:
+        """记录一天的统计"""
+        self.days.append(day_stats)
+        if self.callback is not None:
+            self.callback(day_stats)
+
+    def totals(self) -> Dict[str, Dict]:
+        """全部天数合计的 {"seconds": 阶段 -> 秒, "calls": 阶段 -> 次数}"""
+        seconds = dict.fromkeys(PROFILE_PHASES, 0.0)
+        calls = dict.fromkeys(PROFILE_PHASES, 0)
+        for day_stats in self.days:
+            for phase in PROFILE_PHASES:
+                seconds[phase] += day_stats.seconds[phase]
+                calls[phase] += day_stats.calls[phase]
+        return {"seconds": seconds, "calls": calls}
+
+    def slowest_days(self, count: int = 5) -> List[DayStats]:
+        """总耗时最长的若干天"""
+        return sorted(self.days, key=lambda day_stats: day_stats.total_seconds, reverse=True)[:count]
+
+    def to_dict(self) -> dict:
+        """转换为字典格式"""
+        return {"totals": self.totals(), "days": [day_stats.to_dict() for day_stats in self.days]}
+
+
+class _ScheduleRun:
+    """
+    一次排期运行的可变状态，叠加在共享的 _ScheduleBase 之上
+
+    待处理任务同时保存在按 (截止天序号, 下标) 排列的最小堆中，每天只弹出
+    刚刚到期的任务，逾期维护的代价与当天转换的任务数成正比，而不是 O(N)。
+    已完成或已转换的任务留在堆中，弹出时按不在 pending 中跳过。
+    pending 与 overdue_queue 都是保持下标顺序的有序集合（值为 None 的字典），
+    删除为 O(1)。
+
+    设置了工作日历时，构造时按排期天数预先计算每天的可用工时数组。
+    连续的零工时日作为一段整体规划：一次从堆中取出区间内到期的任务，
+    算出每个任务在哪一天转为逾期，之后逐日只应用当天的转换；
+    结果与逐日运行完全相同。
+    """
+
+    _checkpoint_class = _DayCheckpoint
+
+    def __init__(self, scheduler: "TaskScheduler", base: _ScheduleBase,
+                 keep_checkpoints: bool = True, max_days: Optional[int] = None):
+        self.scheduler = scheduler
+        self.base = base
+        self.keep_checkpoints = keep_checkpoints  # 不需要重排时可不保留检查点
+        self.tasks = base.tasks
+        self.task_category = base.task_category
+        self.config = scheduler._run_config()
+        self.daily_units = self.config[0]
+
+        # 天序号 -> 当天可用的 0.5 小时单位，None 表示每天都是 daily_units
+        self.day_units: Optional[array] = None
+        if scheduler.calendar is not None and max_days is not None:
+            self.day_units = scheduler.calendar.capacity_units(base.start_date, max_days)
+        self._gap_end = 0  # 当前零工时区间的结束天序号（不含）
+        self._gap_stop: Optional[int] = None  # 区间内没有剩余工作的那一天
+        self._gap_flips: Dict[int, List[int]] = {}  # 区间内的天序号 -> 当天转为逾期的任务
+
+        # 开启性能统计时逐日记录各阶段耗时
+        self.stats: Optional[ScheduleStats] = None
+        if scheduler.profiling:
+            self.stats = ScheduleStats(scheduler.profile_callback)
+
+        self.remaining = list(base.remaining)
+        self.status = list(base.status)
+        # 待处理任务与当天转为逾期的任务，均为保持下标顺序的有序集合
+        self.pending: Dict[int, None] = dict.fromkeys(base.pending)
+        self.project_pending_units = list(base.project_pending_units)
+        self.project_pending_count = list(base.project_pending_count)
+        self.overdue_queue: Dict[int, None] = {}
+        # 待处理任务按 (截止天序号, 下标) 排列的最小堆
+        self._deadline_heap = [(base.deadline_day[index], index) for index in base.pending]
+        heapq.heapify(self._deadline_heap)
+        self.delayed_rows: List[int] = []
+        self.allocated: set = set()
+        self.checkpoints: List[_DayCheckpoint] = []
+        self.use_numpy = scheduler.scoring_engine == "numpy"
+
+    def _set_status(self, index: int, status: TaskStatus) -> None:
+        """变更任务状态并维护项目待处理聚合值"""
+        if self.status[index] == TaskStatus.PENDING:
+            row = self.base.project_of[index]
+            self.project_pending_units[row] -= self.remaining[index]
+            self.project_pending_count[row] -= 1
+            self.pending.pop(index, None)
+        self.status[index] = status
+
+    def _allocate(self, index: int, units: int) -> None:
+        """为任务分配工时"""
+        self.remaining[index] -= units
+        if self.status[index] == TaskStatus.PENDING:
+            self.project_pending_units[self.base.project_of[index]] -= units
+        self.allocated.add(index)
+        if self.remaining[index] <= 0:
+            self._set_status(index, TaskStatus.COMPLETED)
+
+    def replay(self, checkpoints: List[_DayCheckpoint]) -> None:
+        """按检查点重放之前各天的状态变化"""
+        for checkpoint in checkpoints:
+            for index in checkpoint.flipped:
+                self._set_status(index, TaskStatus.OVERDUE)
+            for index, units in checkpoint.allocations:
+                self._allocate(index, units)
+            self.overdue_queue = dict.fromkeys(
+                index for index in checkpoint.flipped
+                if self.status[index] != TaskStatus.COMPLETED)
+            self.checkpoints.append(checkpoint)
+
+    def units_on(self, day: int) -> int:
+        """第 day 天可用的 0.5 小时单位"""
+        if self.day_units is None:
+            return self.daily_units
+        return self.day_units[day]
+
+    def _plan_gap(self, day: int) -> None:
+        """
+        规划从第 day 天开始的零工时区间
+
+        截止日期为 d 的待处理任务在第 d + 1 天（不早于 day）转为逾期，
+        这些任务从堆和 pending 中一次取出；区间内不会转换的任务留在 pending 中。
+        全部任务都已转换后的第一天没有剩余工作，排期应在该天结束。
+        """
+        end = day
+        while end < len(self.day_units) and self.day_units[end] == 0:
+            end += 1
+
+        pending = self.pending
+        flips: Dict[int, List[int]] = {}
+        due = _pop_overdue(self._deadline_heap, end - 1, lambda item: item[1] in pending)
+        # 条目已按下标排列，同一天转换的任务保持这一顺序
+        for deadline, index in due:
+            del pending[index]
+            flips.setdefault(deadline + 1 if deadline >= day else day, []).append(index)
+
+        self._gap_end = end
+        self._gap_flips = flips
+        self._gap_stop = None
+        if not pending:
+            stop = max(flips, default=day - 1) + 1
+            if stop < end:
+                self._gap_stop = stop
+
+    def _run_gap_day(self, day: int, stats: Optional[DayStats]) -> Optional[List[Tuple[int, int]]]:
+        """按区间规划运行零工时的第 day 天：只应用当天的逾期转换"""
+        if stats is not None:
+            start = time.perf_counter()
+        if day >= self._gap_end:
+            self._plan_gap(day)
+        if day == self._gap_stop:
+            self.overdue_queue = {}
+            if stats is not None:
+                stats.lap("update_overdue_tasks", start)
+            return None
+
+        flipped = self._gap_flips.pop(day, [])
+        for index in flipped:
+            self._set_status(index, TaskStatus.OVERDUE)
+        self.overdue_queue = dict.fromkeys(flipped)
+        if stats is not None:
+            stats.lap("update_overdue_tasks", start)
+            stats.overdue = len(flipped)
+        if self.keep_checkpoints:
+            self.checkpoints.append(self._checkpoint_class(list(flipped), [], set(), None, False))
+        return []
+
+    def update_overdue(self, day: int) -> None:
+        """
+        更新逾期任务队列，对应 TaskScheduler.update_overdue_tasks
+
+        只从堆中弹出截止天序号早于 day 的任务，代价为 O(k log N)（k 为弹出数）。
+        """
+        pending = self.pending
+        flipped = [index for _, index in
+                   _pop_overdue(self._deadline_heap, day, lambda item: item[1] in pending)]
+        for index in flipped:
+            self._set_status(index, TaskStatus.OVERDUE)
+        self.overdue_queue = dict.fromkeys(flipped)
+
+    def score_one(self, index: int, day: int, project_units: List[int]) -> float:
+        """按给定的项目待处理工时计算单个任务的紧迫度分数"""
+        base = self.base
+        w1, w2, w3 = self.config[1:4]
+        row = base.project_of[index]
+        return (
+            w1 * base.project_priority_factor[row] +
+            w2 * (1.0 / max(1, base.deadline_day[index] - day)) +
+            w3 * ((project_units[row] / 2) /
+                  max(1, base.project_deadline_day[row] - day))
+        )
+
+    def score(self, day: int, candidates: List[int]) -> List[float]:
+        """计算候选任务在第 day 天的紧迫度分数，对应 calculate_urgency_score"""
+        if self.use_numpy and candidates:
+            project_hours = [_units_to_hours(units) for units in self.project_pending_units]
+            return self.base.numpy_scores(self.config[1:4], candidates, day, project_hours)
+
+        project_units = self.project_pending_units
+        return [self.score_one(index, day, project_units) for index in candidates]
+
+    def run_day(self, day: int) -> Optional[List[Tuple[int, int]]]:
+        """
+        模拟第 day 天（相对开始日期）的排期，并记录当天的检查点
+
+        Returns:
+            当天的 (任务下标, 分配的 0.5 小时单位) 列表；
+            已没有任何待处理或逾期任务时返回 None
+        """
+        if self.stats is None:
+            return self._run_day(day, None)
+
+        date = (self.base.start_date + timedelta(days=day)).strftime('%Y-%m-%d')
+        day_stats = DayStats(day, date)
+        allocations = self._run_day(day, day_stats)
+        day_stats.allocations = len(allocations) if allocations else 0
+        self.stats.record(day_stats)
+        return allocations
+
+    def _run_day(self, day: int, stats: Optional[DayStats]) -> Optional[List[Tuple[int, int]]]:
+        """run_day 的实现；stats 不为 None 时记录各阶段耗时"""
+        if self.day_units is not None and self.day_units[day] == 0:
+            return self._run_gap_day(day, stats)
+
+        if stats is not None:
+            start = time.perf_counter()
+        self.update_overdue(day)
+        if stats is not None:
+            start = stats.lap("update_overdue_tasks", start)
+            stats.overdue = len(self.overdue_queue)
+        if not self.overdue_queue and not self.pending:
+            return None
+
+        checkpoint = self._checkpoint_class(list(self.overdue_queue), [], set(), None, False)
+        allocations = checkpoint.allocations
+        categories_scheduled_today = set()
+        remaining_units = self.units_on(day)
+
+        # 首先处理逾期任务
+        for index in list(self.overdue_queue):
+            if remaining_units <= 0:
+                break
+
+            units = min(remaining_units, self.remaining[index])
+            if units > 0:
+                allocations.append((index, units))
+                self._allocate(index, units)
+                if self.status[index] == TaskStatus.COMPLETED:
+                    del self.overdue_queue[index]
+
+                remaining_units -= units
+                categories_scheduled_today.add(self.task_category[index])
+        if stats is not None:
+            start = stats.lap("allocation", start, len(allocations))
+
+        # 处理常规任务
+        if remaining_units > 0 and not self.pending:
+            checkpoint.starved = True
+        elif remaining_units > 0:
+            candidate_indexes = list(self.pending)
+            category_of = self.task_category.__getitem__
+            if stats is not None:
+                start = stats.lap("get_pending_tasks", start)
+                stats.candidates = len(candidate_indexes)
+            task_scores = list(zip(candidate_indexes, self.score(day, candidate_indexes)))
+            if stats is not None:
+                start = stats.lap("scoring", start)
+            candidates = self.scheduler._candidate_queue(task_scores, category_of)
+
+            while remaining_units > 0 and candidates:
+                selected = self.scheduler._select_from_queue(
+                    candidates, categories_scheduled_today, category_of)
+                index = selected[2]
+                if stats is not None:
+                    start = stats.lap("selection", start)
+
+                units = min(remaining_units, self.remaining[index])
+                if units > 0:
+                    allocations.append((index, units))
+                    self._allocate(index, units)
+                    remaining_units -= units
+                    categories_scheduled_today.add(self.task_category[index])
+
+                candidates.remove(selected)
+                if stats is not None:
+                    start = stats.lap("allocation", start)
+
+            if stats is not None:
+                stats.examined = len(candidates.popped)
+            if self.keep_checkpoints:
+                checkpoint.examined = {item[2] for item in candidates.popped}
+                if candidates.popped:
+                    last = max(candidates.popped)
+                    checkpoint.cutoff = (last[0], last[2])
+                checkpoint.starved = candidates.starved or (remaining_units > 0)
+
+        if self.keep_checkpoints:
+            self.checkpoints.append(checkpoint)
+        return allocations
+
+    def check_delayed(self, day: int) -> None:
+        """在状态叠加层上检查延期项目，对应 TaskScheduler.check_delayed_projects"""
+        base = self.base
+        self.delayed_rows = [
+            row for row in range(len(base.projects))
+            if base.project_active[row]
+            and base.project_deadline_day[row] < day
+            and self.project_pending_count[row] > 0
+        ]
+
+    def first_affected_day(self, base: _ScheduleBase, changed: set) -> int:
+        """
+        定位输入变更后第一个决策可能不同的日期
+
+        base 为变更后的输入表，changed 为变更的任务下标。某一天不受影响需满足：
+        变更任务没有在当天转为逾期；受影响任务（变更任务以及待处理工时发生变化的
+        项目下的任务）当天都没有被取出查看；且它们的新分数都低于当天最后取出的
+        候选，当天候选也没有耗尽。这样从该日起重新模拟即可得到与完整重排相同的结果。
+        """
+        old = self.base
+        if self.config[5] < 0:
+            # 负的向前查看数量依赖候选总数，无法判断，从头重排
+            return 0
+
+        # 待处理工时发生变化的项目
+        shifted_rows = {
+            row for row in range(len(base.projects))
+            if base.project_pending_units[row] != (
+                old.project_pending_units[row] if row < len(old.projects) else 0)
+        }
+        affected_old = {i for i in changed if i < len(old.tasks) and old.is_pending(i)}
+        affected_new = {i for i in changed if base.is_pending(i)}
+        for row in shifted_rows:
+            project = base.projects[row]
+            for task in self.scheduler.get_tasks_by_project(project.project_id):
+                index = base.task_rows[task.task_id]
+                if index < len(old.tasks) and old.is_pending(index):
+                    affected_old.add(index)
+                if base.is_pending(index):
+                    affected_new.add(index)
+
+        changed_old_pending = affected_old & changed
+        new_flip_day = min((max(0, base.deadline_day[i] + 1)
+                            for i in affected_new & changed), default=len(self.checkpoints))
+        project_units = list(base.project_pending_units)
+        scorer = _ScheduleRun(self.scheduler, base)
+
+        for day, checkpoint in enumerate(self.checkpoints):
+            if day >= new_flip_day or changed_old_pending.intersection(checkpoint.flipped):
+                return day
+
+            # 未变更的任务在两次运行中同时转为逾期
+            for index in affected_new.intersection(checkpoint.flipped):
+                project_units[base.project_of[index]] -= base.remaining[index]
+                affected_new.discard(index)
+                affected_old.discard(index)
+
+            if affected_old & checkpoint.examined:
+                return day
+            if affected_new:
+                if checkpoint.starved:
+                    return day
+                if checkpoint.cutoff is not None:
+                    for index in affected_new:
+                        key = (-scorer.score_one(index, day, project_units), index)
+                        if key <= checkpoint.cutoff:
+                            return day
+
+        return len(self.checkpoints)
+
+
+class ScheduleTable(Mapping):
+    """
+    列式存储的排期结果，按只读映射 日期 -> 排期条目列表 访问
+
+    分配记录保存在三个平行整数数组中：天序号、任务行号和分配的 0.5 小时单位，
+    按天序号递增排列。ScheduleEntry 只在访问某一天时生成，引用的是生成结果时
+    的任务快照，之后修改 Task 对象不会改变已保存的结果。
+    按天、按任务、按类别的汇总直接在数组上计算。
+    """
+
+    def __init__(self, start_date: Optional[datetime] = None, tasks: List[Task] = (),
+                 task_category: List[Optional[str]] = (), days=(), rows=(), units=()):
+        self.start_date = start_date
+        self.tasks: List[Task] = list(tasks)  # 任务行号 -> 任务快照
+        self.task_category: List[Optional[str]] = list(task_category)
+        self.days = array('i', days)
+        self.rows = array('i', rows)
+        self.units = array('i', units)
+
+        # 日期 -> 该天记录在数组中的 [起, 止) 位置
+        self._bounds: Dict[str, Tuple[int, int]] = {}
+        start = 0
+        for end in range(1, len(self.days) + 1):
+            if end == len(self.days) or self.days[end] != self.days[start]:
+                self._bounds[self._date(self.days[start])] = (start, end)
+                start = end
+
+    def _date(self, day: int) -> str:
+        return (self.start_date + timedelta(days=day)).strftime('%Y-%m-%d')
+
+    def __getitem__(self, date: str) -> List[ScheduleEntry]:
+        start, end = self._bounds[date]
+        return [ScheduleEntry(self.tasks[self.rows[i]], _units_to_hours(self.units[i]))
+                for i in range(start, end)]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._bounds)
+
+    def __len__(self) -> int:
+        return len(self._bounds)
+
+    @property
+    def entry_count(self) -> int:
+        """排期条目总数"""
+        return len(self.rows)
+
+    @property
+    def total_hours(self) -> float:
+        """分配的总工时"""
+        return _units_to_hours(sum(self.units))
+
+    def hours_by_day(self) -> Dict[str, float]:
+        """日期 -> 当天分配的工时"""
+        return {date: _units_to_hours(sum(self.units[start:end]))
+                for date, (start, end) in self._bounds.items()}
+
+    def hours_by_task(self) -> Dict[str, float]:
+        """任务ID -> 分配给该任务的总工时"""
+        totals = [0] * len(self.tasks)
+        for row, units in zip(self.rows, self.units):
+            totals[row] += units
+        return {task.task_id: _units_to_hours(units) for task, units in zip(self.tasks, totals)}
+
+    def hours_by_category(self) -> Dict[str, float]:
+        """类别 -> 分配的总工时，按类别首次出现的顺序排列"""
+        totals: Dict[str, int] = {}
+        for row, units in zip(self.rows, self.units):
+            category = self.task_category[row]
+            if category is not None:
+                totals[category] = totals.get(category, 0) + units
+        return {category: _units_to_hours(units) for category, units in totals.items()}
+
+    def iter_dicts(self) -> Iterator[Tuple[str, List[dict]]]:
+        """逐天产出 (日期, 条目字典列表)，与逐个调用 ScheduleEntry.to_dict 的结果相同"""
+        tasks = self.tasks
+        for date, (start, end) in self._bounds.items():
+            yield date, [{
+                "task_id": tasks[self.rows[i]].task_id,
+                "task_name": tasks[self.rows[i]].name,
+                "allocated_hours": _units_to_hours(self.units[i]),
+                "start_time": None,
+                "end_time": None
+            } for i in range(start, end)]
+
+    def to_dict(self) -> Dict[str, List[dict]]:
+        """导出为 日期 -> 条目字典列表"""
+        return dict(self.iter_dicts())
+
+
+class ScheduleResult:
+    """
+    一次排期模拟的结果
+
+    任务剩余工时、任务状态和项目状态都保存在运行自身的叠加层中，
+    输入的 Project / Task 对象保持不变；需要采纳该结果时调用 apply()。
+    结果同时保留逐日检查点，可用于 TaskScheduler.replan 增量重排。
+    """
+
+    def __init__(self, scheduler: "TaskScheduler", run: _ScheduleRun,
+                 end_day: int, max_days: int):
+        self.scheduler = scheduler
+        self.start_date = run.base.start_date
+        self.end_day = end_day  # 模拟结束时的天序号（相对开始日期）
+        self.max_days = max_days
+        self._run = run
+        self._schedule: Optional[ScheduleTable] = None
+
+    @property
+    def _days(self) -> List[Tuple[int, List[Tuple[int, int]]]]:
+        """有分配的各天：(天序号, 分配列表)"""
+        return [(day, checkpoint.allocations)
+                for day, checkpoint in enumerate(self._run.checkpoints)
+                if checkpoint.allocations]
+
+    @property
+    def schedule(self) -> ScheduleTable:
+        """日期 -> 排期条目列表，条目中的任务为模拟结束时的状态快照"""
+        if self._schedule is None:
+            self._schedule = self._build_table(self._days)
+        return self._schedule
+
+    def _build_table(self, allocation_days) -> ScheduleTable:
+        """由 (天序号, 分配列表) 序列构建排期表，任务为模拟结束时的状态快照"""
+        run = self._run
+        task_rows: Dict[int, int] = {}
+        tasks = []
+        categories = []
+        days, rows, units = array('i'), array('i'), array('i')
+        for day, allocations in allocation_days:
+            for index, allocated in allocations:
+                row = task_rows.get(index)
+                if row is None:
+                    row = task_rows[index] = len(tasks)
+                    tasks.append(replace(run.tasks[index],
+                                         remaining_hours=self._remaining_hours(index),
+                                         status=run.status[index]))
+                    categories.append(run.task_category[index])
+                days.append(day)
+                rows.append(row)
+                units.append(allocated)
+        return ScheduleTable(self.start_date, tasks, categories, days, rows, units)
+
+    @property
+    def stats(self) -> Optional[ScheduleStats]:
+        """分阶段性能统计，未开启时为 None"""
+        return self._run.stats
+
+    @property
+    def delayed_projects(self) -> List[Project]:
+        """模拟结束时判定为延期的项目"""
+        return [self._run.base.projects[row] for row in self._run.delayed_rows]
+
+    @property
+    def overdue_tasks(self) -> List[Task]:
+        """模拟最后一天仍在逾期队列中的任务"""
+        return [self._run.tasks[index] for index in self._run.overdue_queue]
+
+    def task_status(self, task_id: str) -> TaskStatus:
+        """模拟结束时任务的状态"""
+        return self._run.status[self._run.base.task_rows[task_id]]
+
+    def task_remaining_hours(self, task_id: str) -> float:
+        """模拟结束时任务的剩余工时"""
+        return self._remaining_hours(self._run.base.task_rows[task_id])
+
+    def _remaining_hours(self, index: int) -> float:
+        if index in self._run.allocated:
+            return _units_to_hours(self._run.remaining[index])
+        return self._run.base.input_hours[index]
+
+    def project_status(self, project_id: str) -> ProjectStatus:
+        """模拟结束时项目的状态"""
+        base = self._run.base
+        row = base.project_rows[project_id]
+        if row in self._run.delayed_rows:
+            return ProjectStatus.DELAYED
+        return base.project_status[row]
+
+    def get_summary(self) -> Dict:
+        """获取排期摘要信息，与采纳结果后 get_schedule_summary 的输出一致"""
+        run = self._run
+        base = run.base
+        schedule = self.schedule
+
+        delayed = set(run.delayed_rows)
+        pending_tasks = sum(
+            1 for index, status in enumerate(run.status)
+            if status == TaskStatus.PENDING
+            and base.project_of[index] >= 0
+            and base.project_active[base.project_of[index]]
+            and base.project_of[index] not in delayed
+        )
+
+        return {
+            "total_days_scheduled": len(schedule),
+            "total_tasks_scheduled": schedule.entry_count,
+            "total_hours_scheduled": schedule.total_hours,
+            "category_distribution": schedule.hours_by_category(),
+            "pending_tasks_remaining": pending_tasks,
+            "overdue_tasks": len(run.overdue_queue),
+            "delayed_projects": len(run.delayed_rows)
+        }
+
+    def export_to_dict(self) -> Dict:
+        """导出结果到字典格式，与采纳结果后 export_schedule_to_dict 的输出一致"""
+        return {
+            "schedule": self.schedule.to_dict(),
+            "summary": self.get_summary(),
+            "projects": dict(self.iter_project_dicts()),
+            "tasks": dict(self.iter_task_dicts())
+        }
+
+    def iter_project_dicts(self) -> Iterator[Tuple[str, dict]]:
+        """逐个产出 (项目ID, 模拟结束时的项目字典)"""
+        for project in self._run.base.projects:
+            project_dict = project.to_dict()
+            project_dict["status"] = self.project_status(project.project_id).value
+            yield project.project_id, project_dict
+
+    def iter_task_dicts(self) -> Iterator[Tuple[str, dict]]:
+        """逐个产出 (任务ID, 模拟结束时的任务字典)"""
+        run = self._run
+        for index, task in enumerate(run.tasks):
+            task_dict = task.to_dict()
+            task_dict["remaining_hours"] = self._remaining_hours(index)
+            task_dict["status"] = run.status[index].value
+            yield task.task_id, task_dict
+
+    def apply(self) -> None:
+        """将模拟结果写回 Project / Task 对象和调度器"""
+        run = self._run
+        base = run.base
+        scheduler = self.scheduler
+
+        # 以本次运行的输入为基准写回全部状态，覆盖之前采纳过的结果
+        for index, task in enumerate(run.tasks):
+            remaining_hours = self._remaining_hours(index)
+            if task.remaining_hours != remaining_hours:
+                task.remaining_hours = remaining_hours
+            if task.status != run.status[index]:
+                task.status = run.status[index]
+
+        delayed = set(run.delayed_rows)
+        scheduler.delayed_projects = []
+        for row, project in enumerate(base.projects):
+            if row in delayed:
+                project.status = ProjectStatus.DELAYED
+                scheduler.delayed_projects.append(project)
+            else:
+                project.status = base.project_status[row]
+
+        scheduler.schedule = self.schedule
+        scheduler.overdue_queue = self.overdue_tasks
+        scheduler.last_result = self
+        scheduler.rebuild_project_index()
+
+
+@dataclass(slots=True)
+class DeadlineShortfall:
+    """截止于某一天及之前的任务累计工时超过了到该天为止的累计可用工时"""
+    day: int  # 截止天序号（相对开始日期）
+    date: str
+    demand_hours: float  # 截止于该天及之前的任务剩余工时合计
+    capacity_hours: float  # 开始日期至该天（含）的可用工时合计
+    task_ids: List[str]  # 截止于该天的任务
+
+    @property
+    def shortfall_hours(self) -> float:
+        """无论怎样排序都无法在截止日期前完成的工时"""
+        return self.demand_hours - self.capacity_hours
+
+    def to_dict(self) -> dict:
+        """转换为字典格式"""
+        return {
+            "day": self.day,
+            "date": self.date,
+            "demand_hours": self.demand_hours,
+            "capacity_hours": self.capacity_hours,
+            "shortfall_hours": self.shortfall_hours,
+            "task_ids": list(self.task_ids)
+        }
+
+
+@dataclass(slots=True)
+class FeasibilityReport:
+    """
+    排期可行性预检的结果，由 TaskScheduler.check_feasibility 生成
+
+    shortfalls 为空表示按截止日期先后处理即可全部按时完成；
+    infeasible_projects 中的项目即使把全部工时都给它也无法在截止日期前完成。
+    """
+    start_date: datetime
+    task_count: int  # 参与检查的任务数（活跃项目的待处理任务）
+    demand_hours: float  # 这些任务的剩余工时合计
+    shortfalls: List[DeadlineShortfall]  # 按天序号递增排列
+    infeasible_projects: List[str]  # 项目ID，按项目的插入顺序排列
+
+    @property
+    def feasible(self) -> bool:
+        """是否存在满足全部截止日期的排序"""
+        return not self.shortfalls
+
+    @property
+    def max_shortfall_hours(self) -> float:
+        """最大的工时缺口，即至少会逾期的工时"""
+        return max((shortfall.shortfall_hours for shortfall in self.shortfalls), default=0.0)
+
+    @property
+    def first_shortfall(self) -> Optional[DeadlineShortfall]:
+        """最早无法满足的截止日期"""
+        return self.shortfalls[0] if self.shortfalls else None
+
+    def to_dict(self) -> dict:
+        """转换为字典格式"""
+        return {
+            "start_date": self.start_date.isoformat(),
+            "feasible": self.feasible,
+            "task_count": self.task_count,
+            "demand_hours": self.demand_hours,
+            "max_shortfall_hours": self.max_shortfall_hours,
+            "shortfalls": [shortfall.to_dict() for shortfall in self.shortfalls],
+            "infeasible_projects": list(self.infeasible_projects)
+        }
+
+
 class TaskScheduler:
     """任务调度器主类"""
 
-    def __init__(self, daily_work_hours: float = 8.0):
+    # 逐日模拟的状态类与结果类，子类可替换为自己的实现
+    _run_class = _ScheduleRun
+    _result_class = ScheduleResult
+
+    def __init__(self, daily_work_hours: float = 8.0, scoring_engine: str = "scalar",
+                 selection_engine: str = "window"):
         """
         初始化任务调度器
 
         Args:
             daily_work_hours: 每日可用工作时间（小时）
+            scoring_engine: 紧迫度评分引擎，"scalar" 为逐个计算的参考实现，
+                "numpy" 为按天批量计算的向量化实现（需要安装 numpy）
+            selection_engine: 多样性选择引擎，"window" 逐个查看前 look_ahead_count 个候选，
+                "category" 按类别分队列，选择代价与 look_ahead_count 无关
         """
         self.projects: Dict[str, Project] = {}
         self.tasks: Dict[str, Task] = {}
-        self.schedule: Dict[str, List[ScheduleEntry]] = {}  # 日期 -> 排期条目列表
+        self.schedule: ScheduleTable = ScheduleTable()  # 日期 -> 排期条目列表
         self.overdue_queue: List[Task] = []
         self.delayed_projects: List[Project] = []
         self.daily_work_hours = daily_work_hours
 
+        # 待处理任务按 (截止时间, 插入序号, 任务) 排列的最小堆，按需构建
+        self._deadline_heap: Optional[List[Tuple[datetime, int, Task]]] = None
+
+        # 截止日期驻留表：取值相同的 datetime 只保留一个对象
+        self._datetime_pool: Dict[datetime, datetime] = {}
+
+        # 项目索引与增量维护的聚合值（仅统计 PENDING 状态的任务）
+        self._project_tasks: Dict[str, List[Task]] = {}
+        self._project_pending_hours: Dict[str, float] = {}
+        self._project_pending_count: Dict[str, int] = {}
+
         # 紧迫度计算权重系数
         self.w1 = 2.0  # 优先级权重
         self.w2 = 3.0  # 截止日期权重
@@ -129,13 +1429,110 @@ class TaskScheduler:
         self.diversity_threshold = 0.1  # 分数差距阈值（10%）
         self.look_ahead_count = 5  # 向前查看的任务数量
 
+        # 工作日历：为 None 时每天都有 daily_work_hours 小时
+        self.calendar: Optional[WorkCalendar] = None
+
+        # 分阶段性能统计，默认关闭
+        self.profiling = False
+        self.profile_callback: Optional[Callable[[DayStats], None]] = None
+
+        # 排期运行共享的只读输入表，以及最近一次 generate_schedule 的结果
+        self._base_cache: Optional[_ScheduleBase] = None
+        self.last_result: Optional[ScheduleResult] = None
+        self.scoring_engine = scoring_engine
+        self.selection_engine = selection_engine
+
+    @property
+    def scoring_engine(self) -> str:
+        """当前使用的紧迫度评分引擎"""
+        return self._scoring_engine
+
+    @scoring_engine.setter
+    def scoring_engine(self, engine: str) -> None:
+        if engine not in SCORING_ENGINES:
+            raise ValueError(f"未知的评分引擎: {engine}，可选值: {SCORING_ENGINES}")
+        if engine == "numpy" and np is None:
+            raise ValueError("numpy 评分引擎需要安装 numpy")
+        self._scoring_engine = engine
+
+    @property
+    def selection_engine(self) -> str:
+        """当前使用的多样性选择引擎"""
+        return self._selection_engine
+
+    @selection_engine.setter
+    def selection_engine(self, engine: str) -> None:
+        if engine not in SELECTION_ENGINES:
+            raise ValueError(f"未知的选择引擎: {engine}，可选值: {SELECTION_ENGINES}")
+        self._selection_engine = engine
+
+    def enable_profiling(self, callback: Optional[Callable[[DayStats], None]] = None) -> None:
+        """
+        开启分阶段性能统计
+
+        之后的每次排期运行（generate_schedule / simulate_schedule / iter_schedule / replan）
+        逐日记录 PROFILE_PHASES 各阶段的耗时与调用次数，以及当天的候选规模，
+        结果在 ScheduleResult.stats 中；给出 callback 时每模拟完一天即以当天的
+        DayStats 调用。关闭时每天只多一次判断。
+        """
+        self.profiling = True
+        self.profile_callback = callback
+
+    def disable_profiling(self) -> None:
+        """关闭分阶段性能统计"""
+        self.profiling = False
+        self.profile_callback = None
+
+    def configure(self, config: Dict) -> None:
+        """
+        按 test_data.json 中 scheduler_config 的格式设置调度参数
+
+        Args:
+            config: 包含 daily_work_hours、weights、diversity_config 以及可选的
+                calendar（WorkCalendar.to_dict 格式）的字典，缺省的项保持默认值
+        """
+        self.daily_work_hours = config.get('daily_work_hours', 8.0)
+
+        weights = config.get('weights', {})
+        self.w1 = weights.get('priority_weight', 2.0)
+        self.w2 = weights.get('deadline_weight', 3.0)
+        self.w3 = weights.get('workload_weight', 1.5)
+
+        diversity = config.get('diversity_config', {})
+        self.diversity_threshold = diversity.get('diversity_threshold', 0.1)
+        self.look_ahead_count = diversity.get('look_ahead_count', 5)
+
+        calendar = config.get('calendar')
+        self.calendar = WorkCalendar.from_dict(calendar) if calendar else None
+
     def add_project(self, project: Project) -> None:
         """添加项目"""
         self.projects[project.project_id] = project
+        self._base_cache = None
+        self._deadline_heap = None
 
     def add_task(self, task: Task) -> None:
         """添加任务"""
+        if task.due_date is not None:
+            task.due_date = self._datetime_pool.setdefault(task.due_date, task.due_date)
+
+        old_task = self.tasks.get(task.task_id)
         self.tasks[task.task_id] = task
+        self._base_cache = None
+        self._deadline_heap = None
+
+        if old_task is None:
+            self._project_tasks.setdefault(task.project_id, []).append(task)
+            self._add_pending_aggregate(task)
+            return
+
+        # 替换已有任务：字典保留原位置，索引按 self.tasks 的顺序重建
+        self._remove_pending_aggregate(old_task)
+        for project_id in {old_task.project_id, task.project_id}:
+            self._project_tasks[project_id] = [
+                t for t in self.tasks.values() if t.project_id == project_id
+            ]
+        self._add_pending_aggregate(task)
 
     def get_project_by_id(self, project_id: str) -> Optional[Project]:
         """根据ID获取项目"""
@@ -143,16 +1540,87 @@ class TaskScheduler:
 
     def get_tasks_by_project(self, project_id: str) -> List[Task]:
         """获取项目下的所有任务"""
-        return [task for task in self.tasks.values() if task.project_id == project_id]
+        return list(self._project_tasks.get(project_id, []))
+
+    def get_project_pending_hours(self, project_id: str) -> float:
+        """获取项目下待处理任务的剩余总工时"""
+        return self._project_pending_hours.get(project_id, 0.0)
+
+    def get_project_pending_count(self, project_id: str) -> int:
+        """获取项目下待处理任务的数量"""
+        return self._project_pending_count.get(project_id, 0)
+
+    def rebuild_project_index(self) -> None:
+        """
+        根据 self.tasks 重建项目索引和聚合值
+
+        直接修改 Task 对象的 remaining_hours / status / due_date 或项目状态后需要调用，
+        或改用 update_task_progress 让调度器同步维护。
+        """
+        self._project_tasks.clear()
+        self._project_pending_hours.clear()
+        self._project_pending_count.clear()
+        self._base_cache = None
+        self._deadline_heap = None
+
+        for task in self.tasks.values():
+            self._project_tasks.setdefault(task.project_id, []).append(task)
+            self._add_pending_aggregate(task)
+
+    def update_task_progress(self, task_id: str,
+                             remaining_hours: Optional[float] = None,
+                             status: Optional[TaskStatus] = None) -> None:
+        """更新任务进度并同步项目聚合值"""
+        task = self.tasks[task_id]
+        self._base_cache = None
+        if status == TaskStatus.PENDING and task.status != TaskStatus.PENDING:
+            # 重新变为待处理的任务需要重新入堆
+            self._deadline_heap = None
+        if remaining_hours is not None:
+            self._consume_task_hours(task, task.remaining_hours - remaining_hours)
+        if status is not None:
+            self._set_task_status(task, status)
+
+    def _add_pending_aggregate(self, task: Task) -> None:
+        """将待处理任务计入项目聚合值"""
+        if task.status != TaskStatus.PENDING:
+            return
+        project_id = task.project_id
+        self._project_pending_hours[project_id] = (
+            self._project_pending_hours.get(project_id, 0) + task.remaining_hours)
+        self._project_pending_count[project_id] = (
+            self._project_pending_count.get(project_id, 0) + 1)
+
+    def _remove_pending_aggregate(self, task: Task) -> None:
+        """将待处理任务从项目聚合值中扣除"""
+        if task.status != TaskStatus.PENDING:
+            return
+        project_id = task.project_id
+        count = self._project_pending_count[project_id] - 1
+        self._project_pending_count[project_id] = count
+        if count == 0:
+            # 项目已无待处理任务，直接归零以消除浮点累积误差
+            self._project_pending_hours[project_id] = 0.0
+        else:
+            self._project_pending_hours[project_id] -= task.remaining_hours
+
+    def _set_task_status(self, task: Task, status: TaskStatus) -> None:
+        """变更任务状态并维护项目聚合值"""
+        if task.status == status:
+            return
+        self._remove_pending_aggregate(task)
+        task.status = status
+        self._add_pending_aggregate(task)
+
+    def _consume_task_hours(self, task: Task, hours: float) -> None:
+        """扣减任务剩余工时并维护项目聚合值"""
+        task.remaining_hours -= hours
+        if task.status == TaskStatus.PENDING:
+            self._project_pending_hours[task.project_id] -= hours
 
     def calculate_priority_factor(self, project: Project) -> float:
         """计算优先级因子"""
-        priority_map = {
-            Priority.HIGH: 1.5,
-            Priority.MEDIUM: 1.0,
-            Priority.LOW: 0.5
-        }
-        return priority_map[project.priority]
+        return PRIORITY_FACTORS[project.priority]
 
     def calculate_deadline_factor(self, deadline: datetime, current_date: datetime) -> float:
         """计算截止日期因子"""
@@ -165,12 +1633,8 @@ class TaskScheduler:
         if not project:
             return 0.0
 
-        # 计算项目剩余总工时
-        project_tasks = self.get_tasks_by_project(project_id)
-        total_remaining_hours = sum(
-            task.remaining_hours for task in project_tasks
-            if task.status == TaskStatus.PENDING
-        )
+        # 项目剩余总工时由索引增量维护
+        total_remaining_hours = self.get_project_pending_hours(project_id)
 
         # 计算到截止日期的天数
         days_until_deadline = max(1, (project.deadline - current_date).days)
@@ -200,11 +1664,10 @@ class TaskScheduler:
 
         return urgency_score
 
-    def update_overdue_tasks(self, current_date: datetime) -> None:
-        """更新逾期任务队列"""
-        self.overdue_queue.clear()
-
-        for task in self.tasks.values():
+    def _build_deadline_heap(self) -> List[Tuple[datetime, int, Task]]:
+        """按截止时间为活跃项目的待处理任务建堆"""
+        heap = []
+        for seq, task in enumerate(self.tasks.values()):
             if task.status != TaskStatus.PENDING:
                 continue
 
@@ -212,11 +1675,35 @@ class TaskScheduler:
             if not project or project.status != ProjectStatus.ACTIVE:
                 continue
 
-            # 检查任务是否逾期
             deadline = task.due_date if task.due_date else project.deadline
-            if deadline < current_date:
-                task.status = TaskStatus.OVERDUE
-                self.overdue_queue.append(task)
+            heap.append((deadline, seq, task))
+        heapq.heapify(heap)
+        return heap
+
+    def update_overdue_tasks(self, current_date: datetime) -> None:
+        """
+        更新逾期任务队列
+
+        只从截止时间堆中弹出截止时间早于 current_date 的任务，
+        代价与新逾期的任务数成正比；已不是待处理状态的任务出堆时丢弃。
+        """
+        self.overdue_queue.clear()
+        if self._deadline_heap is None:
+            self._deadline_heap = self._build_deadline_heap()
+
+        def check(item: Tuple[datetime, int, Task]) -> Optional[bool]:
+            task = item[2]
+            if task.status != TaskStatus.PENDING:
+                return False
+            # 项目在建堆后停用的任务暂不逾期，放回堆中
+            project = self.get_project_by_id(task.project_id)
+            if not project or project.status != ProjectStatus.ACTIVE:
+                return None
+            return True
+
+        for _, _, task in _pop_overdue(self._deadline_heap, current_date, check):
+            self._set_task_status(task, TaskStatus.OVERDUE)
+            self.overdue_queue.append(task)
 
     def get_pending_tasks(self) -> List[Task]:
         """获取所有待处理任务"""
@@ -232,13 +1719,29 @@ class TaskScheduler:
 
         return pending_tasks
 
+    def score_tasks(self, tasks: List[Task], current_date: datetime) -> List[Tuple[Task, float]]:
+        """按输入顺序计算任务的紧迫度分数"""
+        if self._scoring_engine == "numpy" and tasks:
+            # 与排期运行共用输入表的列；current_date 与其开始日期相差整天数时直接复用
+            base = self._base_cache
+            offset = current_date - base.start_date if base is not None else None
+            if offset is None or offset % timedelta(days=1):
+                base = self._schedule_base(current_date)
+                offset = timedelta(0)
+            pending_hours = self._project_pending_hours
+            project_hours = [pending_hours.get(project.project_id, 0.0)
+                             for project in base.projects]
+            rows = [base.task_rows[task.task_id] for task in tasks]
+            scores = base.numpy_scores((self.w1, self.w2, self.w3), rows, offset.days,
+                                       project_hours)
+            return list(zip(tasks, scores))
+
+        return [(task, self.calculate_urgency_score(task, current_date))
+                for task in tasks]
+
     def sort_tasks_by_urgency(self, tasks: List[Task], current_date: datetime) -> List[Tuple[Task, float]]:
         """按紧迫度排序任务"""
-        task_scores = []
-
-        for task in tasks:
-            score = self.calculate_urgency_score(task, current_date)
-            task_scores.append((task, score))
+        task_scores = self.score_tasks(tasks, current_date)
 
         # 按分数降序排序
         task_scores.sort(key=lambda x: x[1], reverse=True)
@@ -270,6 +1773,49 @@ class TaskScheduler:
         # 如果没有找到合适的新类别任务，返回最高优先级任务
         return sorted_tasks[0]
 
+    def _task_category(self, task: Task) -> Optional[str]:
+        """获取任务所属项目的类别，项目不存在时返回 None"""
+        project = self.get_project_by_id(task.project_id)
+        return project.category if project else None
+
+    def _candidate_queue(self, task_scores: list, category_of):
+        """按选择引擎创建当天的候选队列"""
+        if self._selection_engine == "category":
+            return _CategoryQueues(task_scores, category_of)
+        return _CandidateQueue(task_scores)
+
+    def _select_from_queue(self, candidates, categories_scheduled_today: set,
+                           category_of) -> tuple:
+        """
+        在候选队列上应用多样性规则，选择结果与 apply_diversity_rule 一致
+
+        Args:
+            candidates: 当天的候选队列（_CandidateQueue 或 _CategoryQueues）
+            categories_scheduled_today: 当天已安排的类别
+            category_of: 由队列元素中的任务（对象或下标）取得类别的函数
+        """
+        if isinstance(candidates, _CategoryQueues):
+            return candidates.select(categories_scheduled_today, self.look_ahead_count,
+                                     self.diversity_threshold)
+
+        top = candidates.peek(1)[0]
+        if not categories_scheduled_today:
+            return top
+
+        highest_score = -top[0]
+
+        for item in candidates.peek(self.look_ahead_count):
+            category = category_of(item[2])
+            if category is None:
+                continue
+
+            score = -item[0]
+            if (category not in categories_scheduled_today and
+                    (highest_score - score) / highest_score <= self.diversity_threshold):
+                return item
+
+        return top
+
     def schedule_single_day(self, current_date: datetime,
                             available_hours: float) -> List[ScheduleEntry]:
         """为单天安排任务"""
@@ -277,8 +1823,9 @@ class TaskScheduler:
         categories_scheduled_today = set()
         remaining_hours = available_hours
 
-        # 首先处理逾期任务
-        for task in self.overdue_queue[:]:
+        # 首先处理逾期任务，完成的任务在循环结束后一次移出队列
+        completed_overdue = set()
+        for task in self.overdue_queue:
             if remaining_hours <= 0:
                 break
 
@@ -296,30 +1843,33 @@ class TaskScheduler:
                 daily_schedule.append(entry)
 
                 # 更新任务状态
-                task.remaining_hours -= allocated_hours
+                self._consume_task_hours(task, allocated_hours)
                 if task.remaining_hours <= 0:
-                    task.status = TaskStatus.COMPLETED
-                    self.overdue_queue.remove(task)
+                    self._set_task_status(task, TaskStatus.COMPLETED)
+                    completed_overdue.add(id(task))
 
                 # 更新状态
                 remaining_hours -= allocated_hours
                 categories_scheduled_today.add(project.category)
 
-        # 处理常规任务
+        if completed_overdue:
+            self.overdue_queue[:] = [task for task in self.overdue_queue
+                                     if id(task) not in completed_overdue]
+
+        # 处理常规任务：用优先队列代替整体排序，每次选择只查看队首若干个
         pending_tasks = self.get_pending_tasks()
-        sorted_tasks = self.sort_tasks_by_urgency(pending_tasks, current_date)
+        candidates = self._candidate_queue(
+            self.score_tasks(pending_tasks, current_date), self._task_category)
 
-        while remaining_hours > 0 and sorted_tasks:
+        while remaining_hours > 0 and candidates:
             # 应用多样性规则选择任务
-            selected = self.apply_diversity_rule(
-                sorted_tasks, categories_scheduled_today)
-            if not selected:
-                break
+            selected = self._select_from_queue(
+                candidates, categories_scheduled_today, self._task_category)
 
-            task, score = selected
+            task = selected[2]
             project = self.get_project_by_id(task.project_id)
             if not project:
-                sorted_tasks.remove(selected)
+                candidates.remove(selected)
                 continue
 
             # 分配时间
@@ -332,45 +1882,201 @@ class TaskScheduler:
                 daily_schedule.append(entry)
 
                 # 更新任务状态
-                task.remaining_hours -= allocated_hours
+                self._consume_task_hours(task, allocated_hours)
                 if task.remaining_hours <= 0:
-                    task.status = TaskStatus.COMPLETED
+                    self._set_task_status(task, TaskStatus.COMPLETED)
 
                 # 更新状态
                 remaining_hours -= allocated_hours
                 categories_scheduled_today.add(project.category)
 
-            # 从待选列表中移除已处理的任务
-            sorted_tasks.remove(selected)
+            # 从待选队列中移除已处理的任务
+            candidates.remove(selected)
 
         return daily_schedule
 
-    def generate_schedule(self, start_date: datetime, max_days: int = 30) -> Dict[str, List[ScheduleEntry]]:
-        """生成完整的任务排期"""
-        self.schedule.clear()
-        current_date = start_date
+    def _schedule_base(self, start_date: datetime) -> _ScheduleBase:
+        """获取（必要时构建）该开始日期的只读输入表"""
+        base = self._base_cache
+        if base is None or base.start_date != start_date:
+            base = _ScheduleBase(self, start_date)
+            self._base_cache = base
+        return base
+
+    def _run_config(self) -> tuple:
+        """
+        影响排期决策的配置：
+        (每日 0.5 小时单位, w1, w2, w3, 多样性阈值, 向前查看数量, 工作日历内容)
+        """
+        return (math.floor(self.daily_work_hours * 2 + 1e-9), self.w1, self.w2, self.w3,
+                self.diversity_threshold, self.look_ahead_count,
+                self.calendar.key() if self.calendar is not None else None)
+
+    def _simulate_from(self, run: _ScheduleRun, first_day: int, max_days: int) -> ScheduleResult:
+        """从第 first_day 天开始逐日模拟直至结束"""
+        day = first_day
+        while day < max_days:
+            if run.run_day(day) is None:
+                break
+
+            # 进入下一天
+            day += 1
+
+        # 后处理：检查延期项目
+        run.check_delayed(day)
+
+        return self._result_class(self, run, day, max_days)
+
+    def simulate_schedule(self, start_date: datetime, max_days: int = 30) -> ScheduleResult:
+        """
+        模拟排期而不修改任何 Project / Task 对象
+
+        所有可变状态保存在本次运行的叠加层中，输入表在多次模拟间共享，
+        因此同一个调度器可以低成本地反复模拟不同的配置。
+        直接修改过 Project / Task 对象后需先调用 rebuild_project_index()。
+        """
+        run = self._run_class(self, self._schedule_base(start_date), max_days=max_days)
+        return self._simulate_from(run, 0, max_days)
+
+    def iter_schedule(self, start_date: datetime,
+                      max_days: int = 30) -> Iterator[Tuple[str, List[ScheduleEntry]]]:
+        """
+        逐日生成排期，每规划完一天即产出 (日期, 排期条目列表)
 
+        与 simulate_schedule 一样不修改 Project / Task 对象，产出的天与
+        generate_schedule 结果中的天一一对应，条目中的任务为当天结束时的状态快照。
+        调用方停止迭代后剩余的天不会被计算；运行不保留逐日检查点，
+        内存占用不随已产出的天数增长。
+        """
+        run = self._run_class(self, self._schedule_base(start_date), keep_checkpoints=False,
+                              max_days=max_days)
         for day in range(max_days):
-            # 更新逾期任务
-            self.update_overdue_tasks(current_date)
+            allocations = run.run_day(day)
+            if allocations is None:
+                return
+            if not allocations:
+                continue
 
-            # 检查是否还有待处理任务
-            if not self.overdue_queue and not self.get_pending_tasks():
-                break
+            date = (start_date + timedelta(days=day)).strftime('%Y-%m-%d')
+            yield date, [
+                ScheduleEntry(replace(run.tasks[index],
+                                      remaining_hours=_units_to_hours(run.remaining[index]),
+                                      status=run.status[index]),
+                              _units_to_hours(units))
+                for index, units in allocations
+            ]
 
-            # 为当天安排任务
-            date_str = current_date.strftime('%Y-%m-%d')
-            daily_schedule = self.schedule_single_day(
-                current_date, self.daily_work_hours)
+    def replan(self, result: ScheduleResult, changed_task_ids: List[str]) -> ScheduleResult:
+        """
+        在已有排期结果上增量重排
 
-            if daily_schedule:
-                self.schedule[date_str] = daily_schedule
+        changed_task_ids 中的任务（新增、完成或重新估算）以调度器中 Task 对象的
+        当前数据作为新的输入，其余任务沿用 result 的输入；result 之后新增的
+        项目和任务会自动载入。已有项目的属性变化不在此列，需要完整重排。
 
-            # 进入下一天
-            current_date += timedelta(days=1)
+        从第一个决策可能不同的日期开始重新模拟，之前各天直接按检查点重放，
+        结果与用新输入完整运行 simulate_schedule 相同。
+        返回新的 ScheduleResult；在 generate_schedule 之后使用时，
+        可对 last_result 重排并调用 apply() 写回。
+        """
+        old_run = result._run
+        base, changed = old_run.base.patched(self, changed_task_ids)
 
-        # 后处理：检查延期项目
-        self.check_delayed_projects(current_date)
+        first_day = 0
+        if old_run.config == self._run_config():
+            first_day = old_run.first_affected_day(base, changed)
+
+        run = self._run_class(self, base, max_days=result.max_days)
+        run.replay(old_run.checkpoints[:first_day])
+        return self._simulate_from(run, first_day, result.max_days)
+
+    def _capacity_units(self, start_date: datetime, days: int) -> List[int]:
+        """从 start_date 起连续 days 天每天可用的 0.5 小时单位"""
+        if self.calendar is not None:
+            return self.calendar.capacity_units(start_date, days)
+        return [self._run_config()[0]] * days
+
+    def check_feasibility(self, start_date: datetime) -> FeasibilityReport:
+        """
+        不做逐日模拟，检查各截止日期在任何排序下能否满足
+
+        活跃项目的待处理任务按有效截止日期排序后求剩余工时的前缀和，与开始日期
+        至该截止日期的累计可用工时比较。截止于第 k 天及之前的任务只能使用第 0..k 天
+        的工时，累计需求超过累计工时时，无论怎样排序都至少有差额部分会逾期；
+        反之按截止日期先后处理即可全部按时完成。项目只统计其自身的任务
+        （截止日期取任务与项目截止日期中较早的一个）。
+        任务按截止天序号分桶代替逐个排序，代价为 O(N + D log D)，D 为截止日期跨度的天数。工时取整规则与排期运行相同；
+        直接修改过 Project / Task 对象后需先调用 rebuild_project_index()。
+        """
+        base = self._schedule_base(start_date)
+        deadline_day = base.deadline_day
+        remaining = base.remaining
+        project_of = base.project_of
+        project_deadline_day = base.project_deadline_day
+
+        # 第 k 天（含）之前的累计可用工时，k < 0 时为 0
+        last_day = max((deadline_day[index] for index in base.pending), default=-1)
+        capacity = list(itertools.accumulate(self._capacity_units(start_date, last_day + 1)))
+
+        def capacity_until(day: int) -> int:
+            return capacity[day] if day >= 0 else 0
+
+        # 全部任务：按截止天序号分组，按天序号顺序累计
+        groups: Dict[int, List[int]] = {}
+        for index in base.pending:
+            groups.setdefault(deadline_day[index], []).append(index)
+        shortfalls = []
+        demand = 0
+        for day in sorted(groups):
+            group = groups[day]
+            demand += sum(remaining[index] for index in group)
+            if demand > capacity_until(day):
+                shortfalls.append(DeadlineShortfall(
+                    day=day,
+                    date=(start_date + timedelta(days=day)).strftime('%Y-%m-%d'),
+                    demand_hours=_units_to_hours(demand),
+                    capacity_hours=_units_to_hours(capacity_until(day)),
+                    task_ids=[base.tasks[index].task_id for index in group]
+                ))
+
+        # 单个项目：只计入自身任务，截止日期不晚于项目截止日期
+        project_days: Dict[int, Dict[int, int]] = {}  # 项目行号 -> 截止天序号 -> 工时
+        for index in base.pending:
+            row = project_of[index]
+            day = min(deadline_day[index], project_deadline_day[row])
+            days = project_days.setdefault(row, {})
+            days[day] = days.get(day, 0) + remaining[index]
+        infeasible = []
+        for row in sorted(project_days):
+            days = project_days[row]
+            project_demand = 0
+            for day in sorted(days):
+                project_demand += days[day]
+                if project_demand > capacity_until(day):
+                    infeasible.append(base.projects[row].project_id)
+                    break
+
+        return FeasibilityReport(
+            start_date=start_date,
+            task_count=len(base.pending),
+            demand_hours=_units_to_hours(demand),
+            shortfalls=shortfalls,
+            infeasible_projects=infeasible
+        )
+
+    def generate_schedule(self, start_date: datetime, max_days: int = 30) -> ScheduleTable:
+        """
+        生成完整的任务排期
+
+        逐日模拟在整数时间基上进行（见 _ScheduleBase），只在生成 ScheduleEntry
+        和写回 Task 时换算回日期与小时。结果会写回 Project / Task 对象，
+        并保存在 last_result 中供 replan 使用。
+        """
+        # Task 对象可能在调度器之外被修改，开始前同步一次
+        self.rebuild_project_index()
+
+        result = self.simulate_schedule(start_date, max_days)
+        result.apply()
 
         return self.schedule
 
@@ -384,10 +2090,8 @@ class TaskScheduler:
 
             # 检查项目是否有未完成任务且已过截止日期
             if project.deadline < current_date:
-                project_tasks = self.get_tasks_by_project(project.project_id)
-                has_pending_tasks = any(
-                    task.status == TaskStatus.PENDING for task in project_tasks
-                )
+                has_pending_tasks = self.get_project_pending_count(
+                    project.project_id) > 0
 
                 if has_pending_tasks:
                     project.status = ProjectStatus.DELAYED
@@ -395,32 +2099,15 @@ class TaskScheduler:
 
     def get_schedule_summary(self) -> Dict:
         """获取排期摘要信息"""
-        total_days = len(self.schedule)
-        total_tasks_scheduled = 0
-        total_hours_scheduled = 0.0
-
-        category_hours = {}
-
-        for date, entries in self.schedule.items():
-            for entry in entries:
-                total_tasks_scheduled += 1
-                total_hours_scheduled += entry.allocated_hours
-
-                project = self.get_project_by_id(entry.task.project_id)
-                if project:
-                    category = project.category
-                    category_hours[category] = category_hours.get(
-                        category, 0) + entry.allocated_hours
-
         pending_tasks = len(self.get_pending_tasks())
         overdue_tasks = len(self.overdue_queue)
         delayed_projects = len(self.delayed_projects)
 
         return {
-            "total_days_scheduled": total_days,
-            "total_tasks_scheduled": total_tasks_scheduled,
-            "total_hours_scheduled": total_hours_scheduled,
-            "category_distribution": category_hours,
+            "total_days_scheduled": len(self.schedule),
+            "total_tasks_scheduled": self.schedule.entry_count,
+            "total_hours_scheduled": self.schedule.total_hours,
+            "category_distribution": self.schedule.hours_by_category(),
             "pending_tasks_remaining": pending_tasks,
             "overdue_tasks": overdue_tasks,
             "delayed_projects": delayed_projects
@@ -428,13 +2115,8 @@ class TaskScheduler:
 
     def export_schedule_to_dict(self) -> Dict:
         """导出排期到字典格式"""
-        schedule_dict = {}
-
-        for date, entries in self.schedule.items():
-            schedule_dict[date] = [entry.to_dict() for entry in entries]
-
         return {
-            "schedule": schedule_dict,
+            "schedule": self.schedule.to_dict(),
             "summary": self.get_schedule_summary(),
             "projects": {pid: project.to_dict() for pid, project in self.projects.items()},
             "tasks": {tid: task.to_dict() for tid, task in self.tasks.items()}
@@ -5,9 +5,21 @@
 用于测试各种场景下的任务调度效果
 """
 
+import io
 import json
-from datetime import datetime
-from task_scheduler import TaskScheduler, Project, Task, Priority, ProjectStatus, TaskStatus
+import os
+import tempfile
+from datetime import datetime, timedelta
+from task_scheduler import TaskScheduler, Project, Task, Priority, ProjectStatus, TaskStatus, WorkCalendar
+from scheduler_batch import TenantInput, schedule_tenant, schedule_tenants
+from scheduler_sweep import grid_configs, sweep_parameters, evaluate_schedule
+from scheduler_export import iter_schedule_export, write_schedule_export
+from scheduler_snapshot import save_snapshot, open_snapshot, load_snapshot
+from scheduler_loader import bulk_load
+from scheduler_team import TeamScheduler, Worker
+from scheduler_benchmark import WorkloadSpec, run_benchmark, compare_reports, BENCHMARK_OPERATIONS
+from scheduler_equivalence import check_engines, configured, find_difference, EquivalenceCase
+from scheduler_store import SQLiteTaskStore
 
 
 class SchedulerTester:
@@ -40,20 +52,10 @@ class SchedulerTester:
     def create_scheduler_from_data(self) -> TaskScheduler:
         """根据测试数据创建调度器实例"""
         config = self.test_data.get('scheduler_config', {})
-        daily_hours = config.get('daily_work_hours', 8.0)
         
-        scheduler = TaskScheduler(daily_work_hours=daily_hours)
-        
-        # 设置权重参数
-        weights = config.get('weights', {})
-        scheduler.w1 = weights.get('priority_weight', 2.0)
-        scheduler.w2 = weights.get('deadline_weight', 3.0)
-        scheduler.w3 = weights.get('workload_weight', 1.5)
-        
-        # 设置多样性参数
-        diversity = config.get('diversity_config', {})
-        scheduler.diversity_threshold = diversity.get('diversity_threshold', 0.1)
-        scheduler.look_ahead_count = diversity.get('look_ahead_count', 5)
+        # 设置每日工时、权重与多样性参数
+        scheduler = TaskScheduler()
+        scheduler.configure(config)
         
         return scheduler
     
@@ -280,14 +282,669 @@ class SchedulerTester:
             
             print(f"{i+1:2d}. {task.name:<25} | 分数: {score:6.2f} | 剩余天数: {days_left:2d} | 类别: {project.category}")
     
+    def test_scoring_engines(self) -> None:
+        """测试向量化评分引擎与标量参考实现的一致性"""
+        print("\n" + "="*50)
+        print("🧪 评分引擎一致性测试")
+        print("="*50)
+        
+        try:
+            TaskScheduler(scoring_engine="numpy")
+        except ValueError:
+            print("⚠️ 未安装 numpy，跳过向量化评分引擎测试")
+            return
+        
+        start_date = datetime(2024, 1, 15, 9, 0, 0)
+        results = {}
+        
+        for engine in ("scalar", "numpy"):
+            scheduler = self.create_scheduler_from_data()
+            scheduler.scoring_engine = engine
+            self.load_projects_and_tasks(scheduler)
+            
+            scores = scheduler.score_tasks(scheduler.get_pending_tasks(), start_date)
+            schedule = scheduler.generate_schedule(start_date, max_days=20)
+            results[engine] = (
+                [(task.task_id, score) for task, score in scores],
+                scheduler.export_schedule_to_dict()['schedule']
+            )
+        
+        if results["scalar"] == results["numpy"]:
+            print("✅ 两种评分引擎的分数与排期结果完全一致")
+        else:
+            print("❌ 向量化评分引擎与标量实现结果不一致")
+    
+    def test_selection_engines(self) -> None:
+        """测试按类别分队列的多样性选择与窗口扫描实现的一致性"""
+        print("\n" + "="*50)
+        print("🧪 多样性选择引擎一致性测试")
+        print("="*50)
+        
+        start_date = datetime(2024, 1, 15, 9, 0, 0)
+        results = {}
+        
+        for look_ahead_count in (5, 50):
+            for engine in ("window", "category"):
+                scheduler = self.create_scheduler_from_data()
+                scheduler.selection_engine = engine
+                scheduler.look_ahead_count = look_ahead_count
+                self.load_projects_and_tasks(scheduler)
+                scheduler.generate_schedule(start_date, max_days=20)
+                results[engine, look_ahead_count] = scheduler.export_schedule_to_dict()['schedule']
+            
+            if results["window", look_ahead_count] == results["category", look_ahead_count]:
+                print(f"✅ 向前查看 {look_ahead_count} 个任务时两种选择引擎的排期完全一致")
+            else:
+                print(f"❌ 向前查看 {look_ahead_count} 个任务时两种选择引擎的排期不一致")
+    
+    def test_simulation_mode(self) -> None:
+        """测试非破坏性模拟模式"""
+        print("\n" + "="*50)
+        print("🧪 模拟模式测试")
+        print("="*50)
+        
+        scheduler = self.create_scheduler_from_data()
+        self.load_projects_and_tasks(scheduler)
+        start_date = datetime.fromisoformat(self.test_data['scheduler_config']['start_date'])
+        
+        before = {tid: task.to_dict() for tid, task in scheduler.tasks.items()}
+        result = scheduler.simulate_schedule(start_date, max_days=20)
+        after = {tid: task.to_dict() for tid, task in scheduler.tasks.items()}
+        
+        if before == after:
+            print("✅ 模拟后输入任务保持不变")
+        else:
+            print("❌ 模拟修改了输入任务")
+        
+        simulated = result.export_to_dict()
+        scheduler.generate_schedule(start_date, max_days=20)
+        if simulated == scheduler.export_schedule_to_dict():
+            print("✅ 模拟结果与 generate_schedule 的结果一致")
+        else:
+            print("❌ 模拟结果与 generate_schedule 的结果不一致")
+    
+    def test_incremental_replan(self) -> None:
+        """测试增量重排与完整重排结果一致"""
+        print("\n" + "="*50)
+        print("🧪 增量重排测试")
+        print("="*50)
+        
+        start_date = datetime.fromisoformat(self.test_data['scheduler_config']['start_date'])
+        scheduler = self.create_scheduler_from_data()
+        self.load_projects_and_tasks(scheduler)
+        result = scheduler.simulate_schedule(start_date, max_days=20)
+        
+        # 新增一个远期任务后增量重排
+        new_task = Task(
+            task_id="task_new",
+            project_id="proj_004",
+            name="新增远期任务",
+            estimated_hours=3.0,
+            remaining_hours=3.0,
+            due_date=datetime(2024, 2, 28, 23, 59, 59)
+        )
+        scheduler.add_task(new_task)
+        replanned = scheduler.replan(result, [new_task.task_id])
+        full = scheduler.simulate_schedule(start_date, max_days=20)
+        
+        if replanned.export_to_dict() == full.export_to_dict():
+            print("✅ 增量重排结果与完整重排一致")
+        else:
+            print("❌ 增量重排结果与完整重排不一致")
+    
+    def test_schedule_table(self) -> None:
+        """测试列式排期结果的汇总与快照语义"""
+        print("\n" + "="*50)
+        print("🧪 列式排期结果测试")
+        print("="*50)
+        
+        start_date = datetime.fromisoformat(self.test_data['scheduler_config']['start_date'])
+        scheduler = self.create_scheduler_from_data()
+        self.load_projects_and_tasks(scheduler)
+        schedule = scheduler.generate_schedule(start_date, max_days=20)
+        
+        # 汇总结果应与逐条累加一致
+        day_hours = {date: sum(e.allocated_hours for e in entries) for date, entries in schedule.items()}
+        task_hours = {}
+        for entries in schedule.values():
+            for entry in entries:
+                task_hours[entry.task.task_id] = task_hours.get(entry.task.task_id, 0) + entry.allocated_hours
+        if schedule.hours_by_day() == day_hours and schedule.hours_by_task() == task_hours:
+            print("✅ 按天、按任务汇总与逐条累加一致")
+        else:
+            print("❌ 按天、按任务汇总与逐条累加不一致")
+        
+        # 之后修改任务不影响已保存的排期结果
+        first_date = next(iter(schedule))
+        task_id = schedule[first_date][0].task.task_id
+        before = schedule.to_dict()
+        scheduler.tasks[task_id].name = "已改名任务"
+        if schedule.to_dict() == before and schedule[first_date][0].task.name != "已改名任务":
+            print("✅ 修改任务后已保存的排期结果保持不变")
+        else:
+            print("❌ 修改任务改变了已保存的排期结果")
+    
+    def test_iter_schedule(self) -> None:
+        """测试逐日排期迭代器与完整排期一致且可提前停止"""
+        print("\n" + "="*50)
+        print("🧪 逐日排期迭代测试")
+        print("="*50)
+        
+        start_date = datetime.fromisoformat(self.test_data['scheduler_config']['start_date'])
+        scheduler = self.create_scheduler_from_data()
+        self.load_projects_and_tasks(scheduler)
+        inputs = {tid: task.to_dict() for tid, task in scheduler.tasks.items()}
+        
+        streamed = {
+            date: [(e.task.task_id, e.allocated_hours) for e in entries]
+            for date, entries in scheduler.iter_schedule(start_date, max_days=20)
+        }
+        
+        # 提前停止：只取前两天
+        iterator = scheduler.iter_schedule(start_date, max_days=20)
+        first_days = [next(iterator)[0], next(iterator)[0]]
+        iterator.close()
+        
+        if any(task.to_dict() != inputs[tid] for tid, task in scheduler.tasks.items()):
+            print("❌ 迭代排期修改了输入任务")
+            return
+        
+        scheduler.generate_schedule(start_date, max_days=20)
+        expected = {
+            date: [(e.task.task_id, e.allocated_hours) for e in entries]
+            for date, entries in scheduler.schedule.items()
+        }
+        if streamed == expected and first_days == list(expected)[:2]:
+            print(f"✅ 逐日产出的 {len(streamed)} 天排期与 generate_schedule 一致")
+        else:
+            print("❌ 逐日产出的排期与 generate_schedule 不一致")
+    
+    def test_streaming_export(self) -> None:
+        """测试流式导出与 json.dump 的输出逐字节一致"""
+        print("\n" + "="*50)
+        print("🧪 流式导出测试")
+        print("="*50)
+        
+        start_date = datetime.fromisoformat(self.test_data['scheduler_config']['start_date'])
+        scheduler = self.create_scheduler_from_data()
+        self.load_projects_and_tasks(scheduler)
+        scheduler.generate_schedule(start_date, max_days=20)
+        
+        expected = json.dumps(scheduler.export_schedule_to_dict(), ensure_ascii=False, indent=2)
+        streamed = "".join(iter_schedule_export(scheduler))
+        if streamed == expected:
+            print("✅ JSON 流式导出与 json.dump 输出逐字节一致")
+        else:
+            print("❌ JSON 流式导出与 json.dump 输出不一致")
+        
+        records = [json.loads(line) for line in iter_schedule_export(scheduler, format="ndjson")]
+        days = {r['date']: r['entries'] for r in records if r['type'] == 'day'}
+        tasks = [r for r in records if r['type'] == 'task']
+        if days == json.loads(expected)['schedule'] and len(tasks) == len(scheduler.tasks):
+            print(f"✅ NDJSON 导出 {len(records)} 条记录，内容与字典导出一致")
+        else:
+            print("❌ NDJSON 导出内容与字典导出不一致")
+    
+    def test_binary_snapshot(self) -> None:
+        """测试二进制快照的保存与加载"""
+        print("\n" + "="*50)
+        print("🧪 二进制快照测试")
+        print("="*50)
+        
+        start_date = datetime.fromisoformat(self.test_data['scheduler_config']['start_date'])
+        scheduler = self.create_scheduler_from_data()
+        self.load_projects_and_tasks(scheduler)
+        # 输入中已延期的项目不应被当作本次排期判定的延期项目
+        next(iter(scheduler.projects.values())).status = ProjectStatus.DELAYED
+        scheduler.rebuild_project_index()
+        scheduler.calendar = WorkCalendar(holidays={start_date.date() + timedelta(days=2)})
+        scheduler.selection_engine = "category"
+        scheduler.generate_schedule(start_date, max_days=20)
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "scheduler.snap")
+            save_snapshot(scheduler, path)
+            
+            with open_snapshot(path) as snapshot:
+                task = next(iter(scheduler.tasks.values()))
+                lazy_ok = (snapshot.tasks[task.task_id] == task
+                           and len(snapshot.tasks) == len(scheduler.tasks)
+                           and "missing_task" not in snapshot.tasks)
+            loaded = load_snapshot(path)
+        
+        if not lazy_ok:
+            print("❌ 快照按需解码的任务与原任务不一致")
+        elif loaded.calendar != scheduler.calendar or \
+                loaded.selection_engine != scheduler.selection_engine:
+            print("❌ 从快照加载的工作日历或选择引擎与原调度器不一致")
+        elif loaded.export_schedule_to_dict() != scheduler.export_schedule_to_dict():
+            print("❌ 从快照加载的调度器状态与原状态不一致")
+        elif loaded.simulate_schedule(start_date, 20).export_to_dict() != \
+                scheduler.simulate_schedule(start_date, 20).export_to_dict():
+            print("❌ 从快照加载后继续排期的结果不一致")
+        else:
+            print("✅ 快照加载的项目、任务、参数和排期结果与原状态一致")
+    
+    def test_bulk_loader(self) -> None:
+        """测试批量加载与逐个加载结果一致，并能定位出错的条目"""
+        print("\n" + "="*50)
+        print("🧪 批量加载测试")
+        print("="*50)
+        
+        scheduler = self.create_scheduler_from_data()
+        self.load_projects_and_tasks(scheduler)
+        report = bulk_load(self.test_data_file, chunk_size=256)
+        
+        if report.errors:
+            print(f"❌ 批量加载报告了意外的错误: {[str(e) for e in report.errors]}")
+        elif report.scheduler.export_schedule_to_dict() != scheduler.export_schedule_to_dict() \
+                or report.scheduler.w2 != scheduler.w2:
+            print("❌ 批量加载结果与逐个加载不一致")
+        else:
+            print(f"✅ 批量加载了 {report.projects_loaded} 个项目和 {report.tasks_loaded} 个任务，与逐个加载一致")
+        
+        # 出错的条目被跳过并报告位置，其余条目正常加载
+        document = (
+            '{"projects": [],\n'
+            ' "tasks": [\n'
+            '  {"task_id": "t1", "project_id": "p1", "name": "a", "estimated_hours": 2},\n'
+            '  {"task_id": "t2", "project_id": "p1", "name": "b" "estimated_hours": 2},\n'
+            '  {"task_id": "t3", "project_id": "p1", "name": "c", "estimated_hours": 1, "status": "done"},\n'
+            '  {"task_id": "t4", "project_id": "p1", "name": "d", "estimated_hours": 1}\n'
+            ' ]}'
+        )
+        report = bulk_load(io.StringIO(document), chunk_size=16)
+        positions = [(e.index, e.line, e.column) for e in report.errors]
+        if positions == [(1, 4, 3), (2, 5, 3)] and list(report.scheduler.tasks) == ["t1", "t4"]:
+            print("✅ 出错的条目被跳过，错误位置正确")
+        else:
+            print(f"❌ 错误报告不符合预期: {[str(e) for e in report.errors]}")
+
+        # 非数组的 tasks、布尔优先级和重复 ID 都作为条目错误报告
+        document = (
+            '{"projects": [\n'
+            '  {"project_id": "p1", "name": "a", "category": "c", "priority": 2, "deadline": "2024-01-10T00:00:00"},\n'
+            '  {"project_id": "p2", "name": "b", "category": "c", "priority": true, "deadline": "2024-01-10T00:00:00"},\n'
+            '  {"project_id": "p1", "name": "c", "category": "c", "priority": 3, "deadline": "2024-01-10T00:00:00"}\n'
+            ' ],\n'
+            ' "tasks": 5}'
+        )
+        report = bulk_load(io.StringIO(document), chunk_size=16)
+        errors = [(e.section, e.index) for e in report.errors]
+        if errors == [("projects", 1), ("projects", 2), ("tasks", -1)] \
+                and report.projects_loaded == 1 and report.scheduler.projects["p1"].name == "a":
+            print("✅ 非数组字段、布尔优先级和重复 ID 被报告为错误")
+        else:
+            print(f"❌ 错误报告不符合预期: {[str(e) for e in report.errors]}")
+
+        # 加载到已有调度器时，已存在的 ID 不被覆盖，截止日期与已有任务共享同一对象
+        scheduler = TaskScheduler()
+        due_date = datetime(2024, 1, 5)
+        scheduler.add_task(Task("t1", "p1", "a", 2, 2, TaskStatus.PENDING, due_date))
+        document = (
+            '{"tasks": [\n'
+            '  {"task_id": "t1", "project_id": "p1", "name": "b", "estimated_hours": 1},\n'
+            '  {"task_id": "t2", "project_id": "p1", "name": "c", "estimated_hours": 1, "due_date": "2024-01-05"}\n'
+            ' ]}'
+        )
+        report = bulk_load(io.StringIO(document), scheduler)
+        if [(e.section, e.index) for e in report.errors] == [("tasks", 0)] \
+                and report.tasks_loaded == 1 and scheduler.tasks["t1"].name == "a" \
+                and scheduler.tasks["t2"].due_date is due_date:
+            print("✅ 已存在的 ID 被报告为错误，截止日期与已有任务共享")
+        else:
+            print(f"❌ 加载到已有调度器的结果不符合预期: {[str(e) for e in report.errors]}")
+
+    def test_batch_scheduling(self) -> None:
+        """测试多租户批量排期与逐个排期结果一致"""
+        print("\n" + "="*50)
+        print("🧪 多租户批量排期测试")
+        print("="*50)
+        
+        start_date = datetime.fromisoformat(self.test_data['scheduler_config']['start_date'])
+        config = self.test_data.get('scheduler_config', {})
+        scheduler = self.create_scheduler_from_data()
+        self.load_projects_and_tasks(scheduler)
+        projects = list(scheduler.projects.values())
+        tasks = list(scheduler.tasks.values())
+        
+        tenants = [
+            TenantInput(f"tenant_{i}", projects, tasks, start_date, config, max_days=10 + i)
+            for i in range(5)
+        ]
+        expected = [schedule_tenant(tenant) for tenant in tenants]
+        results = list(schedule_tenants(tenants, max_workers=2, chunk_size=2))
+        
+        if [r.tenant_id for r in results] != [t.tenant_id for t in tenants]:
+            print("❌ 批量结果顺序与输入不一致")
+        elif any(r.error for r in results):
+            print(f"❌ 批量排期出错: {[r.error for r in results if r.error]}")
+        elif all(r.schedule == e.schedule and r.summary == e.summary for r, e in zip(results, expected)):
+            print(f"✅ {len(results)} 个租户的批量排期与逐个排期一致")
+        else:
+            print("❌ 批量排期结果与逐个排期不一致")
+    
+    def test_parameter_sweep(self) -> None:
+        """测试并行参数扫描与直接模拟的指标一致"""
+        print("\n" + "="*50)
+        print("🧪 参数扫描测试")
+        print("="*50)
+        
+        start_date = datetime.fromisoformat(self.test_data['scheduler_config']['start_date'])
+        config = self.test_data.get('scheduler_config', {})
+        scheduler = self.create_scheduler_from_data()
+        self.load_projects_and_tasks(scheduler)
+        
+        configs = list(grid_configs(w2=[1.0, 3.0], look_ahead_count=[2, 5]))
+        results = sweep_parameters(list(scheduler.projects.values()), list(scheduler.tasks.values()),
+                                   start_date, configs, max_days=20, base_config=config,
+                                   max_workers=2)
+        
+        mismatched = []
+        for result in results:
+            scheduler.configure(config)
+            for name, value in result.config.items():
+                setattr(scheduler, name, value)
+            expected = evaluate_schedule(scheduler.simulate_schedule(start_date, max_days=20))
+            print(f"  {result.config}: 延迟任务 {result.metrics.late_tasks} 个, "
+                  f"延迟天数 {result.metrics.total_lateness_days}, "
+                  f"类别分布 {result.metrics.category_spread:.2f}")
+            if result.metrics != expected:
+                mismatched.append(result.config)
+        
+        if mismatched:
+            print(f"❌ 参数扫描指标与直接模拟不一致: {mismatched}")
+        else:
+            print(f"✅ {len(results)} 个参数组合的扫描指标与直接模拟一致")
+    
+    def test_team_scheduling(self) -> None:
+        """测试团队排期：单人团队与单人排期一致，多人时遵守指定关系与每日工时"""
+        print("\n" + "="*50)
+        print("🧪 团队排期测试")
+        print("="*50)
+        
+        start_date = datetime.fromisoformat(self.test_data['scheduler_config']['start_date'])
+        config = self.test_data.get('scheduler_config', {})
+        scheduler = self.create_scheduler_from_data()
+        self.load_projects_and_tasks(scheduler)
+        expected = scheduler.simulate_schedule(start_date, max_days=20).export_to_dict()
+        
+        team = TeamScheduler([Worker("solo", "单人", scheduler.daily_work_hours)])
+        team.configure(config)
+        self.load_projects_and_tasks(team)
+        if team.simulate_schedule(start_date, max_days=20).export_to_dict() == expected:
+            print("✅ 单人团队的排期与单人排期一致")
+        else:
+            print("❌ 单人团队的排期与单人排期不一致")
+        
+        # 三名成员，每个项目的任务指定给一名成员，部分任务留在共享池
+        workers = [Worker("alice", "成员A", 4.0), Worker("bob", "成员B", 6.0), Worker("carol", "成员C", 2.5)]
+        team = TeamScheduler(workers)
+        team.configure(config)
+        self.load_projects_and_tasks(team)
+        assigned = {}
+        for i, task_id in enumerate(team.tasks):
+            if i % 3:
+                assigned[task_id] = workers[i % len(workers)].worker_id
+                team.assign_task(task_id, [assigned[task_id]])
+        result = team.simulate_schedule(start_date, max_days=20)
+        
+        violations = []
+        for worker in workers:
+            schedule = result.worker_schedule(worker.worker_id)
+            for date, entries in schedule.items():
+                if sum(entry.allocated_hours for entry in entries) > worker.daily_hours:
+                    violations.append(f"{worker.worker_id} 在 {date} 超出每日工时")
+                for entry in entries:
+                    if assigned.get(entry.task.task_id, worker.worker_id) != worker.worker_id:
+                        violations.append(f"{entry.task.task_id} 被分给了未指定的 {worker.worker_id}")
+        
+        hours = result.hours_by_worker()
+        print(f"  各成员工时: {hours}")
+        if violations:
+            print(f"❌ 团队排期违反约束: {violations[:3]}")
+        elif sum(hours.values()) == result.schedule.total_hours:
+            print(f"✅ {len(workers)} 名成员的排期遵守指定关系与每日工时")
+        else:
+            print("❌ 各成员工时之和与合并排期不一致")
+    
+    def test_work_calendar(self) -> None:
+        """测试工作日历：零工时日不排期，每天不超过日历工时"""
+        print("\n" + "="*50)
+        print("🧪 工作日历测试")
+        print("="*50)
+        
+        start_date = datetime.fromisoformat(self.test_data['scheduler_config']['start_date'])
+        scheduler = self.create_scheduler_from_data()
+        self.load_projects_and_tasks(scheduler)
+        expected = scheduler.simulate_schedule(start_date, max_days=20).export_to_dict()
+        
+        # 每天工时相同的日历与不设日历等价
+        scheduler.calendar = WorkCalendar(weekday_hours=(scheduler.daily_work_hours,) * 7)
+        if scheduler.simulate_schedule(start_date, max_days=20).export_to_dict() == expected:
+            print("✅ 每天工时相同的日历与不设日历的排期一致")
+        else:
+            print("❌ 每天工时相同的日历与不设日历的排期不一致")
+        
+        # 周末休息，开始后第 3 天为节假日，第 4 天只工作半天
+        holiday = (start_date + timedelta(days=2)).date()
+        half_day = (start_date + timedelta(days=3)).date()
+        calendar = WorkCalendar(holidays={holiday}, overrides={half_day: 4.0})
+        scheduler.calendar = calendar
+        result = scheduler.simulate_schedule(start_date, max_days=20)
+        
+        violations = [date for date, hours in result.schedule.hours_by_day().items()
+                      if hours > calendar.hours_on(date)]
+        scheduled_days = {datetime.fromisoformat(date).date() for date in result.schedule}
+        print(f"  排期天数: {len(scheduled_days)}，"
+              f"其中周末 {sum(1 for day in scheduled_days if day.weekday() >= 5)} 天")
+        if violations:
+            print(f"❌ 以下日期超出日历工时: {violations}")
+        elif holiday in scheduled_days:
+            print("❌ 节假日被安排了任务")
+        else:
+            print("✅ 排期遵守工作日历的节假日、周末与半天覆盖")
+    
+    def test_benchmark_report(self) -> None:
+        """测试性能基准报告的结构与对比"""
+        print("\n" + "="*50)
+        print("🧪 性能基准报告测试")
+        print("="*50)
+        
+        spec = WorkloadSpec(overdue_ratio=0.2, max_days=5)
+        report = run_benchmark([50, 200], spec, repeat=1)
+        json.dumps(report)  # 报告必须可以序列化为 JSON
+        
+        sizes = [result["num_tasks"] for result in report["results"]]
+        operations = set(report["results"][0]["operations"])
+        rows = compare_reports(report, report)
+        if sizes == [50, 200] and operations == set(BENCHMARK_OPERATIONS) and \
+                len(rows) == 2 * len(BENCHMARK_OPERATIONS) and all(row["speedup"] == 1.0 for row in rows):
+            print(f"✅ {len(sizes)} 个规模、{len(operations)} 项操作的基准报告结构完整")
+        else:
+            print("❌ 基准报告结构不完整")
+    
+    def test_profiling(self) -> None:
+        """测试分阶段性能统计不改变排期结果，并逐日记录各阶段"""
+        print("\n" + "="*50)
+        print("🧪 分阶段性能统计测试")
+        print("="*50)
+        
+        start_date = datetime.fromisoformat(self.test_data['scheduler_config']['start_date'])
+        scheduler = self.create_scheduler_from_data()
+        self.load_projects_and_tasks(scheduler)
+        plain = scheduler.simulate_schedule(start_date, max_days=20)
+        
+        reported = []
+        scheduler.enable_profiling(reported.append)
+        result = scheduler.simulate_schedule(start_date, max_days=20)
+        scheduler.disable_profiling()
+        
+        stats = result.stats
+        totals = stats.totals()
+        print(f"  记录 {len(stats.days)} 天，各阶段调用次数: {totals['calls']}")
+        if plain.stats is not None or result.export_to_dict() != plain.export_to_dict():
+            print("❌ 开启性能统计改变了排期结果")
+        elif reported != stats.days or len(stats.days) != result.end_day + 1:
+            print("❌ 逐日统计的天数或回调次数不正确")
+        elif totals['calls']['allocation'] < result.schedule.entry_count or \
+                not all(day.candidates >= day.examined for day in stats.days):
+            print("❌ 分阶段计数与排期结果不符")
+        else:
+            print("✅ 性能统计逐日记录了各阶段耗时，且不影响排期结果")
+    
+    def test_equivalence_harness(self) -> None:
+        """测试各引擎与参考实现的差分校验，以及差异用例的缩减"""
+        print("\n" + "="*50)
+        print("🧪 引擎差分校验测试")
+        print("="*50)
+        
+        reports = check_engines(range(30))
+        for report in reports.values():
+            print(f"  {report.name}: 差异 {report.mismatches}/{report.cases}，加速比 x{report.speedup:.2f}")
+        
+        def narrow_window(config):
+            # 故意改变多样性规则的引擎，用来确认差异能被发现并缩减
+            scheduler = configured()(config)
+            scheduler.look_ahead_count = min(scheduler.look_ahead_count, 1)
+            return scheduler
+        
+        broken = check_engines(range(40), {"narrow_window": narrow_window})["narrow_window"]
+        shrunk = [EquivalenceCase.from_dict(failure["case"]) for failure in broken.failures]
+        if any(report.mismatches for report in reports.values()):
+            print("❌ 引擎与参考实现的排期不一致")
+        elif not shrunk:
+            print("❌ 差分校验没有发现故意引入的差异")
+        elif not all(find_difference(narrow_window, case) for case in shrunk):
+            print("❌ 缩减后的用例不再复现差异")
+        else:
+            sizes = [len(case.tasks) for case in shrunk]
+            print(f"✅ {len(reports)} 个引擎与参考实现一致，故意引入的差异被缩减到 {sizes} 个任务")
+    
+    def test_sqlite_store(self) -> None:
+        """测试 SQLite 存储只载入参与排期的任务，并把排期结果写回"""
+        print("\n" + "="*50)
+        print("🧪 SQLite 存储测试")
+        print("="*50)
+        
+        start_date = datetime.fromisoformat(self.test_data['scheduler_config']['start_date'])
+        scheduler = self.create_scheduler_from_data()
+        self.load_projects_and_tasks(scheduler)
+        finished = next(iter(scheduler.tasks.values()))
+        finished.status = TaskStatus.COMPLETED
+        
+        with tempfile.TemporaryDirectory() as directory:
+            with SQLiteTaskStore(os.path.join(directory, "tasks.db"), batch_size=3) as store:
+                store.save_scheduler(scheduler)
+                store.save_config(self.test_data['scheduler_config'])
+                stored, run_id = store.schedule(start_date, max_days=20)
+                
+                scheduler.generate_schedule(start_date, max_days=20)
+                expected = scheduler.export_schedule_to_dict()
+                allocations = store.get_allocations(run_id)
+                written = all(store.get_task(task_id) == task
+                              for task_id, task in scheduler.tasks.items())
+                remaining = store.count_tasks(TaskStatus.PENDING)
+        
+        print(f"  载入 {len(stored.tasks)}/{len(scheduler.tasks)} 个任务，"
+              f"写回后仍待处理 {remaining} 个")
+        if finished.task_id in stored.tasks:
+            print("❌ 已完成的任务被载入了内存")
+        elif stored.export_schedule_to_dict()['schedule'] != expected['schedule'] or \
+                stored.get_schedule_summary() != expected['summary']:
+            print("❌ 从存储载入后的排期与内存中的排期不一致")
+        elif allocations != {date: [(entry['task_id'], entry['allocated_hours']) for entry in entries]
+                             for date, entries in expected['schedule'].items()}:
+            print("❌ 写回的分配记录与排期不一致")
+        elif not written:
+            print("❌ 写回的任务状态与剩余工时与排期结果不一致")
+        else:
+            print(f"✅ 排期结果与内存中一致，{len(allocations)} 天的分配和任务状态已写回")
+    
+    def test_overdue_heap(self) -> None:
+        """测试按截止时间堆维护的逾期队列与逐日全量扫描的结果一致"""
+        print("\n" + "="*50)
+        print("🧪 逾期堆测试")
+        print("="*50)
+        
+        scheduler = self.create_scheduler_from_data()
+        self.load_projects_and_tasks(scheduler)
+        current_date = datetime.fromisoformat(self.test_data['scheduler_config']['start_date'])
+        paused = next(iter(scheduler.projects.values()))
+        
+        mismatches = 0
+        flipped = 0
+        for day in range(30):
+            # 中途停用一个项目，之后再恢复，停用期间其任务不应逾期
+            if day == 3:
+                paused.status = ProjectStatus.DELAYED
+            elif day == 10:
+                paused.status = ProjectStatus.ACTIVE
+            
+            expected = []
+            for task in scheduler.tasks.values():
+                project = scheduler.get_project_by_id(task.project_id)
+                if (task.status == TaskStatus.PENDING and project and
+                        project.status == ProjectStatus.ACTIVE and
+                        (task.due_date or project.deadline) < current_date):
+                    expected.append(task.task_id)
+            
+            scheduler.update_overdue_tasks(current_date)
+            if [task.task_id for task in scheduler.overdue_queue] != expected:
+                mismatches += 1
+            flipped += len(expected)
+            
+            scheduler.schedule_single_day(current_date, scheduler.daily_work_hours)
+            current_date += timedelta(days=1)
+        
+        print(f"  30 天内共 {flipped} 个任务转为逾期")
+        if mismatches:
+            print(f"❌ {mismatches} 天的逾期队列与全量扫描不一致")
+        else:
+            print("✅ 每天的逾期队列都与全量扫描一致")
+    
+    def test_feasibility_check(self) -> None:
+        """测试前缀和可行性预检与逐日模拟的结论一致"""
+        print("\n" + "="*50)
+        print("🧪 可行性预检测试")
+        print("="*50)
+        
+        start_date = datetime.fromisoformat(self.test_data['scheduler_config']['start_date'])
+        scheduler = self.create_scheduler_from_data()
+        self.load_projects_and_tasks(scheduler)
+        report = scheduler.check_feasibility(start_date)
+        print(f"  {report.task_count} 个任务共 {report.demand_hours} 小时，"
+              f"{len(report.shortfalls)} 个截止日期无法满足，缺口 {report.max_shortfall_hours} 小时")
+        
+        # 追加一个次日截止、工时远超两天容量的任务，使计划必然不可行
+        project = next(iter(scheduler.projects.values()))
+        scheduler.add_task(Task("impossible", project.project_id, "不可能完成的任务",
+                                estimated_hours=40, remaining_hours=40,
+                                due_date=start_date + timedelta(days=1)))
+        overloaded = scheduler.check_feasibility(start_date)
+        shortfall = overloaded.first_shortfall
+        
+        result = scheduler.simulate_schedule(start_date, max_days=30)
+        missed = result.task_status("impossible") == TaskStatus.OVERDUE
+        
+        if overloaded.feasible or shortfall is None or "impossible" not in shortfall.task_ids:
+            print("❌ 未报告必然无法满足的截止日期")
+        elif shortfall.capacity_hours != 2 * scheduler.daily_work_hours:
+            print(f"❌ 截止日期前的累计工时计算错误: {shortfall.capacity_hours}")
+        elif project.project_id not in overloaded.infeasible_projects:
+            print("❌ 未报告无法按时完成的项目")
+        elif not missed:
+            print("❌ 预检判定不可行的任务在模拟中按时完成了")
+        else:
+            print(f"✅ 预检报告 {shortfall.date} 的截止日期缺口 {shortfall.shortfall_hours} 小时，"
+                  f"与模拟结果一致")
+    
     def export_test_results(self, scheduler: TaskScheduler, filename: str = "test_results.json") -> None:
         """导出测试结果"""
         print(f"\n💾 导出测试结果到 {filename}...")
         
-        results = scheduler.export_schedule_to_dict()
-        
         # 添加测试元数据
-        results['test_metadata'] = {
+        metadata = {
             'test_date': datetime.now().isoformat(),
             'test_data_file': self.test_data_file,
             'scheduler_config': self.test_data.get('scheduler_config', {})
@@ -295,7 +952,7 @@ class SchedulerTester:
         
         try:
             with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(results, f, ensure_ascii=False, indent=2)
+                write_schedule_export(scheduler, f, extra={'test_metadata': metadata})
             print(f"✅ 测试结果已导出到 {filename}")
         except Exception as e:
             print(f"❌ 导出失败: {e}")
@@ -318,6 +975,63 @@ class SchedulerTester:
             # 紧迫度计算测试
             self.test_urgency_calculation()
             
+            # 评分引擎一致性测试
+            self.test_scoring_engines()
+            
+            # 多样性选择引擎一致性测试
+            self.test_selection_engines()
+            
+            # 模拟模式测试
+            self.test_simulation_mode()
+            
+            # 增量重排测试
+            self.test_incremental_replan()
+            
+            # 列式排期结果测试
+            self.test_schedule_table()
+            
+            # 逐日排期迭代测试
+            self.test_iter_schedule()
+            
+            # 流式导出测试
+            self.test_streaming_export()
+            
+            # 二进制快照测试
+            self.test_binary_snapshot()
+            
+            # 批量加载测试
+            self.test_bulk_loader()
+            
+            # 多租户批量排期测试
+            self.test_batch_scheduling()
+            
+            # 参数扫描测试
+            self.test_parameter_sweep()
+            
+            # 团队排期测试
+            self.test_team_scheduling()
+            
+            # 工作日历测试
+            self.test_work_calendar()
+            
+            # 性能基准报告测试
+            self.test_benchmark_report()
+            
+            # 分阶段性能统计测试
+            self.test_profiling()
+            
+            # 引擎差分校验测试
+            self.test_equivalence_harness()
+            
+            # SQLite 存储测试
+            self.test_sqlite_store()
+            
+            # 逾期堆测试
+            self.test_overdue_heap()
+            
+            # 可行性预检测试
+            self.test_feasibility_check()
+            
             # 导出测试结果
             self.export_test_results(scheduler)
             